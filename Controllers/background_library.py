@@ -0,0 +1,154 @@
+import os
+import math
+import time
+import random
+import sqlite3
+import logging
+from typing import Dict, List, Optional
+from config import BACKGROUND_DIR, BASE_VIDEO, BACKGROUND_INDEX_DB, BACKGROUND_WEIGHTS, BACKGROUND_RECENT_SHARE
+from ffmpeg_tools import probe_video
+from keyframe_index import get_keyframes
+from proxy_cache import source_fingerprint
+
+logger = logging.getLogger(__name__)
+
+VIDEO_EXTENSIONS = (".mp4", ".mov", ".mkv", ".webm", ".m4v", ".avi")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS clips (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    -- proxy_cache.source_fingerprint of the file
+    fingerprint TEXT NOT NULL,
+    duration REAL NOT NULL,
+    width INTEGER NOT NULL,
+    height INTEGER NOT NULL,
+    fps REAL,
+    codec TEXT,
+    keyframes INTEGER NOT NULL DEFAULT 0,
+    -- Keyframes per second: how closely a part's start can be snapped and stream-copied
+    keyframe_density REAL NOT NULL DEFAULT 0,
+    indexed_at REAL NOT NULL,
+    last_used REAL NOT NULL DEFAULT 0,
+    uses INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+class BackgroundLibrary:
+    """
+    Background clips with their metadata, indexed once in SQLite. A clip is
+    only probed again when its size or mtime changes, so picking one and
+    planning parts on it never opens the media file.
+    """
+
+    def __init__(self, directory: str = BACKGROUND_DIR, db_path: str = BACKGROUND_INDEX_DB,
+                 fallback: Optional[str] = BASE_VIDEO):
+        self.directory = directory
+        self.fallback = fallback
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def clip_paths(self) -> List[str]:
+        """Video files of the library directory, or the fallback video while it has none."""
+        paths = []
+        if os.path.isdir(self.directory):
+            for root, _dirs, files in os.walk(self.directory):
+                paths.extend(os.path.join(root, name) for name in files if name.lower().endswith(VIDEO_EXTENSIONS))
+        if not paths and self.fallback and os.path.isfile(self.fallback):
+            paths.append(self.fallback)
+        return sorted(os.path.abspath(path) for path in paths)
+
+    def metadata(self, path: str) -> dict:
+        """Indexed metadata of a clip, probing it only if it is new or changed since it was indexed."""
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM clips WHERE path = ?", (path,)).fetchone()
+        if row is not None and row['size'] == stat.st_size and row['mtime'] == stat.st_mtime:
+            return dict(row)
+        return self._index(path, stat, row)
+
+    def _index(self, path: str, stat: os.stat_result, previous: Optional[sqlite3.Row]) -> dict:
+        logger.info(f"Indexing background {path}")
+        info = probe_video(path)
+        keyframes = get_keyframes(path)
+        clip = dict(
+            info, path=path, size=stat.st_size, mtime=stat.st_mtime, fingerprint=source_fingerprint(path),
+            keyframes=len(keyframes), keyframe_density=len(keyframes) / info['duration'] if info['duration'] else 0.0,
+            indexed_at=time.time(),
+            # A re-encoded clip keeps its place in the rotation
+            last_used=previous['last_used'] if previous is not None else 0.0,
+            uses=previous['uses'] if previous is not None else 0
+        )
+        columns = ", ".join(clip)
+        with self._connect() as conn:
+            conn.execute(f"INSERT OR REPLACE INTO clips ({columns}) VALUES ({', '.join('?' * len(clip))})",
+                         tuple(clip.values()))
+        return clip
+
+    def refresh(self) -> List[dict]:
+        """Indexes new or changed clips, forgets deleted ones and returns the metadata of every clip."""
+        paths = self.clip_paths()
+        clips = []
+        for path in paths:
+            try:
+                clips.append(self.metadata(path))
+            except Exception as e:
+                logger.warning(f"Skipping background {path}: {e}")
+        with self._connect() as conn:
+            known = [row['path'] for row in conn.execute("SELECT path FROM clips")]
+            gone = [(path,) for path in known if not os.path.exists(path)]
+            conn.executemany("DELETE FROM clips WHERE path = ?", gone)
+        return clips
+
+    def longest_duration(self) -> float:
+        clips = self.refresh()
+        if not clips:
+            raise RuntimeError(f"No background video found in {self.directory} (or at {self.fallback})")
+        return max(clip['duration'] for clip in clips)
+
+    def choose(self, min_duration: float = 0.0, preferred: Optional[str] = None) -> dict:
+        """
+        Picks a clip lasting at least min_duration and records its use.
+        preferred (e.g. the clip of a resumed project) is kept when it still
+        qualifies. Otherwise the most recently used share of the candidates
+        is left out and the pick among the others follows the clip weights.
+        """
+        clips = [clip for clip in self.refresh() if clip['duration'] >= min_duration]
+        weights: Dict[str, float] = {clip['path']: float(BACKGROUND_WEIGHTS.get(os.path.basename(clip['path']), 1.0))
+                                     for clip in clips}
+        clips = [clip for clip in clips if weights[clip['path']] > 0]
+        if not clips:
+            raise RuntimeError(f"No background video of at least {min_duration:.0f}s in {self.directory}")
+        chosen = next((clip for clip in clips if preferred and clip['path'] == os.path.abspath(preferred)), None)
+        if chosen is None:
+            # Least recently used first; never used clips in random order
+            random.shuffle(clips)
+            clips.sort(key=lambda clip: clip['last_used'])
+            candidates = clips[:max(1, math.ceil(len(clips) * (1 - BACKGROUND_RECENT_SHARE)))]
+            chosen = random.choices(candidates, weights=[weights[clip['path']] for clip in candidates])[0]
+        self.mark_used(chosen['path'])
+        return chosen
+
+    def mark_used(self, path: str) -> None:
+        with self._connect() as conn:
+            conn.execute("UPDATE clips SET last_used = ?, uses = uses + 1 WHERE path = ?",
+                         (time.time(), os.path.abspath(path)))
+
+_library: Optional[BackgroundLibrary] = None
+
+def get_background_library() -> BackgroundLibrary:
+    """Returns the process-wide background library."""
+    global _library
+    if _library is None:
+        _library = BackgroundLibrary()
+    return _library
@@ -0,0 +1,150 @@
+import os
+import time
+import logging
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import List
+from reddit_story import fetch_candidates_many, get_story_pool, save_raw_story
+from story_history import StoryHistory, get_story_history
+from story_video_generator import process_story_video
+from main import find_next_project_id
+from tracing import start_trace
+from config import SUBREDDIT, ENCODING_PROFILES, ENCODING_PROFILE, STORY_POOL_REFILL_SIZE, get_project_dirs
+
+logger = logging.getLogger(__name__)
+
+def collect_jobs(subreddits: List[str], count: int, history: StoryHistory) -> List[dict]:
+    """
+    Takes up to count unused stories from the story pool, like get_story,
+    alternating between subreddits. Subreddits whose pool runs dry are
+    fetched from Reddit in parallel, once, into the pool. Stories are
+    deduplicated by post id and title, against the history and across
+    subreddits.
+    """
+    pool = get_story_pool()
+    seen = set()
+
+    def is_used(post: dict) -> bool:
+        return (post["id"] in seen or post["title"] in seen
+                or history.is_story_used(post["title"], post["id"], post["selftext"]))
+
+    jobs = []
+    active, dry = list(subreddits), []
+    fetched = False
+    while len(jobs) < count and active:
+        for subreddit in list(active):
+            if len(jobs) >= count:
+                break
+            post = pool.take(subreddit, is_used)
+            if post is None:
+                active.remove(subreddit)
+                dry.append(subreddit)
+                continue
+            seen.update((post["id"], post["title"]))
+            jobs.append({
+                'post_id': post["id"],
+                'subreddit': subreddit,
+                'title': post["title"],
+                'story': post["selftext"]
+            })
+        if not active and dry and not fetched and len(jobs) < count:
+            # Cold or exhausted pools: this batch has to wait for Reddit
+            fetched = True
+            for subreddit, candidates in fetch_candidates_many(dry, history, max(count, STORY_POOL_REFILL_SIZE)).items():
+                logger.info(f"r/{subreddit}: {len(candidates)} unused candidate(s)")
+                pool.add(subreddit, candidates)
+            active, dry = dry, []
+    return jobs
+
+def run_job(job: dict) -> dict:
+    """Worker entry point: renders one story. Never raises, failures are reported in the result."""
+    tracer = start_trace()  # worker processes are reused: one trace per job
+    start = time.perf_counter()
+    stage_timings = {}
+    result = {'title': job['title'], 'post_id': job['post_id'], 'subreddit': job['subreddit'], 'project_id': job['project_id']}
+    try:
+        save_raw_story(job['title'], job['story'], job['project_id'])
+        result['outputs'] = process_story_video(
+            None, job['title'], job['story'], job['project_id'],
+            voice=job['voice'], encoding_profile=job['encoding_profile'], stage_timings=stage_timings,
+            subreddit=job['subreddit'], tracer=tracer
+        )
+        result['ok'] = True
+    except Exception as e:
+        result['ok'] = False
+        result['error'] = str(e)
+    result['stages'] = stage_timings
+    result['seconds'] = time.perf_counter() - start
+    return result
+
+def summarize(results: List[dict], wall_seconds: float, fetch_seconds: float) -> dict:
+    """Throughput summary: videos per hour, average seconds per stage, failures."""
+    succeeded = [result for result in results if result['ok']]
+    stage_names = sorted({stage for result in succeeded for stage in result['stages']})
+    average_stages = {
+        stage: round(sum(result['stages'].get(stage, 0) for result in succeeded) / len(succeeded), 2)
+        for stage in stage_names
+    } if succeeded else {}
+    if succeeded:
+        average_stages['total'] = round(sum(result['seconds'] for result in succeeded) / len(succeeded), 2)
+    return {
+        'videos': len(succeeded),
+        'failures': [{'title': result['title'], 'error': result['error']} for result in results if not result['ok']],
+        'wall_seconds': round(wall_seconds, 1),
+        'fetch_seconds': round(fetch_seconds, 2),
+        'videos_per_hour': round(len(succeeded) / wall_seconds * 3600, 1) if wall_seconds > 0 else 0,
+        'average_stage_seconds': average_stages
+    }
+
+def run_batch(count: int, subreddits: List[str], workers: int, voice: str = "random", encoding_profile: str = None) -> dict:
+    """
+    Generates up to count videos from the given subreddits on a pool of
+    long-lived worker processes. Returns the throughput summary.
+    """
+    batch_start = time.perf_counter()
+    history = get_story_history()
+    jobs = collect_jobs(subreddits, count, history)
+    fetch_seconds = time.perf_counter() - batch_start
+    if len(jobs) < count:
+        logger.warning(f"Only {len(jobs)} unused stories available (requested {count})")
+
+    # Project ids are assigned here, one at a time, so workers never race for a folder name
+    for job in jobs:
+        job['project_id'] = find_next_project_id(job['title'])
+        os.makedirs(get_project_dirs(job['project_id'])['project'], exist_ok=True)
+        job['voice'] = voice
+        job['encoding_profile'] = encoding_profile
+
+    results = []
+    with ProcessPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = {executor.submit(run_job, job): job for job in jobs}
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            if result['ok']:
+                # Only the parent process writes the history
+                history.add_story(result['title'], result['post_id'], futures[future]['story'])
+                logger.info(f"[{len(results)}/{len(jobs)}] Done: {result['title']} ({result['seconds']:.1f}s)")
+            else:
+                logger.error(f"[{len(results)}/{len(jobs)}] Failed: {result['title']}: {result['error']}")
+
+    return summarize(results, time.perf_counter() - batch_start, fetch_seconds)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate many videos in one run")
+    parser.add_argument("--count", type=int, default=10, help="Number of videos to generate")
+    parser.add_argument("--subreddits", default=SUBREDDIT, help="Comma-separated list of subreddits")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    parser.add_argument("--voice", default="random", help="TTS voice name, or 'random'")
+    parser.add_argument("--profile", choices=list(ENCODING_PROFILES), default=ENCODING_PROFILE,
+                        help="Encoding profile (draft, standard, archive)")
+    args = parser.parse_args()
+
+    subreddits = [name.strip() for name in args.subreddits.split(",") if name.strip()]
+    summary = run_batch(args.count, subreddits, args.workers, args.voice, args.profile)
+    logger.info(f"Batch finished: {summary['videos']} video(s) in {summary['wall_seconds']}s "
+                f"({summary['videos_per_hour']} videos/hour), {len(summary['failures'])} failure(s)")
+    for stage, seconds in summary['average_stage_seconds'].items():
+        logger.info(f"  average {stage}: {seconds}s")
+    for failure in summary['failures']:
+        logger.info(f"  failed: {failure['title']}: {failure['error']}")
@@ -1,6 +1,6 @@
 import os
 from dotenv import load_dotenv
-from settings_manager import load_settings
+from settings_manager import load_settings, DEFAULT_SETTINGS
 
 load_dotenv()
 
@@ -15,22 +15,57 @@ OUTPUT_DIR = os.path.join(BASE_DIR, "generated")
 # Ensure OUTPUT_DIR exists
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-# Add missing BASE_VIDEO variable pointing to the base video file
+# Background footage: the clips of BACKGROUND_DIR, or BASE_VIDEO alone while that directory has none
 BASE_VIDEO = os.path.join(DATA_DIR, "base_video.mp4")
+BACKGROUND_DIR = os.path.join(DATA_DIR, "backgrounds")
 
 # Video settings
+# ffprobe is looked up next to moviepy's ffmpeg, then on PATH, unless set here
+FFPROBE_PATH = os.getenv('FFPROBE_PATH', '')
 IMAGEMAGICK_PATH = os.getenv('IMAGEMAGICK_PATH', r"C:\Program Files\ImageMagick-7.1.1-Q16-HDRI\magick.exe")
 FONT_SIZE = 80  # Taille de base pour une vidéo 1080p
 FONT_SIZE_TITLE = FONT_SIZE * 1.2  # 20% plus grand pour les titres
 FONT_NAME = "Impact"
 
+# Subtitle rasterizer: "pillow" (in-process) or "imagemagick" (TextClip fallback)
+SUBTITLE_RENDERER = settings.get('subtitle_renderer', 'pillow')
+# Subtitle compositing: "overlay" (interval-indexed bitmaps) or "composite" (one layer per caption)
+SUBTITLE_ENGINE = settings.get('subtitle_engine', 'overlay')
+# Part rendering: "moviepy" (Python frame loop) or "ffmpeg" (native cut + ASS burn-in + mux)
+RENDER_MODE = settings.get('render_mode', 'moviepy')
+# Worker processes rendering parts in parallel (1 = sequential, 0 = one per CPU core)
+RENDER_WORKERS = settings.get('render_workers', 1)
+# Times a failed project is resumed from its checkpoints (manifest.json) before giving up
+PROJECT_RETRIES = settings.get('project_retries', 1)
+# Stream-copy each part's background window (keyframe-aligned) instead of seeking in the full file
+PRECUT_BACKGROUND = settings.get('precut_background', True)
+
+# Background footage is transcoded once to the output geometry and cached
+USE_BACKGROUND_PROXY = settings.get('use_background_proxy', True)
+PROXY_CACHE_DIR = os.path.join(DATA_DIR, "proxies")
+PROXY_PROFILE = settings.get('proxy_profile', {"width": 1080, "height": 1920, "fps": 30, "gop": 30})
+
+# Metadata index of the background clips (duration, geometry, codec, keyframes, hash), refreshed by mtime
+BACKGROUND_INDEX_DB = os.path.join(DATA_DIR, "background_library.sqlite3")
+# Relative chance of each clip (by file name) being picked; 0 disables a clip, unlisted clips weigh 1
+BACKGROUND_WEIGHTS = settings.get('background_weights', {})
+# Share of the clips, most recently used first, left out of each pick so footage does not repeat
+BACKGROUND_RECENT_SHARE = settings.get('background_recent_share', 0.5)
+
 # Dynamic segment lengths from settings
 MIN_WORDS_PER_SEGMENT = settings.get('min_words_segment', 150)
 MAX_WORDS_PER_SEGMENT = settings.get('max_words_segment', 225)
 
+# Named x264 encoding profiles (draft / standard / archive) and the default one
+ENCODING_PROFILES = settings.get('encoding_profiles', DEFAULT_SETTINGS['encoding_profiles'])
+ENCODING_PROFILE = settings.get('encoding_profile', 'standard')
+
 # Reddit settings
 SUBREDDIT = "funnystories"
 USER_AGENT = "reel_app/0.1"
+REDDIT_BASE_URL = os.getenv('REDDIT_BASE_URL', "https://www.reddit.com")
+REDDIT_PAGE_SIZE = 100  # listing page size (Reddit's maximum)
+REDDIT_MAX_PAGES = settings.get('reddit_max_pages', 5)
 
 # TTS Voice settings
 VOICE_OPTIONS = [
@@ -40,9 +75,51 @@ VOICE_OPTIONS = [
     "en-AU-NatashaNeural"    # Australian female
 ]
 
-# Update history file path
+# Timing spans per job, exported as a Chrome trace (trace.json) in the project directory
+TRACE_ENABLED = settings.get('trace_enabled', True)
+
+# Progress events delivered to each subscriber per second; superseded values are dropped
+PROGRESS_MAX_RATE_HZ = settings.get('progress_max_rate_hz', 10)
+
+# Maximum number of TTS requests in flight at once
+TTS_MAX_CONCURRENCY = settings.get('tts_concurrency', 4)
+
+# "per_part": one TTS call per part (title, part number and overlap sentence included)
+# "whole_story": the story is synthesized once and cut at sentence ends into parts of about part_target_seconds
+TTS_MODE = settings.get('tts_mode', 'per_part')
+PART_TARGET_SECONDS = settings.get('part_target_seconds', 70)
+# Longest part the target platform accepts (the background video length also caps it)
+PART_MAX_SECONDS = settings.get('part_max_seconds', 180)
+# Per-part mode splitting: "duration" (predicted narration time, per voice) or "words" (min/max_words_segment)
+SEGMENTER = settings.get('segmenter', 'duration')
+# Per-voice speech-rate statistics, learned from the word timings of every synthesis
+SPEECH_RATE_DB = os.path.join(DATA_DIR, "speech_rate.sqlite3")
+# JSON file of earlier versions, imported once
+SPEECH_RATE_LEGACY_FILE = os.path.join(DATA_DIR, "speech_rate.json")
+
+# Persistent TTS cache (mp3 + word timings), bounded by a byte budget
+TTS_CACHE_ENABLED = settings.get('tts_cache_enabled', True)
+TTS_CACHE_DIR = os.path.join(DATA_DIR, "tts_cache")
+TTS_CACHE_MAX_BYTES = settings.get('tts_cache_max_bytes', 512 * 1024 * 1024)
+
+# Local pool of eligible Reddit posts; entries expire after a per-subreddit TTL
+STORY_POOL_DB = os.path.join(DATA_DIR, "story_pool.sqlite3")
+STORY_POOL_TTL_HOURS = settings.get('story_pool_ttl_hours', {"default": 6})
+STORY_POOL_LOW_WATERMARK = settings.get('story_pool_low_watermark', 5)
+STORY_POOL_REFILL_SIZE = settings.get('story_pool_refill_size', 25)
+
+# Catalog of generated videos; VIDEOS_DB_LEGACY is the GUI's old JSON database, migrated on first use
+VIDEO_CATALOG_DB = os.path.join(DATA_DIR, "video_catalog.sqlite3")
+VIDEOS_DB_LEGACY = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "videos.json")
+
+# Story history database; HISTORY_FILE is the old JSON list, migrated on first use
+HISTORY_DB = os.path.join(DATA_DIR, "story_history.sqlite3")
 HISTORY_FILE = os.path.join(DATA_DIR, "story_history.json")
 
+# MinHash near-duplicate check of candidates against used stories (estimated Jaccard similarity)
+NEAR_DUPLICATE_DETECTION = settings.get('near_duplicate_detection', True)
+NEAR_DUPLICATE_THRESHOLD = settings.get('near_duplicate_threshold', 0.8)
+
 def get_project_dirs(project_id: str) -> dict:
     """Returns dictionary of project-specific directory paths."""
     project_dir = os.path.join(OUTPUT_DIR, project_id)
@@ -50,5 +127,6 @@ def get_project_dirs(project_id: str) -> dict:
         'project': project_dir,
         'final': os.path.join(project_dir, 'final'),
         'voice': os.path.join(project_dir, 'voice'),
-        'script': os.path.join(project_dir, 'script')
+        'script': os.path.join(project_dir, 'script'),
+        'work': os.path.join(project_dir, 'work')
     }
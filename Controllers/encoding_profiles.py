@@ -0,0 +1,57 @@
+import os
+from typing import List
+from config import ENCODING_PROFILES, ENCODING_PROFILE
+
+def get_encoding_profile(name: str = None) -> dict:
+    """
+    Resolves a named encoding profile ("draft", "standard", "archive", ...).
+    threads == 0 means one thread per CPU core.
+
+    Raises:
+        ValueError: If no profile has that name
+    """
+    name = name or ENCODING_PROFILE
+    if name not in ENCODING_PROFILES:
+        raise ValueError(f"Unknown encoding profile '{name}' (available: {', '.join(ENCODING_PROFILES)})")
+    profile = dict(ENCODING_PROFILES[name])
+    profile['name'] = name
+    profile['threads'] = profile.get('threads') or os.cpu_count() or 1
+    profile.setdefault('scale', 1.0)
+    return profile
+
+def _x264_params(profile: dict) -> List[str]:
+    params = ["-crf", str(profile['crf'])]
+    if profile.get('faststart'):
+        params += ["-movflags", "+faststart"]
+    return params
+
+def scale_filter(scale: float) -> str:
+    """ffmpeg filter resizing frames by scale, keeping dimensions even for yuv420p."""
+    return f"scale=trunc(iw*{scale}/2)*2:-2"
+
+def moviepy_write_kwargs(profile: dict) -> dict:
+    """
+    Keyword arguments for VideoClip.write_videofile. Downscaling is left to
+    the ffmpeg writer rather than moviepy's per-frame resize.
+    """
+    ffmpeg_params = _x264_params(profile)
+    if profile['scale'] != 1.0:
+        ffmpeg_params += ["-vf", scale_filter(profile['scale'])]
+    return {
+        'codec': "libx264",
+        'preset': profile['preset'],
+        'threads': profile['threads'],
+        'audio_codec': "aac",
+        'audio_bitrate': profile.get('audio_bitrate'),
+        'ffmpeg_params': ffmpeg_params
+    }
+
+def ffmpeg_encode_args(profile: dict) -> List[str]:
+    """Output encoding arguments for a direct ffmpeg invocation."""
+    args = [
+        "-c:v", "libx264", "-preset", profile['preset'], "-threads", str(profile['threads']),
+        "-pix_fmt", "yuv420p", "-c:a", "aac"
+    ]
+    if profile.get('audio_bitrate'):
+        args += ["-b:a", profile['audio_bitrate']]
+    return args + _x264_params(profile)
@@ -0,0 +1,174 @@
+import os
+import re
+import json
+import shutil
+import logging
+import subprocess
+from typing import Callable, List, Optional
+from moviepy.config import get_setting
+from config import FFPROBE_PATH
+
+logger = logging.getLogger(__name__)
+
+def ffmpeg_binary() -> str:
+    """The ffmpeg executable moviepy is configured with."""
+    return get_setting("FFMPEG_BINARY")
+
+def ffprobe_binary() -> Optional[str]:
+    """The ffprobe executable: FFPROBE_PATH, next to ffmpeg, or on PATH (None if missing)."""
+    if FFPROBE_PATH:
+        return FFPROBE_PATH
+    ffmpeg_dir = os.path.dirname(ffmpeg_binary())
+    for name in ("ffprobe", "ffprobe.exe"):
+        candidate = os.path.join(ffmpeg_dir, name)
+        if ffmpeg_dir and os.path.isfile(candidate):
+            return candidate
+    return shutil.which("ffprobe")
+
+def probe_keyframes(video_path: str) -> List[float]:
+    """
+    Lists the keyframe timestamps (seconds) of the first video stream.
+    Reads packet flags with ffprobe (no decoding); without ffprobe, falls
+    back to decoding only the keyframes with ffmpeg's showinfo filter.
+    """
+    ffprobe = ffprobe_binary()
+    if ffprobe:
+        result = subprocess.run(
+            [ffprobe, "-v", "error", "-select_streams", "v:0",
+             "-show_entries", "packet=pts_time,flags", "-of", "csv=p=0", video_path],
+            capture_output=True, text=True, check=True
+        )
+        keyframes = []
+        for line in result.stdout.splitlines():
+            pts_time, _, flags = line.strip().partition(",")
+            if flags.startswith("K") and pts_time not in ("", "N/A"):
+                keyframes.append(float(pts_time))
+        return sorted(keyframes)
+
+    result = subprocess.run(
+        [ffmpeg_binary(), "-hide_banner", "-nostats", "-skip_frame", "nokey", "-i", video_path,
+         "-map", "0:v:0", "-vf", "showinfo", "-f", "null", "-"],
+        capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed to list keyframes of {video_path}: {result.stderr.strip()[-500:]}")
+    return sorted(float(match) for match in re.findall(r"pts_time:\s*([0-9.]+)", result.stderr))
+
+def probe_duration(media_path: str) -> Optional[float]:
+    """Container duration in seconds read by ffprobe, or None when ffprobe is missing or fails."""
+    ffprobe = ffprobe_binary()
+    if not ffprobe:
+        return None
+    result = subprocess.run(
+        [ffprobe, "-v", "error", "-show_entries", "format=duration", "-of", "csv=p=0", media_path],
+        capture_output=True, text=True
+    )
+    try:
+        return float(result.stdout.strip())
+    except ValueError:
+        return None
+
+def _frame_rate(rate: str) -> float:
+    """'30000/1001' or '29.97' as frames per second."""
+    numerator, _, denominator = rate.partition("/")
+    return float(numerator) / float(denominator) if denominator and float(denominator) else float(numerator)
+
+def probe_video(video_path: str) -> dict:
+    """
+    Duration, resolution, frame rate and codec of the first video stream:
+    {'duration', 'width', 'height', 'fps', 'codec'}. Read by ffprobe, or
+    parsed from ffmpeg's input banner without ffprobe.
+    """
+    ffprobe = ffprobe_binary()
+    if ffprobe:
+        result = subprocess.run(
+            [ffprobe, "-v", "error", "-select_streams", "v:0",
+             "-show_entries", "stream=codec_name,width,height,avg_frame_rate:format=duration",
+             "-of", "json", video_path],
+            capture_output=True, text=True, check=True
+        )
+        info = json.loads(result.stdout)
+        if not info.get('streams'):
+            raise RuntimeError(f"No video stream in {video_path}")
+        stream = info['streams'][0]
+        return {
+            'duration': float(info['format']['duration']),
+            'width': int(stream['width']), 'height': int(stream['height']),
+            'fps': _frame_rate(stream['avg_frame_rate']), 'codec': stream['codec_name']
+        }
+
+    # Without output file ffmpeg exits with an error after printing the input banner
+    banner = subprocess.run([ffmpeg_binary(), "-hide_banner", "-i", video_path], capture_output=True, text=True).stderr
+    duration = re.search(r"Duration:\s*(\d+):(\d+):([\d.]+)", banner)
+    stream = re.search(r"Stream #\S+.*?: Video: (\w+).*?, (\d{2,5})x(\d{2,5})", banner)
+    fps = re.search(r"([\d.]+) fps", banner)
+    if not duration or not stream:
+        raise RuntimeError(f"ffmpeg could not read the video stream of {video_path}: {banner.strip()[-500:]}")
+    hours, minutes, seconds = duration.groups()
+    return {
+        'duration': int(hours) * 3600 + int(minutes) * 60 + float(seconds),
+        'width': int(stream.group(2)), 'height': int(stream.group(3)),
+        'fps': float(fps.group(1)) if fps else None, 'codec': stream.group(1)
+    }
+
+def run_ffmpeg(args: List[str], duration: Optional[float] = None, progress: Optional[Callable[[float], None]] = None, cwd: Optional[str] = None) -> None:
+    """
+    Runs ffmpeg with args, reporting the fraction of duration encoded so far
+    to progress (0.0 - 1.0) when both are given.
+
+    Raises:
+        RuntimeError: If ffmpeg exits with an error
+    """
+    cmd = [ffmpeg_binary(), "-y", "-hide_banner", "-loglevel", "error", "-nostats", "-progress", "pipe:1"] + args
+    logger.debug(f"Running: {' '.join(cmd)}")
+    process = subprocess.Popen(
+        cmd, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        universal_newlines=True, encoding="utf-8", errors="replace"
+    )
+    for line in process.stdout:
+        key, _, value = line.strip().partition("=")
+        if key == "out_time_us" and progress and duration and value.isdigit():
+            progress(min(int(value) / 1000000 / duration, 1.0))
+    stderr = process.stderr.read()
+    if process.wait() != 0:
+        raise RuntimeError(f"ffmpeg failed ({process.returncode}): {stderr.strip()}")
+
+def burn_subtitles(base_video: str, start_time: float, duration: float, subtitle_path: str, audio_path: str, output_path: str, progress: Optional[Callable[[float], None]] = None, encode_args: Optional[List[str]] = None, video_filters: Optional[List[str]] = None) -> str:
+    """
+    Cuts duration seconds of base_video from start_time, burns the ASS/SRT
+    subtitles in and muxes the narration, all in one ffmpeg invocation.
+    encode_args replaces the default libx264/aac output options and
+    video_filters run after the subtitles are burned.
+    Returns the output path.
+    """
+    subtitle_dir, subtitle_file = os.path.split(os.path.abspath(subtitle_path))
+    # ffmpeg runs from the subtitle directory so the filter argument needs no path escaping
+    video_filter = f"ass={subtitle_file}" if subtitle_file.endswith(".ass") else f"subtitles={subtitle_file}"
+    if video_filters:
+        video_filter = ",".join([video_filter] + video_filters)
+    if encode_args is None:
+        encode_args = ["-c:v", "libx264", "-pix_fmt", "yuv420p", "-c:a", "aac"]
+    args = [
+        "-ss", f"{start_time:.3f}", "-t", f"{duration:.3f}", "-i", os.path.abspath(base_video),
+        "-i", os.path.abspath(audio_path),
+        "-map", "0:v:0", "-map", "1:a:0",
+        "-vf", video_filter
+    ] + encode_args + [os.path.abspath(output_path)]
+    run_ffmpeg(args, duration, progress, cwd=subtitle_dir)
+    return output_path
+
+def precut(base_video: str, start_time: float, duration: float, output_path: str) -> str:
+    """
+    Stream-copies duration seconds of base_video from start_time, without
+    re-encoding. Only frame-accurate when start_time is on a keyframe.
+    Returns the output path.
+    """
+    # Copy seeks land on the last keyframe at or before -ss: nudge past start_time
+    # so a rounded keyframe timestamp never falls back to the previous keyframe
+    args = [
+        "-ss", f"{start_time + 0.001:.6f}", "-i", os.path.abspath(base_video), "-t", f"{duration:.3f}",
+        "-map", "0:v:0", "-c", "copy", "-avoid_negative_ts", "make_zero",
+        os.path.abspath(output_path)
+    ]
+    run_ffmpeg(args)
+    return output_path
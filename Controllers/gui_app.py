@@ -8,14 +8,17 @@ import time
 import logging
 from datetime import datetime
 import humanize
-import json
 
 # Import project functions and settings manager
 from main import find_next_project_id
 from reddit_story import get_story
 from story_video_generator import process_story_video
-from story_history import StoryHistory
-from config import BASE_VIDEO, OUTPUT_DIR, VOICE_OPTIONS
+from story_history import get_story_history
+from video_catalog import get_video_catalog, STATUS_GENERATING, STATUS_ERROR
+from media_info import MediaInfoCache
+from progress_bus import ProgressBus, ProgressEvent
+from tracing import start_trace
+from config import OUTPUT_DIR, VOICE_OPTIONS, ENCODING_PROFILES, ENCODING_PROFILE
 from settings_manager import load_settings, save_settings
 
 # Custom styles for dark theme
@@ -50,11 +53,17 @@ THEMES = {
     }
 }
 
+# Available subtitle rasterizers (see story_video_generator.create_dynamic_text_clip)
+SUBTITLE_RENDERERS = ["pillow", "imagemagick"]
+
 # Thread-safe queue for log messages
 log_queue = queue.Queue()
 
-# Add path for videos database
-VIDEOS_DB = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "videos.json")
+# Share of the overall progress bar covered by each pipeline stage
+STAGE_PROGRESS_SPAN = {'tts': (30, 40), 'background': (40, 45), 'render': (45, 100)}
+
+# Projects loaded into the videos table per page
+VIDEOS_PAGE_SIZE = 50
 
 # Add these constants at the top of the file, after the imports
 VIDEO_STATUS = {
@@ -71,7 +80,14 @@ class GuiApp:
         self.settings = load_settings()
 
         # Initialize databases and state variables first
-        self.load_videos_db()  # Move this up
+        self.catalog = get_video_catalog()
+        self.media_cache = MediaInfoCache()
+        # Rows currently shown in the videos table: {iid: (parent_iid, text, values)}
+        self.video_rows = {}
+        self.videos_limit = VIDEOS_PAGE_SIZE
+        self.videos_exhausted = False
+        self.videos_refresh_running = False
+        self.videos_refresh_pending = False
         self.current_theme = self.settings.get("theme", "black")
         self.STYLES = THEMES[self.current_theme]
         self.current_segment = 0
@@ -245,13 +261,13 @@ class GuiApp:
         self.videos_tree.bind('<Return>', lambda event: self.open_selected_video(event))
         
         # Add scrollbars
-        y_scrollbar = ttk.Scrollbar(videos_frame, orient="vertical", command=self.videos_tree.yview)
+        self.videos_y_scrollbar = ttk.Scrollbar(videos_frame, orient="vertical", command=self.videos_tree.yview)
         x_scrollbar = ttk.Scrollbar(videos_frame, orient="horizontal", command=self.videos_tree.xview)
-        self.videos_tree.configure(yscrollcommand=y_scrollbar.set, xscrollcommand=x_scrollbar.set)
+        self.videos_tree.configure(yscrollcommand=self.on_videos_scroll, xscrollcommand=x_scrollbar.set)
 
         # Pack widgets
         self.videos_tree.grid(row=0, column=0, sticky='nsew')
-        y_scrollbar.grid(row=0, column=1, sticky='ns')
+        self.videos_y_scrollbar.grid(row=0, column=1, sticky='ns')
         x_scrollbar.grid(row=1, column=0, sticky='ew')
 
         # Configure grid weights
@@ -314,6 +330,20 @@ class GuiApp:
                                          values=list(THEMES.keys()), state="readonly")
         self.theme_dropdown.grid(row=6, column=1, columnspan=2, padx=10, pady=5, sticky='ew')
 
+        # Subtitle renderer settings
+        ttk.Label(self.settings_frame, text="Subtitle renderer:").grid(row=7, column=0, padx=10, pady=5, sticky='w')
+        self.renderer_var = tk.StringVar(value=self.settings.get("subtitle_renderer", "pillow"))
+        self.renderer_dropdown = ttk.Combobox(self.settings_frame, textvariable=self.renderer_var,
+                                            values=SUBTITLE_RENDERERS, state="readonly")
+        self.renderer_dropdown.grid(row=7, column=1, columnspan=2, padx=10, pady=5, sticky='ew')
+
+        # Encoding profile settings
+        ttk.Label(self.settings_frame, text="Encoding profile:").grid(row=8, column=0, padx=10, pady=5, sticky='w')
+        self.profile_var = tk.StringVar(value=self.settings.get("encoding_profile", ENCODING_PROFILE))
+        self.profile_dropdown = ttk.Combobox(self.settings_frame, textvariable=self.profile_var,
+                                           values=list(ENCODING_PROFILES), state="readonly")
+        self.profile_dropdown.grid(row=8, column=1, columnspan=2, padx=10, pady=5, sticky='ew')
+
         # Enhanced Logs Tab
         self.log_frame = ttk.Frame(notebook)
         notebook.add(self.log_frame, text="Logs")
@@ -376,12 +406,14 @@ class GuiApp:
         self.start_time = time.time()
         self.current_segment = 0
 
-        # Get the selected voice before starting the thread
+        # Get the selected voice and encoding profile before starting the thread
         selected_voice = self.voice_var.get()
-        thread = threading.Thread(target=self.generate_video_thread, args=(selected_voice,), daemon=True)
+        encoding_profile = self.profile_var.get()
+        thread = threading.Thread(target=self.generate_video_thread, args=(selected_voice, encoding_profile), daemon=True)
         thread.start()
 
-    def generate_video_thread(self, selected_voice):
+    def generate_video_thread(self, selected_voice, encoding_profile=None):
+        tracer = start_trace()  # spans of this job, written to <project>/trace.json by process_story_video
         try:
             # Update progress (10%)
             self.master.after(0, lambda: self.overall_progress.config(value=10))
@@ -406,13 +438,18 @@ class GuiApp:
             self.update_segment_info(0, parts)
 
             # Process video with the correct project_id and selected voice
+            progress_bus = ProgressBus()
+            progress_bus.subscribe(self.on_progress_event)
             output_files = process_story_video(
-                BASE_VIDEO,
+                None,
                 title,
                 story,
                 project_id,
                 voice=selected_voice,
-                progress_callback=self.update_progress
+                encoding_profile=encoding_profile,
+                subreddit=subreddit,
+                progress_bus=progress_bus,
+                tracer=tracer
             )
 
             # Success handling
@@ -428,25 +465,15 @@ class GuiApp:
                 self.size_label.config(text=f"Generated file size: {humanize.naturalsize(size)}")
                 self.preview_button.config(state='normal')
 
-            # After successful generation, add to videos database
-            self.add_video_to_db(project_id, title, output_files)
+            # process_story_video recorded the parts in the video catalog
             self.master.after(0, self.refresh_videos_list)
 
         except Exception as e:
             self.log_error(f"Error: {str(e)}")
             self.set_status("Error during generation", "error")
             messagebox.showerror("Error", str(e))
-            # If error occurs during generation
+            # process_story_video already marked the project as failed in the video catalog
             if 'project_id' in locals():
-                self.videos_db[project_id] = {
-                    'title': title if 'title' in locals() else 'Unknown',
-                    'date': datetime.now().strftime('%Y-%m-%d'),
-                    'status': f'Error: {str(e)}',
-                    'length': '-',
-                    'parts': 0,
-                    'files': []
-                }
-                self.save_videos_db()
                 self.master.after(0, self.refresh_videos_list)
         finally:
             self.gen_button.config(state='normal')
@@ -494,15 +521,15 @@ class GuiApp:
         self.log_text.config(state='disabled')
 
     def refresh_history(self):
-        # Load used stories from history file.
-        history = StoryHistory()
+        # Load used stories from the history database.
+        history = get_story_history()
         self.history_list.delete(0, tk.END)
         for title in sorted(history.used_titles):
             self.history_list.insert(tk.END, title)
 
     def clear_history(self):
         if messagebox.askyesno("Confirm", "Clear all history?"):
-            history = StoryHistory()
+            history = get_story_history()
             history.clear_history()
             self.refresh_history()
             log_queue.put("History cleared.")
@@ -526,7 +553,9 @@ class GuiApp:
                 "subreddit": self.subreddit_var.get(),
                 "theme": self.theme_var.get(),
                 "min_words_segment": min_words,
-                "max_words_segment": max_words
+                "max_words_segment": max_words,
+                "subtitle_renderer": self.renderer_var.get(),
+                "encoding_profile": self.profile_var.get()
             })
 
             save_settings(self.settings)
@@ -559,88 +588,137 @@ class GuiApp:
             pass  # No more messages in the queue
         self.master.after(100, self.poll_log_queue)
 
-    def load_videos_db(self):
-        """Load videos database from JSON file"""
-        if os.path.exists(VIDEOS_DB):
-            try:
-                with open(VIDEOS_DB, 'r', encoding='utf-8') as f:
-                    self.videos_db = json.load(f)
-            except Exception as e:
-                self.log_error(f"Error loading videos database: {e}")
-                self.videos_db = {}
-        else:
-            self.videos_db = {}
+    def refresh_videos_list(self):
+        """
+        Rebuilds the videos table on a background thread; only rows that
+        changed are touched once the result is posted back to the Tk thread
+        """
+        self.videos_refresh_pending = True
+        if not self.videos_refresh_running:
+            self.start_videos_refresh()
+
+    def load_more_videos(self):
+        """Extends the videos table by one page of catalog projects"""
+        if self.videos_exhausted or self.videos_refresh_running:
+            return
+        self.videos_limit += VIDEOS_PAGE_SIZE
+        self.refresh_videos_list()
 
-    def save_videos_db(self):
-        """Save videos database to JSON file"""
-        os.makedirs(os.path.dirname(VIDEOS_DB), exist_ok=True)
-        with open(VIDEOS_DB, 'w', encoding='utf-8') as f:
-            json.dump(self.videos_db, f, indent=2)
+    def start_videos_refresh(self):
+        self.videos_refresh_pending = False
+        self.videos_refresh_running = True
+        limit = self.videos_limit
 
-    def refresh_videos_list(self):
-        # Clear current items
-        for item in self.videos_tree.get_children():
-            self.videos_tree.delete(item)
-
-        # Add videos from database as parent rows, with child rows for parts if applicable.
-        for video_id, data in sorted(self.videos_db.items(), reverse=True):
-            # Check parent status based on files existence
-            files = data.get('files', [])
-            if not files:
+        def build():
+            try:
+                rows = self.build_video_rows(limit)
+            except Exception as e:
+                log_queue.put(f"Error loading videos: {e}")
+                rows = None
+            self.master.after(0, lambda: self.apply_video_rows(rows, limit))
+
+        threading.Thread(target=build, daemon=True).start()
+
+    def build_video_rows(self, limit):
+        """
+        Background thread: reads the catalog and checks the files through the
+        media cache. Returns the table rows in display order as
+        (iid, parent_iid, text, values) tuples
+        """
+        projects = self.catalog.list_projects(limit=limit)
+        parts_by_project = self.catalog.get_parts(project['project_id'] for project in projects)
+        rows = []
+
+        # Add videos from the catalog as parent rows, with child rows for parts if applicable.
+        for data in projects:
+            video_id = data['project_id']
+            parts = {part['part']: part for part in parts_by_project[video_id]}
+            media = {number: self.media_cache.lookup(part['path'], part['duration']) for number, part in parts.items()}
+            if data['status'] == STATUS_GENERATING:
+                parent_status = VIDEO_STATUS['GENERATING']
+            elif data['status'] == STATUS_ERROR or not parts:
                 parent_status = VIDEO_STATUS['ERROR']
             else:
                 # Check if all files exist
-                all_exist = all(os.path.exists(f) for f in files)
-                any_exist = any(os.path.exists(f) for f in files)
-                
-                if all_exist:
+                existing = sum(info['exists'] for info in media.values())
+                if existing == len(parts):
                     parent_status = VIDEO_STATUS['GENERATED']
-                elif any_exist:
-                    parent_status = VIDEO_STATUS['MISSING'] + f" ({sum(os.path.exists(f) for f in files)}/{len(files)})"
+                elif existing:
+                    parent_status = VIDEO_STATUS['MISSING'] + f" ({existing}/{len(parts)})"
                 else:
                     parent_status = VIDEO_STATUS['MISSING']
 
-            parent_values = (
-                data.get('title', 'Unknown'),
-                data.get('date', ''),
-                parent_status,
-                data.get('length', ''),
-                data.get('parts', '1')
-            )
+            durations = [info['duration'] for info in media.values() if info['duration']]
+            if durations:
+                length = humanize.precisedelta(sum(durations))
+            else:
+                length = data['legacy_length'] or '-'
+            date = datetime.fromtimestamp(data['created_at']).strftime('%Y-%m-%d') if data['created_at'] else ''
+            total_parts = data['total_parts']
+            generating = data['status'] == STATUS_GENERATING
+            # Deleted parts leave gaps: list the recorded parts, plus the ones still to come while generating
+            part_numbers = sorted(set(parts) | (set(range(1, total_parts + 1)) if generating else set()))
+            parts_column = total_parts if generating or len(parts) == total_parts else f"{len(parts)}/{total_parts}"
             parent_iid = str(video_id)
-            self.videos_tree.insert('', 'end', iid=parent_iid, text=str(video_id), values=parent_values)
+            rows.append((parent_iid, '', parent_iid, (data['title'], date, parent_status, length, parts_column)))
             
-            total_parts = data.get('parts', len(files))
             if total_parts > 1:
-                for idx in range(1, total_parts + 1):
-                    # Determine status label and part length
-                    if idx <= len(files):
-                        file = files[idx-1]
-                        if os.path.exists(file):
-                            try:
-                                from moviepy.editor import VideoFileClip
-                                with VideoFileClip(file) as clip:
-                                    part_length = humanize.precisedelta(clip.duration)
-                                part_status = VIDEO_STATUS['GENERATED']
-                            except Exception:
-                                part_length = 'N/A'
-                                part_status = VIDEO_STATUS['ERROR']
-                        else:
-                            part_length = '-'
-                            part_status = VIDEO_STATUS['MISSING']
-                    else:
+                for idx in part_numbers:
+                    # Determine status label and part length from the recorded part
+                    info = media.get(idx)
+                    if info is None:
                         part_status = VIDEO_STATUS['GENERATING']
                         part_length = '-'
+                    elif info['exists']:
+                        part_status = VIDEO_STATUS['GENERATED']
+                        part_length = humanize.precisedelta(info['duration']) if info['duration'] else '-'
+                    else:
+                        part_length = '-'
+                        part_status = VIDEO_STATUS['MISSING']
                         
                     child_values = (
-                        f"{data.get('title', 'Unknown')} (Part {idx})",
-                        data.get('date', ''),
+                        f"{data['title']} (Part {idx})",
+                        date,
                         part_status,
                         part_length,
                         ''  # parts column empty for child rows
                     )
-                    child_iid = f"{parent_iid}_part_{idx}"
-                    self.videos_tree.insert(parent_iid, 'end', iid=child_iid, text="", values=child_values)
+                    rows.append((f"{parent_iid}_part_{idx}", parent_iid, "", child_values))
+        return rows
+
+    def apply_video_rows(self, rows, limit):
+        """Tk thread: diffs rows against the table and inserts, updates, moves or deletes only what changed"""
+        self.videos_refresh_running = False
+        if rows is not None:
+            self.videos_exhausted = sum(1 for row in rows if not row[1]) < limit
+            wanted = {row[0] for row in rows}
+            for iid in [iid for iid in self.video_rows if iid not in wanted]:
+                if self.videos_tree.exists(iid):
+                    self.videos_tree.delete(iid)
+                del self.video_rows[iid]
+
+            positions = {}
+            for iid, parent_iid, text, values in rows:
+                index = positions.get(parent_iid, 0)
+                positions[parent_iid] = index + 1
+                previous = self.video_rows.get(iid)
+                if previous is None or not self.videos_tree.exists(iid):
+                    self.videos_tree.insert(parent_iid, index, iid=iid, text=text, values=values)
+                else:
+                    if previous[2] != values:
+                        self.videos_tree.item(iid, values=values)
+                    if self.videos_tree.index(iid) != index:
+                        self.videos_tree.move(iid, parent_iid, index)
+                self.video_rows[iid] = (parent_iid, text, values)
+
+        if self.videos_refresh_pending:
+            self.start_videos_refresh()
+
+    def on_videos_scroll(self, first, last):
+        """Scrollbar callback: loads the next page once the end of the table is visible"""
+        self.videos_y_scrollbar.set(first, last)
+        if float(last) >= 1.0 and not self.videos_exhausted:
+            self.master.after_idle(self.load_more_videos)
 
     def open_selected_video(self, event=None):
         """Handler for the Open menu item and general video opening requests"""
@@ -658,16 +736,14 @@ class GuiApp:
             return
 
         # Group selections by parent ID to handle both parent and child selections
-        to_delete = {}  # {parent_id: [part_indices]}
+        to_delete = {}  # {parent_id: [part numbers]}
         for item in selections:
             if "_part_" in item:
                 # Child row
                 parent_id, part_str = item.split("_part_")
                 try:
-                    part_index = int(part_str) - 1
-                    if parent_id not in to_delete:
-                        to_delete[parent_id] = []
-                    to_delete[parent_id].append(part_index)
+                    if to_delete.get(parent_id, []) is not None:
+                        to_delete.setdefault(parent_id, []).append(int(part_str))
                 except ValueError:
                     continue
             else:
@@ -675,78 +751,27 @@ class GuiApp:
                 to_delete[item] = None  # None means delete all parts
 
         # Process deletions
-        for parent_id, part_indices in to_delete.items():
-            entry = self.videos_db.get(str(parent_id)) or self.videos_db.get(parent_id)
-            if not entry:
-                continue
-
-            if part_indices is None:
-                # Delete entire entry
-                for video_file in entry.get('files', []):
-                    if os.path.exists(video_file):
-                        try:
-                            os.remove(video_file)
-                            self.log_info(f"File deleted: {video_file}")
-                        except Exception as e:
-                            self.log_error(f"Error deleting {video_file}: {str(e)}")
-                self.videos_db.pop(str(parent_id), None)
-                self.videos_db.pop(parent_id, None)
-            else:
-                # Delete specific parts
-                files = entry.get('files', [])
-                # Sort indices in reverse order to avoid shifting issues
-                for idx in sorted(part_indices, reverse=True):
-                    if 0 <= idx < len(files):
-                        video_file = files[idx]
-                        if os.path.exists(video_file):
-                            try:
-                                os.remove(video_file)
-                                self.log_info(f"File deleted: {video_file}")
-                            except Exception as e:
-                                self.log_error(f"Error deleting {video_file}: {str(e)}")
-                        del files[idx]
-                
-                # Update entry
-                if files:
-                    entry['files'] = files
-                    entry['parts'] = len(files)
-                else:
-                    # If no files left, remove the entire entry
-                    self.videos_db.pop(str(parent_id), None)
-                    self.videos_db.pop(parent_id, None)
+        parts_by_project = self.catalog.get_parts(to_delete)
+        for parent_id, part_numbers in to_delete.items():
+            for part in parts_by_project[parent_id]:
+                if part_numbers is not None and part['part'] not in part_numbers:
+                    continue
+                video_file = part['path']
+                if os.path.exists(video_file):
+                    try:
+                        os.remove(video_file)
+                        self.log_info(f"File deleted: {video_file}")
+                    except Exception as e:
+                        self.log_error(f"Error deleting {video_file}: {str(e)}")
+                if part_numbers is not None:
+                    # The project row goes with its last part
+                    self.catalog.delete_part(parent_id, part['part'])
+            if part_numbers is None:
+                self.catalog.delete_project(parent_id)
 
-        # Save changes and refresh display
-        self.save_videos_db()
         self.refresh_videos_list()
         self.log_info("Selected entries deleted successfully.")
 
-    def add_video_to_db(self, project_id: str, title: str, output_files: list):
-        """Add a new video entry to the database"""
-        total_duration = 0
-        for video_file in output_files:
-            if os.path.exists(video_file):
-                try:
-                    from moviepy.editor import VideoFileClip
-                    with VideoFileClip(video_file) as clip:
-                        total_duration += clip.duration
-                except Exception as e:
-                    self.log_error(f"Failed to load file {video_file}: {e}")
-                    total_duration = 0
-                    break # Stop loading other files from list
-
-        video_data = {
-            'title': title,
-            'date': datetime.now().strftime('%Y-%m-%d'),
-            'status': 'Generated',
-            'length': humanize.precisedelta(total_duration),
-            'parts': len(output_files),
-            'files': output_files
-        }
-
-        self.videos_db[project_id] = video_data
-        self.save_videos_db()
-        self.master.after(0, self.refresh_videos_list)
-
     def add_subreddit(self):
         new_sub = self.new_subreddit_var.get().strip()
         if new_sub:
@@ -759,15 +784,20 @@ class GuiApp:
                 self.new_subreddit_var.set("")
                 self.log_info(f"Added new subreddit: {new_sub}")
 
-    def update_progress(self, progress: int, message: str = None):
-        """Update progress bars based on video writing progress"""
-        self.writing_progress = progress
-        self.master.after(0, lambda: self.part_progress.config(value=progress))  # Changed from segment_progress
-        if message:
-            self.master.after(0, lambda: self.set_status(message, "info"))
-            # Extract part information from message if available
-            if "part" in message.lower():
-                self.master.after(0, lambda: self.part_label.config(text=message))  # Update part label
+    def on_progress_event(self, event: ProgressEvent):
+        """Progress bus subscriber: events arrive already rate-limited, each becomes one Tk callback"""
+        def apply():
+            fraction = event.part_fraction if event.part_fraction is not None else event.fraction
+            self.part_progress.config(value=fraction * 100)
+            low, high = STAGE_PROGRESS_SPAN.get(event.stage, (30, 100))
+            self.overall_progress.config(value=low + (high - low) * event.fraction)
+            if event.part:
+                self.part_label.config(text=f"Part: {event.part}/{event.total_parts}")
+            if event.message:
+                self.status_label.config(text=f"Status: {event.message}", foreground=self.STYLES["info_fg"])
+            if event.eta is not None:
+                self.time_label.config(text=f"Estimated time remaining: {humanize.naturaldelta(event.eta)}")
+        self.master.after(0, apply)
 
     def setup_logging(self):
         class QueueHandler(logging.Handler):
@@ -824,10 +854,10 @@ class GuiApp:
         parent_id, part_str = item.split("_part_")
         try:
             part_index = int(part_str) - 1
-            entry = self.videos_db.get(str(parent_id)) or self.videos_db.get(parent_id)
+            part = self.catalog.get_part(parent_id, part_index + 1)
             
-            if entry and entry.get('files') and len(entry['files']) > part_index:
-                video_file = entry['files'][part_index]
+            if part:
+                video_file = part['path']
                 if os.path.exists(video_file):
                     try:
                         os.startfile(video_file)
@@ -0,0 +1,62 @@
+import os
+import json
+import random
+import logging
+from bisect import bisect_left, bisect_right
+from typing import List
+from ffmpeg_tools import probe_keyframes
+
+logger = logging.getLogger(__name__)
+
+def _sidecar_path(video_path: str) -> str:
+    return f"{video_path}.keyframes.json"
+
+def get_keyframes(video_path: str) -> List[float]:
+    """
+    Returns the sorted keyframe timestamps of video_path.
+    The index is built once with ffprobe and cached in a sidecar JSON file,
+    keyed by the video's size and mtime. Returns [] if probing fails.
+    """
+    stat = os.stat(video_path)
+    sidecar = _sidecar_path(video_path)
+    if os.path.exists(sidecar):
+        try:
+            with open(sidecar, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+            if cached.get("size") == stat.st_size and cached.get("mtime") == stat.st_mtime:
+                return cached["keyframes"]
+        except (json.JSONDecodeError, OSError, KeyError):
+            pass
+
+    logger.info(f"Building keyframe index for {video_path}")
+    try:
+        keyframes = probe_keyframes(video_path)
+    except Exception as e:
+        logger.warning(f"Could not index keyframes of {video_path}: {e}")
+        return []
+
+    try:
+        with open(sidecar, "w", encoding="utf-8") as f:
+            json.dump({"size": stat.st_size, "mtime": stat.st_mtime, "keyframes": keyframes}, f)
+    except OSError as e:
+        logger.warning(f"Could not write keyframe index {sidecar}: {e}")
+    logger.info(f"Indexed {len(keyframes)} keyframes")
+    return keyframes
+
+def snap_to_keyframe(t: float, keyframes: List[float], max_start: float) -> float:
+    """Nearest keyframe to t that is not after max_start (t itself if there is none)."""
+    upper = bisect_right(keyframes, max_start)
+    if upper == 0:
+        return t
+    index = bisect_left(keyframes, t, 0, upper)
+    candidates = keyframes[max(index - 1, 0):min(index + 1, upper)]
+    return min(candidates, key=lambda keyframe: abs(keyframe - t))
+
+def choose_start_time(max_start: float, keyframes: List[float]) -> float:
+    """Random start time in [0, max_start], snapped to a keyframe when the index is available."""
+    if max_start <= 0:
+        return 0
+    start_time = random.uniform(0, max_start)
+    if keyframes:
+        start_time = snap_to_keyframe(start_time, keyframes, max_start)
+    return start_time
@@ -1,10 +1,16 @@
 import os
 import re
 import logging
+import argparse
 from typing import List
 from reddit_story import get_story
+from story_history import get_story_history
+from project_manifest import ProjectManifest
 from story_video_generator import process_story_video
-from config import BASE_VIDEO, OUTPUT_DIR
+from background_library import get_background_library
+from progress_bus import ProgressBus, log_progress
+from tracing import start_trace
+from config import OUTPUT_DIR, SUBREDDIT, ENCODING_PROFILES, ENCODING_PROFILE, PROJECT_RETRIES, get_project_dirs
 
 # Configure logging
 logging.basicConfig(
@@ -33,39 +39,67 @@ def find_next_project_id(title: str, output_dir: str = OUTPUT_DIR) -> str:
         counter += 1
     return project_id
 
-def main(subreddit: str, project_id: str, selected_voice: str = "random") -> None:
-    """Main execution function that orchestrates the video generation process."""
+def load_resumable_project(project_id: str) -> dict:
+    """Job recorded in the manifest of an existing project (title, story, subreddit, voice...)."""
+    job = ProjectManifest(get_project_dirs(project_id)['project']).job
+    if not job.get('story'):
+        raise RuntimeError(f"Project {project_id} has no checkpoint to resume from")
+    return job
+
+def main(subreddit: str, project_id: str, selected_voice: str = "random", encoding_profile: str = None, progress_bus: ProgressBus = None,
+         resume: bool = False) -> None:
+    """
+    Main execution function that orchestrates the video generation process.
+    With resume, project_id names an existing project whose story is taken
+    from its manifest instead of Reddit, and only its unfinished parts are made.
+    """
+    tracer = start_trace()  # spans of this job, written to <project>/trace.json by process_story_video
     try:
-        max_attempts = 3
-        for attempt in range(max_attempts):
-            try:
-                # First get the story
-                title, story, history = get_story(subreddit, project_id)
-                # Then generate project ID from title
-                project_id = find_next_project_id(title)
-                break
-            except RuntimeError as e:
-                if "No unused stories found" in str(e):
-                    if attempt == max_attempts - 1:
-                        raise RuntimeError("No new stories available after maximum attempts")
-                    logger.warning(f"Attempt {attempt + 1}: No unused stories found, retrying...")
-                    continue
-                raise
+        if resume:
+            job = load_resumable_project(project_id)
+            title, story, history = job['title'], job['story'], get_story_history()
+            subreddit = job.get('subreddit') or subreddit
+        else:
+            max_attempts = 3
+            for attempt in range(max_attempts):
+                try:
+                    # First get the story
+                    title, story, history = get_story(subreddit, project_id)
+                    # Then generate project ID from title
+                    project_id = find_next_project_id(title)
+                    break
+                except RuntimeError as e:
+                    if "No unused stories found" in str(e):
+                        if attempt == max_attempts - 1:
+                            raise RuntimeError("No new stories available after maximum attempts")
+                        logger.warning(f"Attempt {attempt + 1}: No unused stories found, retrying...")
+                        continue
+                    raise
 
         word_count = len(story.split())
         logger.info(f"Fetched story: {word_count} words")
         logger.info(f"Title: {title}")
 
-        if not os.path.isfile(BASE_VIDEO):
-            raise FileNotFoundError(f"Base video not found at {BASE_VIDEO}")
+        # Fails before any TTS when the background library has no clip
+        get_background_library().longest_duration()
 
-        logger.info(f"Starting new project with ID: {project_id}")
+        logger.info(f"{'Resuming' if resume else 'Starting new'} project with ID: {project_id}")
 
-        # Generate the video using the selected voice
-        output_videos = process_story_video(BASE_VIDEO, title, story, project_id, voice=selected_voice)
+        # Generate the video using the selected voice; a failed attempt is resumed, not restarted
+        for attempt in range(PROJECT_RETRIES + 1):
+            try:
+                output_videos = process_story_video(None, title, story, project_id, voice=selected_voice,
+                                                    encoding_profile=encoding_profile, subreddit=subreddit,
+                                                    progress_bus=progress_bus, tracer=tracer)
+                break
+            except RuntimeError as e:
+                if attempt == PROJECT_RETRIES:
+                    logger.error(f"Project {project_id} failed, resume it with --resume {project_id}")
+                    raise
+                logger.warning(f"Attempt {attempt + 1} failed ({e}), resuming project {project_id}")
         
         # Si on arrive ici, la génération a réussi, on peut mettre à jour l'historique
-        history.add_story(title)
+        history.add_story(title, text=story)
         logger.info(f"Story '{title}' added to history")
         
         logger.info(f"Successfully generated {len(output_videos)} video parts")
@@ -100,7 +134,7 @@ def generate_video(self, selected_voice):
 
         # Process video with the correct project_id
         output_files = process_story_video(
-            BASE_VIDEO,
+            None,
             title,
             story,
             project_id,
@@ -128,8 +162,15 @@ def generate_video(self, selected_voice):
         self.log_info(f"Error during video generation: {str(e)}")
 
 if __name__ == "__main__":
-    subreddit = "funnystories"  # Replace with desired subreddit
-    project_id = "temp"  # Replace with desired project_id
-    selected_voice = "random"  # Replace with desired voice
-    main(subreddit, project_id, selected_voice)
-
+    parser = argparse.ArgumentParser(description="Generate a video from a Reddit story")
+    parser.add_argument("--subreddit", default=SUBREDDIT, help="Subreddit to fetch the story from")
+    parser.add_argument("--voice", default="random", help="TTS voice name, or 'random'")
+    parser.add_argument("--profile", choices=list(ENCODING_PROFILES), default=ENCODING_PROFILE,
+                        help="Encoding profile (draft, standard, archive)")
+    parser.add_argument("--resume", metavar="PROJECT_ID",
+                        help="Finish an existing project from its checkpoints instead of fetching a new story")
+    args = parser.parse_args()
+    project_id = args.resume or "temp"  # "temp" is replaced by an id derived from the story title
+    progress_bus = ProgressBus()
+    progress_bus.subscribe(log_progress, max_rate_hz=1)  # one console line per second is plenty
+    main(args.subreddit, project_id, args.voice, args.profile, progress_bus, resume=bool(args.resume))
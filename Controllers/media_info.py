@@ -0,0 +1,35 @@
+import os
+import threading
+from typing import Dict, Optional, Tuple
+from ffmpeg_tools import probe_duration
+
+class MediaInfoCache:
+    """
+    File status and duration of output videos, keyed by (path, mtime, size).
+    A file is stat'ed once per lookup and only probed with ffprobe when no
+    duration is known and the file changed since it was last seen.
+    Safe to use from background threads.
+    """
+
+    def __init__(self):
+        self._entries: Dict[Tuple[str, float, int], Optional[float]] = {}
+        self._lock = threading.Lock()
+
+    def lookup(self, path: str, known_duration: Optional[float] = None) -> dict:
+        """{'exists': bool, 'duration': seconds or None} for path."""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return {'exists': False, 'duration': None}
+        key = (path, stat.st_mtime, stat.st_size)
+        with self._lock:
+            if key in self._entries:
+                return {'exists': True, 'duration': self._entries[key]}
+        duration = known_duration if known_duration is not None else probe_duration(path)
+        with self._lock:
+            self._entries[key] = duration
+        return {'exists': True, 'duration': duration}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
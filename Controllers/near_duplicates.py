@@ -0,0 +1,97 @@
+import re
+import zlib
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+MAX_HASH = np.uint32(0xFFFFFFFF)
+# Odd multipliers mixing the word hashes of a shingle
+SHINGLE_MIXERS = (np.uint32(0x9E3779B1), np.uint32(0x85EBCA77), np.uint32(0xC2B2AE3D))
+NON_WORD = re.compile(r"[^a-z0-9\s]")
+
+def normalize_story(text: str) -> str:
+    """Lowercases, drops punctuation and collapses whitespace, so edits to formatting don't matter."""
+    return " ".join(NON_WORD.sub(" ", text.lower()).split())
+
+def shingle_hashes(text: str, size: int = 3) -> np.ndarray:
+    """
+    Unique 32-bit hashes of the word size-grams of the normalized text.
+    Each word is hashed once and the grams are mixed from the word hashes
+    with wrapping uint32 arithmetic.
+    """
+    words = normalize_story(text).split()
+    word_hashes = np.fromiter((zlib.crc32(word.encode("utf-8")) for word in words), dtype=np.uint32, count=len(words))
+    size = max(1, min(size, len(word_hashes)))
+    count = len(word_hashes) - size + 1
+    if count <= 0:
+        return word_hashes
+    hashes = np.zeros(count, dtype=np.uint32)
+    for offset in range(size):
+        hashes = hashes * SHINGLE_MIXERS[offset % len(SHINGLE_MIXERS)] + word_hashes[offset:offset + count]
+    return np.unique(hashes)
+
+def lsh_params(num_perm: int, threshold: float, recall: float = 0.95) -> Tuple[int, int]:
+    """
+    (bands, rows) for LSH banding of num_perm hash values: the most rows per
+    band (fewest false candidates) that still make a pair at exactly
+    threshold similarity share a bucket with probability >= recall.
+    """
+    for rows in range(num_perm, 0, -1):
+        bands = num_perm // rows
+        if 1 - (1 - threshold ** rows) ** bands >= recall:
+            return bands, rows
+    return num_perm, 1
+
+class MinHashIndex:
+    """
+    MinHash signatures of story texts, bucketed with LSH banding. A query
+    hashes its bands, looks up the buckets and confirms candidates with the
+    estimated Jaccard similarity, so it costs a few dict lookups no matter
+    how large the index grows.
+    """
+
+    def __init__(self, threshold: float = 0.8, num_perm: int = 128, seed: int = 1):
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands, self.rows = lsh_params(num_perm, threshold)
+        # Fixed seed: signatures stored on disk stay comparable between runs
+        generator = np.random.RandomState(seed)
+        # Odd multipliers: x -> a * x + b (mod 2**32) is then a permutation of the 32-bit hashes
+        self._a = generator.randint(0, 1 << 32, size=num_perm, dtype=np.uint64).astype(np.uint32) | np.uint32(1)
+        self._b = generator.randint(0, 1 << 32, size=num_perm, dtype=np.uint64).astype(np.uint32)
+        self._buckets: List[Dict[bytes, List[int]]] = [{} for _ in range(self.bands)]
+        self._signatures: Dict[int, np.ndarray] = {}
+
+    def signature(self, text: str) -> np.ndarray:
+        """MinHash signature (num_perm uint32 values) of text."""
+        hashes = shingle_hashes(text)
+        if hashes.size == 0:
+            return np.full(self.num_perm, MAX_HASH, dtype=np.uint32)
+        return (np.multiply.outer(hashes, self._a) + self._b).min(axis=0)
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [signature[band * self.rows:(band + 1) * self.rows].tobytes() for band in range(self.bands)]
+
+    def add(self, key: int, signature: np.ndarray) -> None:
+        """Indexes a signature under key."""
+        self._signatures[key] = signature
+        for bucket, band_key in zip(self._buckets, self._band_keys(signature)):
+            bucket.setdefault(band_key, []).append(key)
+
+    def query(self, signature: np.ndarray) -> Optional[Tuple[int, float]]:
+        """(key, similarity) of the closest indexed story at or above the threshold, or None."""
+        candidates = set()
+        for bucket, band_key in zip(self._buckets, self._band_keys(signature)):
+            candidates.update(bucket.get(band_key, ()))
+        best = None
+        for key in candidates:
+            similarity = float(np.mean(self._signatures[key] == signature))
+            if similarity >= self.threshold and (best is None or similarity > best[1]):
+                best = (key, similarity)
+        return best
+
+    def clear(self) -> None:
+        self._buckets = [{} for _ in range(self.bands)]
+        self._signatures.clear()
+
+    def __len__(self) -> int:
+        return len(self._signatures)
@@ -0,0 +1,131 @@
+import time
+import logging
+import threading
+from typing import Callable, Dict, List, NamedTuple, Optional
+from config import PROGRESS_MAX_RATE_HZ
+
+logger = logging.getLogger(__name__)
+
+class ProgressEvent(NamedTuple):
+    stage: str                      # 'tts', 'background', 'render'
+    fraction: float                 # progress of the whole stage, 0.0 - 1.0
+    part: Optional[int] = None      # part being worked on, when the stage runs part by part
+    total_parts: Optional[int] = None
+    part_fraction: Optional[float] = None
+    eta: Optional[float] = None     # seconds left in the stage, once it can be estimated
+    message: str = ""
+
+class _Subscription:
+    """Delivers the latest event to one callback at most max_rate_hz times per second."""
+
+    def __init__(self, callback: Callable[[ProgressEvent], None], max_rate_hz: float):
+        self.callback = callback
+        self.interval = 1.0 / max_rate_hz if max_rate_hz > 0 else 0.0
+        self.last_emit = 0.0
+        self.pending: Optional[ProgressEvent] = None
+        self.timer: Optional[threading.Timer] = None
+        self.lock = threading.Lock()
+
+    def offer(self, event: ProgressEvent, force: bool) -> None:
+        with self.lock:
+            now = time.monotonic()
+            wait = self.last_emit + self.interval - now
+            if force or wait <= 0:
+                # Anything still pending is superseded by this event
+                self.pending = None
+                self.last_emit = now
+            else:
+                self.pending = event
+                if self.timer is None:
+                    # Trailing delivery so the last value of a burst is never lost
+                    self.timer = threading.Timer(wait, self.flush)
+                    self.timer.daemon = True
+                    self.timer.start()
+                return
+        self._deliver(event)
+
+    def flush(self) -> None:
+        with self.lock:
+            event, self.pending, self.timer = self.pending, None, None
+            if event is None:
+                return
+            self.last_emit = time.monotonic()
+        self._deliver(event)
+
+    def cancel(self) -> None:
+        with self.lock:
+            if self.timer is not None:
+                self.timer.cancel()
+            self.timer = None
+            self.pending = None
+
+    def _deliver(self, event: ProgressEvent) -> None:
+        try:
+            self.callback(event)
+        except Exception as e:
+            logger.warning(f"Progress subscriber failed: {e}")
+
+class ProgressBus:
+    """
+    Fan-out of render progress to subscribers (GUI, CLI, callbacks).
+    publish() is cheap enough to call on every encoded frame: each subscriber
+    only sees the newest event, at most max_rate_hz times per second.
+    Stage changes, stage completion and part changes are always delivered.
+    """
+
+    def __init__(self, max_rate_hz: float = PROGRESS_MAX_RATE_HZ):
+        self.max_rate_hz = max_rate_hz
+        self._subscriptions: List[_Subscription] = []
+        self._stage_started: Dict[str, float] = {}
+        self._last_key = None
+        self._lock = threading.Lock()
+
+    def subscribe(self, callback: Callable[[ProgressEvent], None], max_rate_hz: Optional[float] = None) -> Callable[[ProgressEvent], None]:
+        """Registers callback(event); max_rate_hz overrides the bus rate for this subscriber."""
+        with self._lock:
+            self._subscriptions.append(_Subscription(callback, self.max_rate_hz if max_rate_hz is None else max_rate_hz))
+        return callback
+
+    def unsubscribe(self, callback: Callable[[ProgressEvent], None]) -> None:
+        with self._lock:
+            for subscription in [s for s in self._subscriptions if s.callback is callback]:
+                subscription.cancel()
+                self._subscriptions.remove(subscription)
+
+    def publish(self, stage: str, fraction: float, part: Optional[int] = None, total_parts: Optional[int] = None,
+                part_fraction: Optional[float] = None, message: str = "") -> None:
+        """Publishes the current progress of stage; the ETA is derived from the stage's start time."""
+        now = time.monotonic()
+        fraction = min(max(fraction, 0.0), 1.0)
+        with self._lock:
+            started = self._stage_started.setdefault(stage, now)
+            key = (stage, part)
+            # A new stage or part is a milestone subscribers should not miss
+            force = key != self._last_key or fraction >= 1.0
+            self._last_key = key
+            subscriptions = list(self._subscriptions)
+        eta = (now - started) * (1 - fraction) / fraction if fraction > 0.01 else None
+        event = ProgressEvent(stage, fraction, part, total_parts, part_fraction, eta, message)
+        for subscription in subscriptions:
+            subscription.offer(event, force)
+
+    def flush(self) -> None:
+        """Delivers pending events right away (e.g. before reporting completion)."""
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            subscription.flush()
+
+    def close(self) -> None:
+        """Flushes and drops every subscriber."""
+        self.flush()
+        with self._lock:
+            for subscription in self._subscriptions:
+                subscription.cancel()
+            self._subscriptions.clear()
+
+def log_progress(event: ProgressEvent) -> None:
+    """Console subscriber for the CLI entry points."""
+    where = f" part {event.part}/{event.total_parts}" if event.part else ""
+    eta = f", about {event.eta:.0f}s left" if event.eta is not None else ""
+    logger.info(f"[{event.stage}]{where} {event.fraction * 100:.0f}%{eta} {event.message}".rstrip())
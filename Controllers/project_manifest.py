@@ -0,0 +1,130 @@
+import os
+import json
+import time
+import hashlib
+import logging
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILENAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+# Stages of one part, in pipeline order: each stage's key includes the previous stage's outputs
+STAGES = ("script", "audio", "subtitles", "video")
+
+def hash_text(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def hash_file(path: str) -> str:
+    """sha256 of a file's content, read in 1 MB chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def stage_key(*inputs) -> str:
+    """Hash of everything a stage's output depends on."""
+    return hash_text(json.dumps(inputs, sort_keys=True, default=str))
+
+class ProjectManifest:
+    """
+    Checkpoint file (manifest.json) of a project directory. For every part it
+    records which stages finished, the key of their inputs and the content
+    hash of the files they wrote, so a re-run of the project only redoes the
+    stages whose inputs changed or whose files are missing or modified.
+    """
+
+    def __init__(self, project_dir: str):
+        self.project_dir = project_dir
+        self.path = os.path.join(project_dir, MANIFEST_FILENAME)
+        self.data = {'version': MANIFEST_VERSION, 'job': {}, 'parts': {}}
+        self.load()
+
+    def load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (json.JSONDecodeError, OSError) as e:
+            logger.warning(f"Ignoring unreadable manifest {self.path}: {e}")
+            return
+        if data.get('version') == MANIFEST_VERSION:
+            self.data = data
+
+    def save(self) -> None:
+        os.makedirs(self.project_dir, exist_ok=True)
+        self.data['job']['updated_at'] = time.time()
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.data, f, indent=1)
+        os.replace(tmp_path, self.path)
+
+    @property
+    def job(self) -> dict:
+        """Title, story and settings of the job, as given to begin()."""
+        return self.data['job']
+
+    def begin(self, title: str, story: str, **job) -> bool:
+        """
+        Starts or resumes the job. Checkpoints of another story are dropped.
+        Returns True when completed stages of this story were found.
+        """
+        story_hash = hash_text(f"{title}\n\n{story}")
+        resumed = self.job.get('story_hash') == story_hash and bool(self.data['parts'])
+        if not resumed:
+            self.data['parts'] = {}
+            self.data['job'] = {'created_at': time.time()}
+        self.job.update(job, title=title, story=story, story_hash=story_hash)
+        self.save()
+        return resumed
+
+    def set_total_parts(self, total_parts: int) -> None:
+        """Records the part count; parts past it are left over from a different split of the story."""
+        # Part 0 holds the whole-story stages (see story_video_generator.plan_story_speech)
+        self.data['parts'] = {part: stages for part, stages in self.data['parts'].items() if int(part) <= total_parts}
+        self.job['total_parts'] = total_parts
+        self.save()
+
+    def _file_record(self, path: str) -> dict:
+        stat = os.stat(path)
+        return {'sha256': hash_file(path), 'size': stat.st_size, 'mtime': stat.st_mtime}
+
+    def _file_matches(self, relative_path: str, record: dict) -> bool:
+        path = os.path.join(self.project_dir, relative_path)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return False
+        if stat.st_size != record['size']:
+            return False
+        # Same size and mtime: trust the recorded hash instead of re-reading large videos
+        return stat.st_mtime == record['mtime'] or hash_file(path) == record['sha256']
+
+    def complete(self, part: int, stage: str, key: str, files: List[str], **info) -> dict:
+        """Records a finished stage of part: its input key, the hashes of files and extra info."""
+        entry = dict(info, key=key, files={
+            os.path.relpath(path, self.project_dir): self._file_record(path) for path in files
+        })
+        self.data['parts'].setdefault(str(part), {})[stage] = entry
+        # Later stages were built from the previous output of this one
+        for later in STAGES[STAGES.index(stage) + 1:]:
+            self.data['parts'][str(part)].pop(later, None)
+        self.save()
+        return entry
+
+    def completed(self, part: int, stage: str, key: str) -> Optional[dict]:
+        """The stage's entry if it finished with this input key and its files are intact, else None."""
+        entry = self.data['parts'].get(str(part), {}).get(stage)
+        if entry is None or entry['key'] != key:
+            return None
+        if not all(self._file_matches(path, record) for path, record in entry['files'].items()):
+            logger.info(f"Part {part}: files of the '{stage}' stage changed, redoing it")
+            return None
+        return entry
+
+    def file_hash(self, entry: dict) -> Dict[str, str]:
+        """Content hashes of an entry's files, keyed by path relative to the project directory."""
+        return {path: record['sha256'] for path, record in entry['files'].items()}
@@ -0,0 +1,68 @@
+import os
+import json
+import hashlib
+import logging
+from typing import Optional
+from config import PROXY_CACHE_DIR, PROXY_PROFILE
+from ffmpeg_tools import run_ffmpeg
+
+logger = logging.getLogger(__name__)
+
+# Bytes hashed from each end of the source; enough to tell files apart without reading gigabytes
+FINGERPRINT_CHUNK = 4 * 1024 * 1024
+
+def source_fingerprint(path: str) -> str:
+    """Hash of the file size plus its first and last FINGERPRINT_CHUNK bytes."""
+    size = os.path.getsize(path)
+    digest = hashlib.sha256(str(size).encode("utf-8"))
+    with open(path, "rb") as f:
+        digest.update(f.read(FINGERPRINT_CHUNK))
+        if size > FINGERPRINT_CHUNK:
+            f.seek(max(size - FINGERPRINT_CHUNK, FINGERPRINT_CHUNK))
+            digest.update(f.read(FINGERPRINT_CHUNK))
+    return digest.hexdigest()
+
+def proxy_path(source: str, profile: dict = PROXY_PROFILE, cache_dir: str = PROXY_CACHE_DIR,
+               fingerprint: Optional[str] = None) -> str:
+    """
+    Cache location of the proxy for source, keyed by source hash and output
+    profile. fingerprint is source_fingerprint(source) when already known.
+    """
+    key = hashlib.sha256(
+        ((fingerprint or source_fingerprint(source)) + json.dumps(profile, sort_keys=True)).encode("utf-8")
+    ).hexdigest()[:16]
+    base_name = os.path.splitext(os.path.basename(source))[0]
+    return os.path.join(cache_dir, f"{base_name}_{profile['width']}x{profile['height']}_{profile['fps']}fps_{key}.mp4")
+
+def get_proxy(source: str, profile: dict = PROXY_PROFILE, cache_dir: str = PROXY_CACHE_DIR,
+              fingerprint: Optional[str] = None) -> str:
+    """
+    Returns a proxy of source transcoded once to the output geometry:
+    scaled and center-cropped to width x height, resampled to fps, short GOP,
+    no audio. Later calls reuse the cached file.
+    """
+    target = proxy_path(source, profile, cache_dir, fingerprint)
+    if os.path.exists(target):
+        return target
+
+    os.makedirs(cache_dir, exist_ok=True)
+    width, height, fps = profile['width'], profile['height'], profile['fps']
+    logger.info(f"Building {width}x{height}@{fps} proxy for {source}")
+    # Write to a temporary name so parallel jobs never pick up a half-written proxy
+    tmp_target = f"{os.path.splitext(target)[0]}.{os.getpid()}.tmp.mp4"
+    args = [
+        "-i", os.path.abspath(source), "-an",
+        "-vf", f"scale={width}:{height}:force_original_aspect_ratio=increase,crop={width}:{height},fps={fps}",
+        "-c:v", "libx264", "-preset", profile.get('preset', 'veryfast'), "-crf", str(profile.get('crf', 18)),
+        "-g", str(profile['gop']), "-keyint_min", str(profile['gop']), "-sc_threshold", "0",
+        "-pix_fmt", "yuv420p",
+        tmp_target
+    ]
+    try:
+        run_ffmpeg(args)
+        os.replace(tmp_target, target)
+    finally:
+        if os.path.exists(tmp_target):
+            os.remove(tmp_target)
+    logger.info(f"Proxy ready: {target}")
+    return target
@@ -0,0 +1,120 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+import requests
+from requests.adapters import HTTPAdapter
+from config import USER_AGENT, REDDIT_BASE_URL, REDDIT_PAGE_SIZE, REDDIT_MAX_PAGES
+from tracing import get_tracer, span, start_trace
+
+logger = logging.getLogger(__name__)
+
+class RedditFetcher:
+    """
+    Listing fetcher sharing one keep-alive requests.Session.
+    Pages through listings with the `after` cursor and revalidates pages it
+    has already seen with ETag / Last-Modified, so unchanged listings come
+    back as 304 and are served from memory.
+    """
+
+    def __init__(self, base_url: str = REDDIT_BASE_URL, page_size: int = REDDIT_PAGE_SIZE,
+                 max_pages: int = REDDIT_MAX_PAGES, timeout: float = 10, pool_size: int = 8):
+        self.base_url = base_url.rstrip("/")
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers['User-Agent'] = USER_AGENT
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        # url -> {'etag', 'last_modified', 'body'} of the last 200 response
+        self._validators: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self.requests_made = 0
+        self.not_modified = 0
+
+    def fetch_listing(self, subreddit: str, after: Optional[str] = None) -> dict:
+        """
+        Fetches one page of r/subreddit/hot.json.
+
+        Raises:
+            requests.RequestException: If the request fails
+        """
+        url = f"{self.base_url}/r/{subreddit}/hot.json?limit={self.page_size}"
+        if after:
+            url += f"&after={after}"
+
+        headers = {}
+        with self._lock:
+            cached = self._validators.get(url)
+        if cached:
+            if cached.get('etag'):
+                headers['If-None-Match'] = cached['etag']
+            if cached.get('last_modified'):
+                headers['If-Modified-Since'] = cached['last_modified']
+
+        with span("reddit.fetch", category="reddit", subreddit=subreddit, after=after) as fetch_span:
+            response = self.session.get(url, headers=headers, timeout=self.timeout)
+            fetch_span.set(status=response.status_code, bytes=len(response.content))
+        with self._lock:
+            self.requests_made += 1
+            if response.status_code == 304 and cached:
+                self.not_modified += 1
+                return cached['body']
+        response.raise_for_status()
+
+        body = response.json()
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if etag or last_modified:
+            with self._lock:
+                self._validators[url] = {'etag': etag, 'last_modified': last_modified, 'body': body}
+        return body
+
+    def collect_candidates(self, subreddit: str, needed: int, is_eligible: Callable[[dict], bool]) -> List[dict]:
+        """
+        Pages through the listing until needed eligible posts are found, the
+        listing ends, or max_pages is reached. Returns Reddit post data dicts.
+        """
+        candidates = []
+        after = None
+        for _ in range(self.max_pages):
+            data = self.fetch_listing(subreddit, after).get("data", {})
+            for post in data.get("children", []):
+                post_data = post.get("data", {})
+                if is_eligible(post_data):
+                    candidates.append(post_data)
+            after = data.get("after")
+            if len(candidates) >= needed or not after:
+                break
+        return candidates
+
+    def collect_many(self, subreddits: List[str], needed: int, is_eligible: Callable[[dict], bool]) -> Dict[str, List[dict]]:
+        """
+        Runs collect_candidates for several subreddits in parallel.
+        A subreddit that fails to fetch is logged and maps to an empty list.
+        """
+        tracer = get_tracer()
+
+        def collect(subreddit: str) -> List[dict]:
+            start_trace(tracer)  # the fetch spans belong to the caller's job
+            try:
+                return self.collect_candidates(subreddit, needed, is_eligible)
+            except requests.RequestException as e:
+                logger.error(f"Failed to fetch r/{subreddit}: {e}")
+                return []
+
+        if not subreddits:
+            return {}
+        with ThreadPoolExecutor(max_workers=len(subreddits)) as executor:
+            return dict(zip(subreddits, executor.map(collect, subreddits)))
+
+_default_fetcher: Optional[RedditFetcher] = None
+
+def get_fetcher() -> RedditFetcher:
+    """Returns the process-wide fetcher, so every caller shares its session and validators."""
+    global _default_fetcher
+    if _default_fetcher is None:
+        _default_fetcher = RedditFetcher()
+    return _default_fetcher
@@ -1,16 +1,100 @@
 import os
 import logging
-from typing import Tuple
+import threading
+from typing import Dict, List, Optional, Set, Tuple
 import requests
-import random
-from config import USER_AGENT, get_project_dirs
-from story_history import StoryHistory
+from config import get_project_dirs, STORY_POOL_LOW_WATERMARK, STORY_POOL_REFILL_SIZE
+from reddit_fetcher import get_fetcher
+from tracing import get_tracer, span, start_trace
+from story_history import StoryHistory, get_story_history
+from story_pool import StoryPool
 
 logger = logging.getLogger(__name__)
 
+MIN_WORDS_REQUIRED = 150  # approximates to a 60 sec speech at 150 wpm
+CANDIDATES_WANTED = 10  # unused stories to gather per listing fetch
+
+def is_eligible_post(post_data: dict, history: StoryHistory) -> bool:
+    """True if a post has a story body, is unused and is long enough to narrate."""
+    title = post_data.get("title", "")
+    story_text = post_data.get("selftext", "")
+    # Check if unused and has content
+    if not story_text or not post_data.get("id") or history.is_story_used(title, post_data.get("id"), story_text):
+        return False
+    total_words = len(title.split()) + len(story_text.split())
+    if total_words < MIN_WORDS_REQUIRED:
+        logger.info(f"Skipping story '{title}' (only {total_words} words)")
+        return False
+    return True
+
+def fetch_candidates(subreddit: str, history: StoryHistory, needed: int = CANDIDATES_WANTED) -> List[dict]:
+    """
+    Pages through the hot listing of a subreddit until needed unused posts
+    that are long enough to narrate are found. Returns Reddit post data dicts.
+    
+    Raises:
+        requests.RequestException: If the listing cannot be fetched
+    """
+    return get_fetcher().collect_candidates(subreddit, needed, lambda post: is_eligible_post(post, history))
+
+def fetch_candidates_many(subreddits: List[str], history: StoryHistory, needed: int = CANDIDATES_WANTED) -> Dict[str, List[dict]]:
+    """fetch_candidates for several subreddits in parallel (failed subreddits map to [])."""
+    return get_fetcher().collect_many(subreddits, needed, lambda post: is_eligible_post(post, history))
+
+_pool: Optional[StoryPool] = None
+_refilling: Set[str] = set()
+_refill_lock = threading.Lock()
+
+def get_story_pool() -> StoryPool:
+    """Returns the process-wide candidate pool."""
+    global _pool
+    if _pool is None:
+        _pool = StoryPool()
+    return _pool
+
+def refill_pool(subreddit: str) -> int:
+    """Fetches fresh candidates for subreddit into the pool. Returns how many were stored."""
+    added = get_story_pool().add(subreddit, fetch_candidates(subreddit, get_story_history(), STORY_POOL_REFILL_SIZE))
+    logger.info(f"Story pool: added {added} candidate(s) from r/{subreddit}")
+    return added
+
+def refill_pool_async(subreddit: str) -> None:
+    """Refills the pool for subreddit on a background thread, at most one refill per subreddit at a time."""
+    with _refill_lock:
+        if subreddit in _refilling:
+            return
+        _refilling.add(subreddit)
+    tracer = get_tracer()
+
+    def refill() -> None:
+        start_trace(tracer)  # the refill is recorded in the trace of the job that triggered it
+        try:
+            with tracer.span("pool.refill", category="reddit", subreddit=subreddit) as refill_span:
+                refill_span.set(added=refill_pool(subreddit))
+        except Exception as e:
+            logger.warning(f"Background refill of r/{subreddit} failed: {e}")
+        finally:
+            with _refill_lock:
+                _refilling.discard(subreddit)
+
+    threading.Thread(target=refill, name=f"pool-refill-{subreddit}", daemon=True).start()
+
+def save_raw_story(title: str, story_text: str, project_id: str) -> str:
+    """Writes the fetched story to the project's script directory. Returns the file path."""
+    dirs = get_project_dirs(project_id)
+    script_dir = dirs['script']
+    os.makedirs(script_dir, exist_ok=True)
+    story_file = os.path.join(script_dir, "raw_story.txt")
+    
+    with open(story_file, "w", encoding="utf-8") as f:
+        f.write(f"{title}\n\n{story_text}")
+    return story_file
+
 def get_story(subreddit: str, project_id: str, max_attempts: int = 10) -> Tuple[str, str, StoryHistory]:
     """
-    Fetches a random unused story from specified subreddit.
+    Takes a random unused story for the subreddit from the local story pool,
+    fetching from Reddit only when the pool is empty. The pool is refilled
+    in the background once it drops below STORY_POOL_LOW_WATERMARK.
     
     Args:
         subreddit: Name of the subreddit to fetch from
@@ -25,47 +109,37 @@ def get_story(subreddit: str, project_id: str, max_attempts: int = 10) -> Tuple[
     """
     logger.info(f"Fetching story from r/{subreddit}")
     
-    headers = {'User-Agent': USER_AGENT}
-    url = f"https://www.reddit.com/r/{subreddit}/hot.json?limit=25"
-    history = StoryHistory()
+    history = get_story_history()
+    pool = get_story_pool()
     
     try:
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
+        with span("history.check", category="reddit", subreddit=subreddit, source="pool") as check_span:
+            chosen = pool.take(subreddit, lambda post: history.is_story_used(post["title"], post["id"], post["selftext"]))
+            check_span.set(found=chosen is not None)
+        if chosen is None:
+            # Cold or exhausted pool: this request has to wait for Reddit
+            with span("reddit.candidates", category="reddit", subreddit=subreddit) as fetch_span:
+                candidates = fetch_candidates(subreddit, history, STORY_POOL_REFILL_SIZE)
+                fetch_span.set(candidates=len(candidates))
+            pool.add(subreddit, candidates)
+            with span("history.check", category="reddit", subreddit=subreddit, source="reddit") as check_span:
+                chosen = pool.take(subreddit, lambda post: history.is_story_used(post["title"], post["id"], post["selftext"]))
+                check_span.set(found=chosen is not None)
         
-        valid_posts = []
-        MIN_WORDS_REQUIRED = 150  # approximates to a 60 sec speech at 150 wpm
-        if response.status_code == 200:
-            data = response.json().get("data", {}).get("children", [])
-            for post in data:
-                post_data = post.get("data", {})
-                title = post_data.get("title", "")
-                story_text = post_data.get("selftext", "")
-                # Check if unused and has content
-                if story_text and post_data.get("id") and not history.is_story_used(title):
-                    total_words = len(title.split()) + len(story_text.split())
-                    if total_words >= MIN_WORDS_REQUIRED:
-                        valid_posts.append(post_data)
-                    else:
-                        logger.info(f"Skipping story '{title}' (only {total_words} words)")
-        
-        if valid_posts:
-            chosen = random.choice(valid_posts)
-            title = chosen.get("title", "")
-            story_text = chosen.get("selftext", "")
-            
-            # Sauvegarder dans un fichier
-            dirs = get_project_dirs(project_id)
-            script_dir = dirs['script']
-            os.makedirs(script_dir, exist_ok=True)
-            story_file = os.path.join(script_dir, "raw_story.txt")
-            
-            with open(story_file, "w", encoding="utf-8") as f:
-                f.write(f"{title}\n\n{story_text}")
-            
-            return title, story_text, history
-        else:
+        if chosen is None:
             raise RuntimeError("No unused stories found")
+        
+        if pool.count(subreddit) < STORY_POOL_LOW_WATERMARK:
+            refill_pool_async(subreddit)
+        
+        title = chosen["title"]
+        story_text = chosen["selftext"]
+        history.expect(title, chosen["id"], story_text)
+        
+        # Sauvegarder dans un fichier
+        save_raw_story(title, story_text, project_id)
+        
+        return title, story_text, history
 
     except requests.RequestException as e:
         logger.error(f"Failed to fetch from Reddit: {str(e)}")
@@ -11,7 +11,41 @@ DEFAULT_SETTINGS = {
     "subreddits": ["funnystories", "shortstories", "stories"],  # Add default subreddits
     "theme": "black",
     "min_words_segment": 150,
-    "max_words_segment": 225
+    "max_words_segment": 225,
+    "tts_concurrency": 4,
+    "tts_mode": "per_part",
+    "part_target_seconds": 70,
+    "part_max_seconds": 180,
+    "segmenter": "duration",
+    "tts_cache_enabled": True,
+    "tts_cache_max_bytes": 512 * 1024 * 1024,
+    "subtitle_renderer": "pillow",
+    "subtitle_engine": "overlay",
+    "render_mode": "moviepy",
+    "render_workers": 1,
+    "project_retries": 1,
+    "precut_background": True,
+    "use_background_proxy": True,
+    "background_weights": {},
+    "background_recent_share": 0.5,
+    "proxy_profile": {"width": 1080, "height": 1920, "fps": 30, "gop": 30},
+    "reddit_max_pages": 5,
+    "story_pool_ttl_hours": {"default": 6},
+    "story_pool_low_watermark": 5,
+    "story_pool_refill_size": 25,
+    "near_duplicate_detection": True,
+    "near_duplicate_threshold": 0.8,
+    "progress_max_rate_hz": 10,
+    "trace_enabled": True,
+    "encoding_profile": "standard",
+    "encoding_profiles": {
+        # Quick previews: fastest preset, half resolution
+        "draft": {"preset": "ultrafast", "crf": 30, "scale": 0.5, "threads": 0, "faststart": False, "audio_bitrate": "96k"},
+        # Publishing: web-optimized (moov atom up front), one thread per core
+        "standard": {"preset": "medium", "crf": 21, "scale": 1.0, "threads": 0, "faststart": True, "audio_bitrate": "160k"},
+        # Masters: slow preset, near-transparent quality
+        "archive": {"preset": "slow", "crf": 16, "scale": 1.0, "threads": 0, "faststart": True, "audio_bitrate": "256k"}
+    }
 }
 
 def load_settings() -> dict:
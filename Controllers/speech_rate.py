@@ -0,0 +1,245 @@
+import os
+import re
+import glob
+import json
+import time
+import sqlite3
+import logging
+import threading
+from typing import Dict, Iterator, List, Optional, Tuple
+import numpy as np
+from config import SPEECH_RATE_DB, SPEECH_RATE_LEGACY_FILE, OUTPUT_DIR
+from word_alignment import align, JOINED_CONFIDENCE
+
+logger = logging.getLogger(__name__)
+
+# Seconds a word takes, up to the next word: base + per character + the pause its punctuation adds
+FEATURES = ("word", "chars", "comma_pause", "sentence_pause")
+# Uncalibrated voices: about 2.6 words per second, with short pauses on punctuation
+DEFAULT_COEFFICIENTS = (0.16, 0.045, 0.15, 0.40)
+# Weight of the defaults, in words, against the observed words (keeps the first fits sane)
+PRIOR_WEIGHT = 50.0
+# Longer gaps between two words are chunk boundaries or glitches, not speech rate
+MAX_WORD_SECONDS = 3.0
+
+WORD_WITH_SPACE = re.compile(r"(\S+)(\s*)")
+NON_WORD = re.compile(r"[^\w]")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sums (
+    voice TEXT NOT NULL,
+    -- 'samples', 'xty.<i>' or 'xtx.<i>.<j>' of the voice's least-squares sums
+    name TEXT NOT NULL,
+    value REAL NOT NULL,
+    PRIMARY KEY (voice, name)
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+def word_features(text: str) -> List[tuple]:
+    """(word, feature row) of each written word; a line break counts as a sentence end."""
+    rows = []
+    for word, space in WORD_WITH_SPACE.findall(text):
+        sentence_end = word[-1] in ".!?" or "\n" in space
+        comma = not sentence_end and word[-1] in ",;:"
+        rows.append((word, [1.0, float(len(NON_WORD.sub("", word))), float(comma), float(sentence_end)]))
+    return rows
+
+class SpeechRateModel:
+    """
+    Per-voice linear model of narration time, fitted on the word boundaries
+    of past syntheses. Only the least-squares sums are kept (they add up), so
+    every synthesis refines the fit. They live in SQLite and are saved with
+    additive UPDATEs, so concurrent processes never lose each other's sums.
+    """
+
+    def __init__(self, db_path: str = SPEECH_RATE_DB, legacy_file: str = SPEECH_RATE_LEGACY_FILE):
+        self.db_path = db_path
+        self.legacy_file = legacy_file
+        self.voices: Dict[str, dict] = {}
+        # Sums observed since the last save, added to the database by save()
+        self._pending: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+        self.migrate_legacy_file()
+        self.load()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def migrate_legacy_file(self) -> None:
+        """Imports the sums of the JSON file of earlier versions, once."""
+        if not self.legacy_file or not os.path.exists(self.legacy_file):
+            return
+        try:
+            with open(self.legacy_file, "r", encoding="utf-8") as f:
+                voices = json.load(f)
+        except (json.JSONDecodeError, OSError) as e:
+            logger.warning(f"Ignoring unreadable speech rate file {self.legacy_file}: {e}")
+            voices = {}
+        with self._connect() as conn:
+            # The file was written after the first calibration from existing projects
+            if conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('calibrated', ?)",
+                            (str(time.time()),)).rowcount:
+                self._add_sums(conn, voices)
+        try:
+            os.replace(self.legacy_file, self.legacy_file + ".migrated")
+        except OSError:
+            pass
+
+    def claim_calibration(self) -> bool:
+        """True for the first model ever built on this database, which should learn from existing projects."""
+        with self._connect() as conn:
+            return bool(conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('calibrated', ?)",
+                                     (str(time.time()),)).rowcount)
+
+    def load(self) -> None:
+        """Reads the sums saved by every process so far."""
+        voices: Dict[str, dict] = {}
+        with self._connect() as conn:
+            for voice, name, value in conn.execute("SELECT voice, name, value FROM sums"):
+                stats = voices.setdefault(voice, _add_stats(None, None))
+                kind, *index = name.split(".")
+                if kind == 'samples':
+                    stats['samples'] = int(value)
+                elif kind == 'xty':
+                    stats['xty'][int(index[0])] = value
+                else:
+                    stats['xtx'][int(index[0])][int(index[1])] = value
+        self.voices = voices
+
+    def save(self) -> None:
+        """Adds the pending sums to the database and reloads what other processes saved meanwhile."""
+        with self._lock:
+            if self._pending:
+                with self._connect() as conn:
+                    for voice, delta in self._pending.items():
+                        self._add_sums(conn, {voice: delta})
+                self._pending.clear()
+            self.load()
+
+    @staticmethod
+    def _add_sums(conn: sqlite3.Connection, voices: Dict[str, dict]) -> None:
+        conn.executemany(
+            """INSERT INTO sums (voice, name, value) VALUES (?, ?, ?)
+               ON CONFLICT(voice, name) DO UPDATE SET value = value + excluded.value""",
+            [(voice, name, value) for voice, stats in voices.items() for name, value in _sum_rows(stats)]
+        )
+
+    def samples(self, voice: str) -> int:
+        with self._lock:
+            return sum(stats.get(voice, {}).get('samples', 0) for stats in (self.voices, self._pending))
+
+    def coefficients(self, voice: str) -> np.ndarray:
+        """Fitted seconds per FEATURES for voice, pulled towards the defaults while samples are few."""
+        prior = np.array(DEFAULT_COEFFICIENTS)
+        with self._lock:
+            stats = _add_stats(self.voices.get(voice), self._pending.get(voice))
+        if not stats['samples']:
+            return prior
+        xtx = np.array(stats['xtx']) + PRIOR_WEIGHT * np.eye(len(FEATURES))
+        xty = np.array(stats['xty']) + PRIOR_WEIGHT * prior
+        return np.linalg.solve(xtx, xty)
+
+    def word_seconds(self, texts: List[str], voice: str) -> List[float]:
+        """Predicted seconds of each text, including the pause after its last word."""
+        coefficients = self.coefficients(voice)
+        return [
+            float(np.sum(np.array([row for _word, row in rows]) @ coefficients)) if rows else 0.0
+            for rows in (word_features(text) for text in texts)
+        ]
+
+    def predict(self, text: str, voice: str) -> float:
+        """Predicted narration seconds of text, up to the end of its last word."""
+        rows = [row for _word, row in word_features(text)]
+        if not rows:
+            return 0.0
+        rows[-1] = rows[-1][:2] + [0.0, 0.0]
+        return float(np.sum(np.array(rows) @ self.coefficients(voice)))
+
+    def observe(self, text: str, word_timings: List[tuple], voice: str) -> int:
+        """
+        Adds the words of a synthesized text to the voice's statistics: each
+        aligned word gives the time until the next word starts.
+        Returns the number of words used.
+        """
+        words = word_features(text)
+        aligned = align([word for word, _row in words], word_timings)
+        rows, targets = [], []
+        for index in range(len(words) - 1):
+            # Only words spoken as written (or split/joined) time the speech rate
+            if min(aligned[index].confidence, aligned[index + 1].confidence) < JOINED_CONFIDENCE:
+                continue
+            seconds = aligned[index + 1].start - aligned[index].start
+            if 0 < seconds < MAX_WORD_SECONDS:
+                rows.append(words[index][1])
+                targets.append(seconds)
+        if not rows:
+            return 0
+        x = np.array(rows)
+        y = np.array(targets)
+        delta = {'xtx': (x.T @ x).tolist(), 'xty': (x.T @ y).tolist(), 'samples': len(rows)}
+        with self._lock:
+            self._pending[voice] = _add_stats(self._pending.get(voice), delta)
+        return len(rows)
+
+    def calibrate_from_projects(self, output_dir: str = OUTPUT_DIR) -> int:
+        """Learns from the scripts and word timings kept in existing project manifests. Returns the words used."""
+        used = 0
+        for manifest_path in glob.glob(os.path.join(output_dir, "*", "manifest.json")):
+            try:
+                with open(manifest_path, "r", encoding="utf-8") as f:
+                    manifest = json.load(f)
+                for part, stages in manifest.get('parts', {}).items():
+                    audio = stages.get('audio')
+                    if not audio or not audio.get('voice'):
+                        continue
+                    if part == "0":
+                        text = manifest['job']['story']
+                    else:
+                        script_path = os.path.join(os.path.dirname(manifest_path), next(iter(stages['script']['files'])))
+                        with open(script_path, "r", encoding="utf-8") as f:
+                            text = f.read()
+                    used += self.observe(text, audio['timings'], audio['voice'])
+            except (OSError, KeyError, StopIteration, json.JSONDecodeError) as e:
+                logger.debug(f"Skipping {manifest_path} for speech rate calibration: {e}")
+        return used
+
+def _add_stats(stats: Optional[dict], delta: Optional[dict]) -> dict:
+    size = len(FEATURES)
+    total = {'xtx': np.zeros((size, size)), 'xty': np.zeros(size), 'samples': 0}
+    for part in (stats, delta):
+        if part:
+            total['xtx'] = total['xtx'] + np.array(part['xtx'])
+            total['xty'] = total['xty'] + np.array(part['xty'])
+            total['samples'] += part['samples']
+    return {'xtx': total['xtx'].tolist(), 'xty': total['xty'].tolist(), 'samples': total['samples']}
+
+def _sum_rows(stats: dict) -> Iterator[Tuple[str, float]]:
+    """(name, value) rows of the sums table for one voice's statistics."""
+    yield 'samples', stats['samples']
+    for i, value in enumerate(stats['xty']):
+        yield f'xty.{i}', value
+    for i, row in enumerate(stats['xtx']):
+        for j, value in enumerate(row):
+            yield f'xtx.{i}.{j}', value
+
+_model: Optional[SpeechRateModel] = None
+
+def get_speech_rate_model() -> SpeechRateModel:
+    """Returns the process-wide model; the first one ever built learns from the existing projects."""
+    global _model
+    if _model is None:
+        _model = SpeechRateModel()
+        if _model.claim_calibration():
+            used = _model.calibrate_from_projects()
+            if used:
+                logger.info(f"Speech rate model calibrated on {used} word(s) from existing projects")
+                _model.save()
+    return _model
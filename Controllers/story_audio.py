@@ -0,0 +1,130 @@
+import re
+import warnings
+import subprocess
+from typing import List, Optional, Tuple
+from ffmpeg_tools import ffmpeg_binary
+from word_alignment import align
+with warnings.catch_warnings():
+    # pydub warns when ffmpeg is not on PATH; it is given moviepy's ffmpeg below
+    warnings.simplefilter("ignore", RuntimeWarning)
+    from pydub import AudioSegment
+
+WordTimings = List[Tuple[str, float, float]]
+
+# pydub encodes with the same ffmpeg as moviepy
+AudioSegment.converter = ffmpeg_binary()
+
+# edge-tts output format (audio-24khz-48kbitrate-mono-mp3)
+SAMPLE_RATE = 24000
+MP3_BITRATE = "48k"
+# Silence between the spoken title/part intro and the story audio of a part
+INTRO_PAUSE_MS = 400
+
+SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+
+def split_sentences(text: str) -> List[str]:
+    """Sentences of text, split like split_text_into_segments does."""
+    return [sentence for sentence in SENTENCE_END.split(text.strip()) if sentence]
+
+def unit_times(units: List[str], word_timings: WordTimings) -> List[Tuple[float, float]]:
+    """
+    (start, end) of each text unit (sentence, intro...) in the speech, found by
+    aligning the unit's words to the boundary words (see word_alignment.align).
+    A unit with no spoken word gets an empty span at the end of the previous one.
+    """
+    words = [unit.split() for unit in units]
+    aligned = iter(align([word for unit_words in words for word in unit_words], word_timings))
+    previous_end = word_timings[0][1] if word_timings else 0.0
+    times = []
+    for unit_words in words:
+        spoken = [word for word in (next(aligned) for _ in unit_words) if word.first is not None]
+        if not spoken:
+            times.append((previous_end, previous_end))
+        else:
+            times.append((spoken[0].start, spoken[-1].end))
+            previous_end = times[-1][1]
+    return times
+
+def plan_parts(times: List[Tuple[float, float]], target_seconds: float) -> List[Tuple[int, int]]:
+    """
+    (first, last) sentence indexes of each part: as many parts as the speech
+    holds target_seconds, cut at the sentence ends closest to even durations.
+    """
+    total = times[-1][1] - times[0][0]
+    return split_evenly(times, round(total / target_seconds))
+
+def split_evenly(times: List[Tuple[float, float]], parts: int) -> List[Tuple[int, int]]:
+    """(first, last) sentence indexes of parts parts, cut at the sentence ends closest to even durations."""
+    count = len(times)
+    total = times[-1][1] - times[0][0]
+    parts = max(1, min(count, parts))
+    bounds = []
+    first = 0
+    for k in range(1, parts):
+        ideal = times[0][0] + total * k / parts
+        # Leave at least one sentence for each remaining part
+        last = min(range(first, count - (parts - k)), key=lambda index: abs(times[index][1] - ideal))
+        bounds.append((first, last))
+        first = last + 1
+    bounds.append((first, count - 1))
+    return bounds
+
+def fit_parts(times: List[Tuple[float, float]], target_seconds: float, max_seconds: float,
+              overhead_seconds: float = 0.0) -> List[Tuple[int, int]]:
+    """
+    plan_parts, with more parts until every part fits in max_seconds once its
+    overlap sentence (the previous part's last one) and overhead_seconds
+    (intro, padding) are added.
+    Raises RuntimeError when even one sentence per part does not fit.
+    """
+    bounds = plan_parts(times, target_seconds)
+    while True:
+        longest = max(
+            times[last][1] - times[first - 1 if index > 0 else first][0]
+            for index, (first, last) in enumerate(bounds)
+        ) + overhead_seconds
+        if longest <= max_seconds:
+            return bounds
+        if len(bounds) >= len(times):
+            raise RuntimeError(f"Story cannot be split into parts of at most {max_seconds:.0f}s "
+                               f"(longest part would last {longest:.0f}s)")
+        bounds = split_evenly(times, len(bounds) + 1)
+
+def cut_points(times: List[Tuple[float, float]], first: int, last: int) -> Tuple[float, Optional[float]]:
+    """
+    Audio (start, end) of units first..last, cut halfway through the pauses
+    around them. end is None when the slice runs to the end of the audio.
+    """
+    start = (times[first - 1][1] + times[first][0]) / 2 if first > 0 else 0.0
+    end = (times[last][1] + times[last + 1][0]) / 2 if last + 1 < len(times) else None
+    return start, end
+
+def load_audio(path: str) -> AudioSegment:
+    """Decodes an audio file with moviepy's ffmpeg (pydub would also need ffprobe on PATH)."""
+    pcm = subprocess.run(
+        [ffmpeg_binary(), "-loglevel", "error", "-i", path, "-f", "s16le", "-ac", "1", "-ar", str(SAMPLE_RATE), "-"],
+        capture_output=True, check=True
+    ).stdout
+    return AudioSegment(data=pcm, sample_width=2, frame_rate=SAMPLE_RATE, channels=1)
+
+def slice_audio(audio: AudioSegment, start: float, end: Optional[float]) -> AudioSegment:
+    return audio[int(start * 1000):] if end is None else audio[int(start * 1000):int(end * 1000)]
+
+def slice_timings(word_timings: WordTimings, start: float, end: Optional[float], offset: float = 0.0) -> WordTimings:
+    """Boundaries starting in [start, end), moved so that start falls at offset."""
+    return [
+        (word, word_start - start + offset, word_end - start + offset)
+        for word, word_start, word_end in word_timings
+        if start <= word_start and (end is None or word_start < end)
+    ]
+
+def build_part_audio(intro: AudioSegment, intro_timings: WordTimings, story: AudioSegment, story_timings: WordTimings,
+                     start: float, end: Optional[float], output_path: str) -> WordTimings:
+    """
+    Writes intro + pause + story[start:end] to output_path as mp3.
+    intro_timings are relative to the intro. Returns the word timings of the part.
+    """
+    pause = AudioSegment.silent(INTRO_PAUSE_MS, frame_rate=SAMPLE_RATE)
+    offset = (len(intro) + INTRO_PAUSE_MS) / 1000
+    (intro + pause + slice_audio(story, start, end)).export(output_path, format="mp3", bitrate=MP3_BITRATE)
+    return list(intro_timings) + slice_timings(story_timings, start, end, offset)
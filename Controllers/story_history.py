@@ -1,37 +1,187 @@
 import os
 import json
+import time
+import sqlite3
+import logging
+import threading
 from typing import Set, Optional
-from config import HISTORY_FILE
+import numpy as np
+from config import HISTORY_DB, HISTORY_FILE, NEAR_DUPLICATE_DETECTION, NEAR_DUPLICATE_THRESHOLD
+from near_duplicates import MinHashIndex
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS stories (
+    -- AUTOINCREMENT: ids are never reused after clear_history, so incremental loads stay correct
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    post_id TEXT UNIQUE,
+    title TEXT NOT NULL,
+    used_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS stories_title ON stories (title);
+CREATE TABLE IF NOT EXISTS fingerprints (
+    story_id INTEGER PRIMARY KEY REFERENCES stories (id),
+    signature BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
 
 class StoryHistory:
-    def __init__(self):
+    """
+    Historique des histoires utilisées, stocké en SQLite (mode WAL) et indexé
+    par id de post Reddit, le titre servant de clé secondaire. Chaque ajout
+    est une seule insertion, sûre entre processus ; load_history() ne relit que
+    les lignes ajoutées depuis le dernier chargement. Les textes sont aussi
+    indexés par MinHash pour repérer les reposts légèrement modifiés.
+    """
+
+    def __init__(self, db_path: str = HISTORY_DB, legacy_file: str = HISTORY_FILE):
+        self.db_path = db_path
+        self.legacy_file = legacy_file
+        self.used_ids: Set[str] = set()
         self.used_titles: Set[str] = set()
+        # Titres migrés depuis l'ancien JSON, sans id de post
+        self.legacy_titles: Set[str] = set()
+        self.pending: dict = {}
+        self.near_duplicates = MinHashIndex(NEAR_DUPLICATE_THRESHOLD) if NEAR_DUPLICATE_DETECTION else None
+        self._last_rowid = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+        self.migrate_legacy_file()
         self.load_history()
 
-    def load_history(self) -> None:
-        """Charge l'historique depuis le fichier JSON."""
-        if os.path.exists(HISTORY_FILE):
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def migrate_legacy_file(self) -> None:
+        """Importe une seule fois l'ancien story_history.json (liste de titres)."""
+        if not os.path.exists(self.legacy_file):
+            return
+        conn = self._connect()
+        try:
+            # BEGIN IMMEDIATE : un seul processus migre, les autres attendent puis voient le drapeau
+            conn.execute("BEGIN IMMEDIATE")
+            if conn.execute("SELECT 1 FROM meta WHERE key = 'legacy_migrated'").fetchone():
+                conn.rollback()
+                return
             try:
-                with open(HISTORY_FILE, 'r', encoding='utf-8') as f:
-                    self.used_titles = set(json.load(f))
-            except json.JSONDecodeError:
-                self.used_titles = set()
+                with open(self.legacy_file, 'r', encoding='utf-8') as f:
+                    titles = set(json.load(f))
+            except (json.JSONDecodeError, OSError):
+                titles = set()
+            now = time.time()
+            conn.executemany(
+                "INSERT INTO stories (post_id, title, used_at) VALUES (NULL, ?, ?)",
+                [(title, now) for title in titles]
+            )
+            conn.execute("INSERT INTO meta (key, value) VALUES ('legacy_migrated', ?)", (str(now),))
+            conn.commit()
+            logger.info(f"Migrated {len(titles)} title(s) from {self.legacy_file}")
+        finally:
+            conn.close()
+        try:
+            os.replace(self.legacy_file, self.legacy_file + ".migrated")
+        except OSError:
+            pass
 
-    def save_history(self) -> None:
-        """Sauvegarde l'historique dans le fichier JSON."""
-        with open(HISTORY_FILE, 'w', encoding='utf-8') as f:
-            json.dump(list(self.used_titles), f, indent=2)
+    def load_history(self) -> None:
+        """Charge les entrées ajoutées depuis le dernier chargement."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                """SELECT stories.id, post_id, title, signature FROM stories
+                   LEFT JOIN fingerprints ON fingerprints.story_id = stories.id
+                   WHERE stories.id > ? ORDER BY stories.id""", (self._last_rowid,)
+            ).fetchall()
+        with self._lock:
+            for rowid, post_id, title, signature in rows:
+                self.used_titles.add(title)
+                if signature is not None and self.near_duplicates is not None:
+                    self.near_duplicates.add(rowid, np.frombuffer(signature, dtype=np.uint32))
+                if post_id:
+                    self.used_ids.add(post_id)
+                else:
+                    self.legacy_titles.add(title)
+                self._last_rowid = max(self._last_rowid, rowid)
+
+    def expect(self, title: str, post_id: str, text: Optional[str] = None) -> None:
+        """Retient l'id et le texte du post remis sous ce titre, pour que add_story(title) les enregistre."""
+        with self._lock:
+            self.pending[title] = (post_id, text)
+
+    def add_story(self, title: str, post_id: Optional[str] = None, text: Optional[str] = None) -> None:
+        """Ajoute une histoire à l'historique, avec l'empreinte MinHash de son texte si connu."""
+        with self._lock:
+            pending_id, pending_text = self.pending.pop(title, (None, None))
+        post_id = post_id or pending_id
+        text = text or pending_text
+        signature = None
+        if text and self.near_duplicates is not None:
+            signature = self.near_duplicates.signature(f"{title}\n{text}")
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO stories (post_id, title, used_at) VALUES (?, ?, ?)",
+                (post_id, title, time.time())
+            )
+            if cursor.rowcount and signature is not None:
+                conn.execute(
+                    "INSERT INTO fingerprints (story_id, signature) VALUES (?, ?)",
+                    (cursor.lastrowid, signature.tobytes())
+                )
+        with self._lock:
+            if cursor.rowcount and signature is not None:
+                self.near_duplicates.add(cursor.lastrowid, signature)
+            self.used_titles.add(title)
+            if post_id:
+                self.used_ids.add(post_id)
+            else:
+                self.legacy_titles.add(title)
 
-    def add_story(self, title: str) -> None:
-        """Ajoute un titre à l'historique et sauvegarde."""
-        self.used_titles.add(title)
-        self.save_history()
+    def is_story_used(self, title: str, post_id: Optional[str] = None, text: Optional[str] = None) -> bool:
+        """
+        Vérifie si une histoire a déjà été utilisée. Avec un id, deux posts
+        différents au même titre ne se bloquent pas ; seuls les titres sans
+        id (anciennes entrées) comptent en plus. Avec le texte, un quasi-doublon
+        d'une histoire déjà utilisée compte aussi comme utilisé.
+        """
+        if post_id:
+            used = post_id in self.used_ids or title in self.legacy_titles
+        else:
+            used = title in self.used_titles
+        return used or (text is not None and self.is_near_duplicate(title, text))
 
-    def is_story_used(self, title: str) -> bool:
-        """Vérifie si une histoire a déjà été utilisée."""
-        return title in self.used_titles
+    def is_near_duplicate(self, title: str, text: str) -> bool:
+        """Vrai si le texte ressemble à une histoire déjà utilisée (similarité >= near_duplicate_threshold)."""
+        if self.near_duplicates is None or not len(self.near_duplicates):
+            return False
+        match = self.near_duplicates.query(self.near_duplicates.signature(f"{title}\n{text}"))
+        if match:
+            logger.info(f"Skipping near-duplicate of a used story: '{title}' (similarity {match[1]:.2f})")
+        return match is not None
 
     def clear_history(self) -> None:
         """Efface tout l'historique."""
-        self.used_titles.clear()
-        self.save_history()
+        with self._connect() as conn:
+            conn.execute("DELETE FROM fingerprints")
+            conn.execute("DELETE FROM stories")
+        with self._lock:
+            if self.near_duplicates is not None:
+                self.near_duplicates.clear()
+            self.used_ids.clear()
+            self.used_titles.clear()
+            self.legacy_titles.clear()
+            self._last_rowid = 0
+
+_history: Optional[StoryHistory] = None
+
+def get_story_history() -> StoryHistory:
+    """Historique partagé par le processus, mis à jour avec les ajouts des autres processus."""
+    global _history
+    if _history is None:
+        _history = StoryHistory()
+    else:
+        _history.load_history()
+    return _history
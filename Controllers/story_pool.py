@@ -0,0 +1,121 @@
+import os
+import time
+import random
+import sqlite3
+import logging
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, Optional
+from config import STORY_POOL_DB, STORY_POOL_TTL_HOURS
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS candidates (
+    id TEXT PRIMARY KEY,
+    subreddit TEXT NOT NULL,
+    title TEXT NOT NULL,
+    selftext TEXT NOT NULL,
+    word_count INTEGER NOT NULL,
+    score INTEGER NOT NULL DEFAULT 0,
+    fetched_at REAL NOT NULL,
+    claimed_at REAL
+);
+CREATE INDEX IF NOT EXISTS candidates_subreddit ON candidates (subreddit, fetched_at);
+"""
+
+class StoryPool:
+    """
+    Persistent pool of eligible Reddit posts, so picking a story is a local
+    query instead of a listing fetch. Entries older than their subreddit's
+    TTL are ignored and pruned. Taken entries stay behind as claimed for one
+    TTL, so a refill does not hand out a story that is still being rendered.
+    """
+
+    def __init__(self, db_path: str = STORY_POOL_DB, ttl_hours: dict = STORY_POOL_TTL_HOURS):
+        self.db_path = db_path
+        self.ttl_hours = ttl_hours
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # One short-lived connection per call keeps the pool usable from refill threads:
+        # committed (rolled back on error) and closed when the with block exits
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def ttl_seconds(self, subreddit: str) -> float:
+        """TTL of a subreddit's entries, falling back to the "default" entry."""
+        hours = self.ttl_hours.get(subreddit, self.ttl_hours.get("default", 6))
+        return hours * 3600
+
+    def add(self, subreddit: str, posts: List[dict]) -> int:
+        """Inserts or refreshes Reddit post data dicts. Returns the number of posts stored."""
+        now = time.time()
+        rows = [
+            (post["id"], subreddit, post.get("title", ""), post.get("selftext", ""),
+             len(post.get("title", "").split()) + len(post.get("selftext", "").split()),
+             int(post.get("score") or 0), now)
+            for post in posts if post.get("id")
+        ]
+        with self._connect() as conn:
+            conn.executemany(
+                """INSERT INTO candidates (id, subreddit, title, selftext, word_count, score, fetched_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT(id) DO UPDATE SET score = excluded.score, fetched_at = excluded.fetched_at""",
+                rows
+            )
+        return len(rows)
+
+    def count(self, subreddit: str) -> int:
+        """Number of fresh entries for subreddit."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT COUNT(*) FROM candidates WHERE subreddit = ? AND claimed_at IS NULL AND fetched_at >= ?",
+                (subreddit, time.time() - self.ttl_seconds(subreddit))
+            ).fetchone()
+        return row[0]
+
+    def take(self, subreddit: str, is_used: Callable[[dict], bool]) -> Optional[dict]:
+        """
+        Claims and returns a random fresh entry for subreddit that is_used
+        rejects, or None when the pool has none. Used entries met on the way
+        are deleted, expired ones pruned.
+        """
+        now = time.time()
+        expired = now - self.ttl_seconds(subreddit)
+        with self._connect() as conn:
+            conn.execute(
+                """DELETE FROM candidates WHERE subreddit = ?
+                   AND (claimed_at < ? OR (claimed_at IS NULL AND fetched_at < ?))""",
+                (subreddit, expired, expired)
+            )
+            rows = [dict(row) for row in conn.execute(
+                "SELECT * FROM candidates WHERE subreddit = ? AND claimed_at IS NULL", (subreddit,)
+            )]
+            random.shuffle(rows)
+            for row in rows:
+                if is_used(row):
+                    conn.execute("DELETE FROM candidates WHERE id = ?", (row["id"],))
+                    continue
+                # Guarded update: a concurrent caller may have claimed it first
+                claimed = conn.execute(
+                    "UPDATE candidates SET claimed_at = ? WHERE id = ? AND claimed_at IS NULL", (now, row["id"])
+                ).rowcount
+                if claimed:
+                    return row
+        return None
+
+    def clear(self, subreddit: Optional[str] = None) -> None:
+        """Empties the pool, or only the entries of one subreddit."""
+        with self._connect() as conn:
+            if subreddit:
+                conn.execute("DELETE FROM candidates WHERE subreddit = ?", (subreddit,))
+            else:
+                conn.execute("DELETE FROM candidates")
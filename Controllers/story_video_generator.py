@@ -1,21 +1,65 @@
 import os
 import re
+import sys
+import time
 import random
 import logging
+import queue
 import asyncio
+import inspect
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
 import edge_tts
-from moviepy.editor import VideoFileClip, AudioFileClip, TextClip, CompositeVideoClip, VideoClip
+import numpy as np
+from moviepy.editor import VideoFileClip, AudioFileClip, TextClip, CompositeVideoClip, VideoClip, ImageClip
 from moviepy.config import change_settings
-from typing import List, Tuple
+from typing import BinaryIO, Callable, List, Tuple
 from config import (
     IMAGEMAGICK_PATH, FONT_SIZE, FONT_NAME,
     MIN_WORDS_PER_SEGMENT, MAX_WORDS_PER_SEGMENT, OUTPUT_DIR,
-    get_project_dirs, VOICE_OPTIONS
+    get_project_dirs, VOICE_OPTIONS, TTS_MAX_CONCURRENCY, TTS_CACHE_ENABLED,
+    SUBTITLE_RENDERER, SUBTITLE_ENGINE, RENDER_MODE, RENDER_WORKERS,
+    PRECUT_BACKGROUND, USE_BACKGROUND_PROXY, PROXY_PROFILE, TTS_MODE, PART_TARGET_SECONDS,
+    PART_MAX_SECONDS, SEGMENTER
 )
+from tts_cache import get_tts_cache, TTS_ENGINE_VERSION
+from subtitle_renderer import render_caption
+from subtitle_overlay import SubtitleOverlay
+from subtitle_export import export_subtitles
+from ffmpeg_tools import burn_subtitles, precut
+from keyframe_index import get_keyframes, choose_start_time
+from proxy_cache import get_proxy
+from background_library import get_background_library
+from video_catalog import get_video_catalog
+from project_manifest import ProjectManifest, stage_key
+from story_audio import (
+    split_sentences, unit_times, fit_parts, cut_points, load_audio, slice_audio, slice_timings, build_part_audio,
+    INTRO_PAUSE_MS
+)
+from speech_rate import get_speech_rate_model
+from word_alignment import align, mean_confidence, ALIGNMENT_VERSION
+from encoding_profiles import get_encoding_profile, moviepy_write_kwargs, ffmpeg_encode_args, scale_filter
 from proglog import ProgressBarLogger
+from progress_bus import ProgressBus, ProgressEvent
+from tracing import Tracer, get_tracer, span, start_trace
 
 logger = logging.getLogger(__name__)
 
+# edge-tts reports WordBoundary offsets and durations in 100ns ticks
+TICKS_PER_SECOND = 10000000
+
+# edge-tts 7 reports sentence boundaries unless asked for word boundaries (older versions always send words)
+COMMUNICATE_OPTIONS = {"boundary": "WordBoundary"} if "boundary" in inspect.signature(edge_tts.Communicate).parameters else {}
+
+# Video kept on screen after the narration ends, so the last subtitle can be read
+END_PADDING_SECONDS = 3
+
+# The narration's audio runs on a little after its last word boundary
+AUDIO_TAIL_SECONDS = 2
+
+# Trace thread ids of the per-part TTS spans (lane = TTS_TRACE_LANE + part index)
+TTS_TRACE_LANE = 1000
+
 # Set the ImageMagick binary path (update as needed)
 change_settings({"IMAGEMAGICK_BINARY": IMAGEMAGICK_PATH})
 
@@ -60,13 +104,73 @@ def split_text_into_segments(story: str, min_words: int = MIN_WORDS_PER_SEGMENT,
     
     return final_segments
 
+def _overlapped_parts(sentences: List[str], bounds: List[Tuple[int, int]]) -> List[Tuple[int, int, str]]:
+    """
+    (first, last, segment) of each part of sentences split at bounds, with the
+    same overlap as split_text_into_segments: each part after the first
+    starts with the previous part's last sentence (first includes it).
+    """
+    parts = []
+    for index, (first, last) in enumerate(bounds):
+        segment = " ".join(sentences[first:last + 1])
+        if index > 0:
+            first -= 1
+            segment = f"{sentences[first]}\n\n{segment}"
+        parts.append((first, last, segment))
+    return parts
+
+def intro_seconds(title: str, voice_name: str, total_parts: int = 2) -> float:
+    """Predicted narration time of a part's spoken title and part number, with the pause after it."""
+    intro = f"{title}\nPart {total_parts}/{total_parts}\n\n" if total_parts > 1 else f"{title}\n\n"
+    return get_speech_rate_model().word_seconds([intro], voice_name)[0]
+
+def predicted_times(sentences: List[str], voice_name: str) -> List[Tuple[float, float]]:
+    """(start, end) of each sentence on the predicted narration timeline of the story."""
+    times = []
+    position = 0.0
+    for seconds in get_speech_rate_model().word_seconds(sentences, voice_name):
+        times.append((position, position + seconds))
+        position += seconds
+    return times
+
+def split_text_by_duration(story: str, title: str, voice_name: str, target_seconds: float = PART_TARGET_SECONDS,
+                           max_seconds: float = PART_MAX_SECONDS) -> list:
+    """
+    Splits the story at sentence boundaries into parts of about target_seconds
+    of narration, as predicted by the voice's speech rate model, adding parts
+    until each one (intro, overlap and end padding included) fits in
+    max_seconds. Segments overlap like split_text_into_segments.
+    Raises RuntimeError, before any TTS, when a sentence alone is too long.
+    """
+    sentences = split_sentences(story)
+    times = predicted_times(sentences, voice_name)
+    overhead = intro_seconds(title, voice_name) + END_PADDING_SECONDS
+    bounds = fit_parts(times, target_seconds, max_seconds, overhead)
+    segments = [segment for _first, _last, segment in _overlapped_parts(sentences, bounds)]
+    logger.info(f"Story of ~{times[-1][1]:.0f}s of narration split into {len(segments)} part(s) "
+                f"(target {target_seconds}s, max {max_seconds:.0f}s)")
+    return segments
+
 def create_dynamic_text_clip(text: str, total_duration: float, video_width: int, fontsize: int = FONT_SIZE, font: str = FONT_NAME, position: str = 'center') -> VideoClip:
     """
     Creates a text clip with enhanced visibility and contrast.
+    Uses the in-process Pillow rasterizer unless SUBTITLE_RENDERER is 'imagemagick'.
     """
     margin = int(video_width * 0.05)
     processed_text = text.upper().replace("-", "-\n")
     
+    if SUBTITLE_RENDERER == "pillow":
+        try:
+            rgba = render_caption(processed_text, video_width - 2 * margin, fontsize, font)
+            final_clip = ImageClip(rgba, transparent=True)
+            return final_clip.set_duration(total_duration).set_position(position)
+        except OSError as e:
+            logger.warning(f"Pillow subtitle rendering failed, falling back to ImageMagick: {e}")
+    
+    return create_imagemagick_text_clip(processed_text, total_duration, video_width - 2 * margin, fontsize, font, position)
+
+def create_imagemagick_text_clip(processed_text: str, total_duration: float, box_width: int, fontsize: int, font: str, position: str) -> VideoClip:
+    """Builds the caption from two ImageMagick TextClips (text + shadow)."""
     # Create main text
     main_text = TextClip(
         processed_text,
@@ -74,7 +178,7 @@ def create_dynamic_text_clip(text: str, total_duration: float, video_width: int,
         font=font,
         color='white',
         method='caption',
-        size=(video_width - 2 * margin, None),
+        size=(box_width, None),
         align='center',
         stroke_color='black',
         stroke_width=2.5
@@ -87,64 +191,80 @@ def create_dynamic_text_clip(text: str, total_duration: float, video_width: int,
         font=font,
         color='black',
         method='caption',
-        size=(video_width - 2 * margin, None),
+        size=(box_width, None),
         align='center'
     ).set_position(lambda t: (2, 2))
     
     final_clip = CompositeVideoClip([shadow, main_text], size=main_text.size)
     return final_clip.set_duration(total_duration).set_position(position)
 
-def create_group_subtitles(segment: str, duration: float, video_width: int, word_timings: List[Tuple[str, float, float]]) -> list:
-    """Creates subtitle clips synchronized with TTS timing."""
+def build_subtitle_groups(segment: str, word_timings: List[Tuple[str, float, float]]) -> List[Tuple[str, float, float, int]]:
+    """
+    Groups the script's words into captions, timed by aligning them to the TTS
+    word timings: the title (and part line) as one block, then the body in
+    groups of up to 5 words or until a sentence ends.
+    Returns: List of (text, start_time, end_time, fontsize) tuples.
+    """
+    if not word_timings:
+        return []
     parts = segment.split('\n\n')
-    title = parts[0]
-    clips = []
+    title_words = parts[0].split()
+    body_words = " ".join(parts[1:]).split()
+    with span("subtitles.align", words=len(title_words) + len(body_words), boundaries=len(word_timings)) as align_span:
+        aligned = align(title_words + body_words, word_timings)
+        align_span.set(confidence=round(mean_confidence(aligned), 3))
+    groups = []
     
-    # Find timings for the title
-    title_words = title.split()
-    title_start = None
-    title_end = None
+    title_aligned = aligned[:len(title_words)]
+    if any(word.first is not None for word in title_aligned):
+        groups.append((parts[0], title_aligned[0].start, title_aligned[-1].end, int(FONT_SIZE * 1.2)))
     
-    for word, start, end in word_timings:
-        if word.lower() == title_words[0].lower() and title_start is None:
-            title_start = start
-        if word.lower() == title_words[-1].lower():
-            title_end = end
-            break
-    
-    if title_start is not None and title_end is not None:
-        title_clip = create_dynamic_text_clip(
-            text=title,
-            total_duration=title_end - title_start,
+    current_group = []
+    for i, word in enumerate(aligned[len(title_words):]):
+        current_group.append(word)
+        should_create_group = (len(current_group) >= 5 or word.word[-1] in ".!?" or i == len(body_words) - 1)
+        if should_create_group:
+            groups.append((" ".join(item.word for item in current_group), current_group[0].start, word.end, FONT_SIZE))
+            current_group = []
+    return groups
+
+def create_group_subtitles(segment: str, duration: float, video_width: int, word_timings: List[Tuple[str, float, float]]) -> list:
+    """Creates subtitle clips synchronized with TTS timing."""
+    clips = []
+    for text, start, end, fontsize in build_subtitle_groups(segment, word_timings):
+        clip = create_dynamic_text_clip(
+            text=text,
+            total_duration=end - start,
             video_width=video_width,
-            fontsize=int(FONT_SIZE * 1.2),
+            fontsize=fontsize,
             position='center'
-        ).set_start(title_start)
-        clips.append(title_clip)
-    
-    # Process remaining text as groups
-    if len(parts) > 1:
-        # Process all timings after the title words
-        non_title_timings = word_timings[len(title_words):]
-        current_group = []
-        group_start = None
-        for i, (word, start, end) in enumerate(non_title_timings):
-            if not current_group:
-                group_start = start
-            current_group.append(word)
-            should_create_group = (len(current_group) >= 5 or word[-1] in ".!?" or i == len(non_title_timings) - 1)
-            if should_create_group:
-                group_text = " ".join(current_group)
-                clip = create_dynamic_text_clip(
-                    text=group_text,
-                    total_duration=end - group_start,
-                    video_width=video_width,
-                    position='center'
-                ).set_start(group_start)
-                clips.append(clip)
-                current_group = []
+        ).set_start(start)
+        clips.append(clip)
     return clips
 
+def render_caption_rgba(text: str, video_width: int, fontsize: int = FONT_SIZE, font: str = FONT_NAME) -> np.ndarray:
+    """Renders one caption to an RGBA bitmap with the same look as create_dynamic_text_clip."""
+    margin = int(video_width * 0.05)
+    processed_text = text.upper().replace("-", "-\n")
+    
+    if SUBTITLE_RENDERER == "pillow":
+        try:
+            return render_caption(processed_text, video_width - 2 * margin, fontsize, font)
+        except OSError as e:
+            logger.warning(f"Pillow subtitle rendering failed, falling back to ImageMagick: {e}")
+    
+    clip = create_imagemagick_text_clip(processed_text, 1, video_width - 2 * margin, fontsize, font, 'center')
+    alpha = clip.mask.get_frame(0) * 255
+    return np.dstack([clip.get_frame(0), alpha]).astype(np.uint8)
+
+def create_subtitle_overlay(groups: List[Tuple[str, float, float, int]], frame_size: Tuple[int, int]) -> SubtitleOverlay:
+    """Pre-renders every caption group of a part into an interval-indexed overlay."""
+    captions = [
+        (start, end, render_caption_rgba(text, frame_size[0], fontsize))
+        for text, start, end, fontsize in groups
+    ]
+    return SubtitleOverlay(captions, frame_size)
+
 def save_story_parts(title: str, segments: list, project_id: str):
     """Saves the story to text files. Creates multiple part files if needed."""
     dirs = get_project_dirs(project_id)
@@ -171,25 +291,62 @@ def save_story_parts(title: str, segments: list, project_id: str):
             with open(part_path, "w", encoding="utf-8") as f:
                 f.write(f"{title}\n\n{part_info}\n\n{segment}")
 
+def _word_timing(event: dict) -> Tuple[str, float, float]:
+    """Converts an edge-tts WordBoundary event (100ns ticks) to a (word, start, end) tuple."""
+    return (
+        event["text"],
+        event["offset"] / TICKS_PER_SECOND,
+        (event["offset"] + event["duration"]) / TICKS_PER_SECOND
+    )
+
+async def async_stream_speech(text: str, voice_name: str, audio_sink: BinaryIO) -> List[Tuple[str, float, float]]:
+    """
+    Synthesizes text in a single edge-tts stream, writing the audio chunks to
+    audio_sink while collecting the word boundaries.
+    Returns: List of (word, start_time, end_time) tuples.
+    """
+    communicate = edge_tts.Communicate(text, voice_name, **COMMUNICATE_OPTIONS)
+    word_timings = []
+    async for event in communicate.stream():
+        if event["type"] == "audio":
+            audio_sink.write(event["data"])
+        elif event["type"] == "WordBoundary":
+            word_timings.append(_word_timing(event))
+    return word_timings
+
 async def async_generate_speech(text: str, output_path: str, voice_name: str) -> List[Tuple[str, float, float]]:
     """
     Generates speech and returns word timing information.
     Returns: List of (word, start_time, end_time) tuples.
     """
     try:
-        communicate_timing = edge_tts.Communicate(text, voice_name)
-        word_timings = []
-        async for event in communicate_timing.stream():
-            if event["type"] == "WordBoundary":
-                word_timings.append((
-                    event["text"],
-                    event["offset"] / 10000000,
-                    (event["offset"] + event["duration"]) / 10000000
-                ))
+        cache = None
+        if TTS_CACHE_ENABLED:
+            # The cache only saves time: when it fails, the text is synthesized as if it were off
+            try:
+                cache = get_tts_cache()
+                cached_timings = cache.get(text, voice_name, output_path)
+                if cached_timings is not None:
+                    logger.info(f"Reused cached speech for {output_path} (voice {voice_name})")
+                    return cached_timings
+            except Exception as e:
+                logger.warning(f"TTS cache lookup failed, synthesizing {output_path}: {e}")
         
-        communicate_save = edge_tts.Communicate(text, voice_name)
-        await communicate_save.save(output_path)
+        with open(output_path, "wb") as audio_file:
+            word_timings = await async_stream_speech(text, voice_name, audio_file)
         
+        if cache is not None:
+            try:
+                cache.put(text, voice_name, output_path, word_timings)
+            except Exception as e:
+                logger.warning(f"Could not store {output_path} in the TTS cache: {e}")
+        try:
+            # Every fresh synthesis refines the voice's speech rate (see split_text_by_duration)
+            rate_model = get_speech_rate_model()
+            if rate_model.observe(text, word_timings, voice_name):
+                rate_model.save()
+        except Exception as e:
+            logger.warning(f"Could not update the speech rate model: {e}")
         logger.info(f"Successfully generated speech at {output_path} using voice {voice_name}")
         return word_timings
     except Exception as e:
@@ -200,12 +357,107 @@ def generate_speech(text: str, output_path: str, voice_name: str) -> List[Tuple[
     """Generate speech from text using Edge TTS and return word timings."""
     return asyncio.run(async_generate_speech(text, output_path, voice_name))
 
+async def async_generate_speech_batch(texts: List[str], output_paths: List[str], voice_name: str, max_concurrency: int = TTS_MAX_CONCURRENCY,
+                                      on_done: Callable[[int, List[Tuple[str, float, float]]], None] = None) -> List[List[Tuple[str, float, float]]]:
+    """
+    Synthesizes several texts concurrently, at most max_concurrency at a time.
+    on_done(index, word_timings) is called as each text finishes.
+    Returns the word timings of each text, in the same order as texts.
+    """
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def synthesize(index: int, text: str, output_path: str) -> List[Tuple[str, float, float]]:
+        async with semaphore:
+            # Each part gets its own trace lane: the syntheses overlap on one thread
+            with span("tts.part", category="tts", lane=TTS_TRACE_LANE + index, part=index + 1,
+                      words=len(text.split()), voice=voice_name) as tts_span:
+                word_timings = await async_generate_speech(text, output_path, voice_name)
+                tts_span.set(audio_seconds=round(word_timings[-1][2], 2) if word_timings else None)
+            if on_done:
+                on_done(index, word_timings)
+            return word_timings
+
+    return await asyncio.gather(*(
+        synthesize(index, text, path) for index, (text, path) in enumerate(zip(texts, output_paths))
+    ))
+
+def generate_speech_batch(texts: List[str], output_paths: List[str], voice_name: str, max_concurrency: int = TTS_MAX_CONCURRENCY,
+                          on_done: Callable[[int, List[Tuple[str, float, float]]], None] = None) -> List[List[Tuple[str, float, float]]]:
+    """Generate speech for every text on a single event loop and return their word timings in order."""
+    return asyncio.run(async_generate_speech_batch(texts, output_paths, voice_name, max_concurrency, on_done))
+
+def plan_story_speech(story: str, voice_name: str, voice_dir: str, manifest: ProjectManifest,
+                      target_seconds: float = PART_TARGET_SECONDS, max_seconds: float = PART_MAX_SECONDS,
+                      overhead_seconds: float = 0.0) -> dict:
+    """
+    Whole-story mode: synthesizes the story in one TTS call (kept as part 0
+    of the manifest, so a resumed project reuses it) and cuts it at the
+    sentence ends closest to evenly timed parts of about target_seconds,
+    with more parts if one would last over max_seconds once overhead_seconds
+    (intro, padding) are added.
+    Returns the story audio path, hash and word timings, and for each part
+    its segment text and the (start, end) of its slice of the audio.
+    """
+    story_path = os.path.join(voice_dir, "story.mp3")
+    story_key = stage_key(story, voice_name, TTS_ENGINE_VERSION)
+    entry = manifest.completed(0, 'audio', story_key)
+    if entry is None:
+        with span("tts.story", category="tts", words=len(story.split()), voice=voice_name) as tts_span:
+            word_timings = generate_speech(story, story_path, voice_name)
+            tts_span.set(audio_seconds=round(word_timings[-1][2], 2) if word_timings else None)
+        if not word_timings:
+            raise RuntimeError("No word boundaries received for the story, it cannot be cut into parts")
+        entry = manifest.complete(0, 'audio', story_key, [story_path], voice=voice_name, timings=word_timings)
+    word_timings = [tuple(timing) for timing in entry['timings']]
+    
+    sentences = split_sentences(story)
+    times = unit_times(sentences, word_timings)
+    parts = []
+    # The overlap sentence is cut from the audio too
+    for first, last, segment in _overlapped_parts(sentences, fit_parts(times, target_seconds, max_seconds, overhead_seconds)):
+        start, end = cut_points(times, first, last)
+        parts.append({'segment': segment, 'start': start, 'end': end})
+    logger.info(f"Story speech cut into {len(parts)} part(s) of about "
+                f"{(word_timings[-1][2] / len(parts)):.0f}s (target {target_seconds}s)")
+    return {'path': story_path, 'hash': sorted(manifest.file_hash(entry).values()), 'timings': word_timings, 'parts': parts}
+
+def build_story_parts(title: str, plan: dict, indexes: List[int], voice_filenames: List[str], voice_name: str, voice_dir: str,
+                      on_done: Callable[[int, List[Tuple[str, float, float]]], None] = None) -> None:
+    """
+    Whole-story mode: writes the audio of the parts at indexes (0-based), each
+    being its spoken title/part intro, a pause and its slice of the story
+    audio. All the intros are synthesized together in one TTS call.
+    on_done(position, word_timings) is called as each part is written.
+    """
+    total_parts = len(plan['parts'])
+    intros = [f"{title}\nPart {index + 1}/{total_parts}" if total_parts > 1 else title for index in indexes]
+    intros_path = os.path.join(voice_dir, "intros.mp3")
+    with span("tts.intros", category="tts", parts=len(indexes), voice=voice_name):
+        # A full stop after each intro makes the voice pause where the intros are cut apart
+        intro_timings = generate_speech("\n\n".join(intro if intro[-1] in ".!?" else f"{intro}." for intro in intros),
+                                        intros_path, voice_name)
+    intro_times = unit_times(intros, intro_timings)
+    intro_audio = load_audio(intros_path)
+    story_audio = load_audio(plan['path'])
+    for position, index in enumerate(indexes):
+        intro_start, intro_end = cut_points(intro_times, position, position)
+        part = plan['parts'][index]
+        with span("tts.slice", category="tts", part=index + 1):
+            word_timings = build_part_audio(
+                slice_audio(intro_audio, intro_start, intro_end), slice_timings(intro_timings, intro_start, intro_end),
+                story_audio, plan['timings'], part['start'], part['end'], voice_filenames[index]
+            )
+        if on_done:
+            on_done(position, word_timings)
+
 class VideoProgressLogger(ProgressBarLogger):
     def __init__(self, callback=None):
         super().__init__()
-        self.callback = callback
+        # Not stored as self.callback: proglog calls that hook on every log/bar update
+        self.progress_callback = callback
         self._bars = {}
         self.current_bar = None
+        self._last_progress = None
 
     def bars_callback(self, bar, attr, value, old_value=None):
         if bar not in self._bars:
@@ -223,9 +475,13 @@ class VideoProgressLogger(ProgressBarLogger):
             bar_data = self._bars[self.current_bar]
             if bar_data['total'] > 0:
                 progress = int((bar_data['index'] / bar_data['total']) * 100)
-                if callable(self.callback):
+                # proglog reports every frame: only whole-percent changes are passed on
+                if progress == self._last_progress:
+                    return
+                self._last_progress = progress
+                if callable(self.progress_callback):
                     try:
-                        self.callback(progress)
+                        self.progress_callback(progress)
                     except Exception as e:
                         print(f"Progress callback error: {e}")
 
@@ -238,92 +494,471 @@ def get_voice_name(selected_voice: str) -> str:
         return random.choice(VOICE_OPTIONS)
     return selected_voice
 
-def process_story_video(base_video: str, title: str, story: str, project_id: str, voice: str = None, progress_callback=None) -> List[str]:
+def render_part(job: dict, full_clip: VideoFileClip = None, part_callback=None) -> str:
+    """
+    Renders one part: picks a background window, writes the subtitle sidecars,
+    then composites or burns the captions and narration into job['out_filename'].
+    Opens its own VideoFileClip of the base video unless full_clip is given,
+    so it can run in a worker process; the ffmpeg render mode needs none when
+    job['base_info'] holds the indexed duration and size of the base video.
+    Returns the output file path.
+    """
+    base_info = job.get('base_info')
+    owns_clip = full_clip is None and (RENDER_MODE != "ffmpeg" or base_info is None)
+    if owns_clip:
+        full_clip = VideoFileClip(job['base_video'])
+    audio = background_clip = precut_path = None
+    try:
+        full_text = job['full_text']
+        word_timings = job['word_timings']
+        audio = AudioFileClip(job['voice_filename'])
+        
+        full_duration = base_info['duration'] if base_info else full_clip.duration
+        frame_size = (base_info['width'], base_info['height']) if base_info else full_clip.size
+        total_duration = audio.duration + END_PADDING_SECONDS
+        if full_duration < total_duration:
+            raise RuntimeError("Base video is shorter than required segment duration")
+        
+        max_start = full_duration - total_duration
+        start_time = choose_start_time(max_start, job.get('keyframes', []))
+        
+        with span("subtitles.plan", part=job['part'], words=len(word_timings)) as plan_span:
+            groups = build_subtitle_groups(full_text, word_timings)
+            if groups:
+                # Keep the last caption on screen until the end of the part
+                text, start, _end, fontsize = groups[-1]
+                groups[-1] = (text, start, total_duration, fontsize)
+            ass_path, _srt_path = export_subtitles(groups, job['script_dir'], f"subtitles_{job['part']}", frame_size)
+            plan_span.set(captions=len(groups))
+        
+        out_filename = job['out_filename']
+        profile = job['encoding_profile']
+        encode_start = time.perf_counter()
+        if RENDER_MODE == "ffmpeg":
+            # Frames never go through moviepy: cut, burn and mux in one ffmpeg run
+            with span("encode", part=job['part'], mode="ffmpeg", profile=profile['name'],
+                      audio_seconds=round(audio.duration, 2)) as encode_span:
+                burn_subtitles(
+                    job['base_video'], start_time, total_duration, ass_path, job['voice_filename'], out_filename,
+                    progress=lambda fraction: part_callback(int(fraction * 100)) if part_callback else None,
+                    encode_args=ffmpeg_encode_args(profile),
+                    video_filters=[scale_filter(profile['scale'])] if profile['scale'] != 1.0 else None
+                )
+                encode_span.set(output_bytes=os.path.getsize(out_filename))
+        else:
+            with span("background.subclip", part=job['part'], start=round(start_time, 3),
+                      seconds=round(total_duration, 2)) as subclip_span:
+                video_segment = None
+                if PRECUT_BACKGROUND and job.get('keyframes'):
+                    # Keyframe-aligned start: a stream copy of the window is cheap and exact
+                    precut_path = os.path.join(job['work_dir'], f"background_{job['part']}.mp4")
+                    try:
+                        precut(job['base_video'], start_time, min(total_duration + 1, full_duration - start_time), precut_path)
+                        background_clip = VideoFileClip(precut_path, audio=False)
+                        if background_clip.duration >= total_duration:
+                            video_segment = background_clip.subclip(0, total_duration)
+                    except Exception as e:
+                        logger.warning(f"Part {job['part']}: background precut failed, cutting the full clip instead: {e}")
+                subclip_span.set(precut=video_segment is not None)
+                if video_segment is None:
+                    video_segment = full_clip.subclip(start_time, start_time + total_duration)
+            
+            with span("subtitles.raster", part=job['part'], engine=SUBTITLE_ENGINE, captions=len(groups)):
+                if SUBTITLE_ENGINE == "overlay":
+                    overlay = create_subtitle_overlay(groups, video_segment.size)
+                    composite = overlay.apply(video_segment.set_audio(audio))
+                else:
+                    subs = create_group_subtitles(full_text, audio.duration, int(video_segment.w), word_timings)
+                    if subs:
+                        last_sub = subs[-1]
+                        subs[-1] = last_sub.set_duration(total_duration - last_sub.start)
+                    
+                    composite = CompositeVideoClip([video_segment.set_audio(audio)] + subs)
+            
+            progress_logger = VideoProgressLogger(part_callback)
+            
+            with span("encode", part=job['part'], mode="moviepy", profile=profile['name'],
+                      audio_seconds=round(audio.duration, 2)) as encode_span:
+                composite.write_videofile(
+                    out_filename,
+                    logger=progress_logger,
+                    **moviepy_write_kwargs(profile)
+                )
+                encode_span.set(output_bytes=os.path.getsize(out_filename))
+        encode_seconds = time.perf_counter() - encode_start
+        size = os.path.getsize(out_filename)
+        logger.info(f"Part {job['part']}/{job['total_parts']} written: {out_filename} "
+                    f"('{profile['name']}' profile, {encode_seconds:.1f}s, {size} bytes)")
+        if job.get('project_id'):
+            # The catalog gets the duration we rendered, so nobody has to probe the file again
+            with span("catalog.write", part=job['part']):
+                get_video_catalog().record_part(job['project_id'], job['part'], out_filename,
+                                                total_duration, size, encode_seconds)
+        return out_filename
+    finally:
+        if owns_clip:
+            full_clip.close()
+        if audio is not None:
+            audio.close()
+        if background_clip is not None:
+            background_clip.close()
+        if precut_path and os.path.exists(precut_path):
+            os.remove(precut_path)
+
+def _render_part_worker(job: dict, progress_queue) -> Tuple[str, List[dict]]:
+    """
+    Process pool entry point: renders a part and reports (part, progress) on progress_queue.
+    Returns the output path and the trace events recorded in this worker.
+    """
+    def part_callback(progress=0, **kwargs):
+        progress_queue.put((job['part'], progress))
+    tracer = start_trace()
+    with tracer.span("render.part", part=job['part']):
+        out_filename = render_part(job, part_callback=part_callback)
+    return out_filename, tracer.events
+
+def render_parts_parallel(jobs: List[dict], workers: int, progress_bus: ProgressBus = None,
+                          on_part_done: Callable[[dict, str], None] = None) -> List[str]:
+    """
+    Renders parts in a process pool. Per-part progress from every worker is
+    combined into a single 'render' stage on progress_bus, and
+    on_part_done(job, out_filename) is called in this process as each part
+    finishes. After a failure, parts already running are still collected
+    before the error is raised; queued parts are cancelled.
+    Returns output files in part order.
+    """
+    total_parts = len(jobs)
+    part_progress = {job['part']: 0 for job in jobs}
+    finished_parts = set()
+    output_files = {}
+    failure = None
+    tracer = get_tracer()
+    with multiprocessing.Manager() as manager:
+        progress_queue = manager.Queue()
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(_render_part_worker, job, progress_queue) for job in jobs]
+            pending = set(futures)
+            while pending:
+                done, pending = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future.cancelled():
+                        continue
+                    job = jobs[futures.index(future)]
+                    if future.exception() is not None:
+                        if failure is None:
+                            failure = future.exception()
+                            for queued in pending:
+                                queued.cancel()
+                        continue
+                    out_filename, events = future.result()
+                    tracer.extend(events)
+                    output_files[job['part']] = out_filename
+                    if on_part_done:
+                        on_part_done(job, out_filename)
+                    finished_parts.add(job['part'])
+                    part_progress[job['part']] = 100
+                updated = False
+                while True:
+                    try:
+                        part, progress = progress_queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if part not in finished_parts:
+                        part_progress[part] = progress
+                    updated = True
+                if progress_bus and (updated or done):
+                    overall = sum(part_progress.values()) / total_parts / 100
+                    progress_bus.publish('render', overall, total_parts=total_parts,
+                                         message=f"Rendering {total_parts} parts on {workers} workers ({len(finished_parts)}/{total_parts} done)")
+    if failure is not None:
+        raise failure
+    return [output_files[job['part']] for job in jobs]
+
+def process_story_video(base_video: str, title: str, story: str, project_id: str, voice: str = None, progress_callback=None, encoding_profile: str = None, stage_timings: dict = None, subreddit: str = None, progress_bus: ProgressBus = None, tracer: Tracer = None) -> List[str]:
     """
     Process a story into a video with voiceover and subtitles.
+    Progress is checkpointed in the project's manifest.json: calling it again
+    with the same project_id and story only redoes the missing or stale stages.
     Args:
-        base_video: Path to the base video file
+        base_video: Path to the base video file, or None to pick one from the background library
         title: Title of the story
         story: Text content of the story
         project_id: Unique identifier for the project
         voice: Voice name to use for TTS (optional)
-        progress_callback: Optional callback function for progress updates
+        progress_callback: Optional callback(progress, message), progress being 0-100 for the current part
+        encoding_profile: Name of the encoding profile (optional, defaults to the configured one)
+        stage_timings: Optional dict filled with the seconds spent per stage ('tts', 'background', 'render')
+        subreddit: Subreddit the story came from, recorded in the video catalog (optional)
+        progress_bus: Optional ProgressBus receiving typed, rate-limited progress events
+        tracer: Tracer of the job, whose spans are written to the project's trace.json (optional, a new trace by default)
     """
+    if stage_timings is None:
+        stage_timings = {}
+    if progress_bus is None:
+        progress_bus = ProgressBus()
+    if progress_callback:
+        def forward_progress(event: ProgressEvent) -> None:
+            fraction = event.part_fraction if event.part_fraction is not None else event.fraction
+            progress_callback(int(fraction * 100), event.message)
+        progress_bus.subscribe(forward_progress)
+    tracer = start_trace(tracer)
+    job_start_us = tracer.now_us()
     try:
-        logger.info(f"Using voice: {voice}")
-        selected_voice = get_voice_name(voice) if voice else get_voice_name("random")
-        logger.info(f"Selected voice: {selected_voice}")
+        profile = get_encoding_profile(encoding_profile)
+        logger.info(f"Encoding profile: {profile['name']}")
 
-        if not os.path.exists(base_video):
+        if base_video is not None and not os.path.exists(base_video):
             raise FileNotFoundError(f"Base video not found: {base_video}")
-        
-        segments = split_text_into_segments(story, MIN_WORDS_PER_SEGMENT, MAX_WORDS_PER_SEGMENT)
-        total_parts = len(segments)
-        logger.info(f"Split story into {total_parts} part(s)")
+        # Durations and geometry come from the library's index: indexed clips are never probed again
+        library = get_background_library()
+        background = library.metadata(base_video) if base_video is not None else None
         
         dirs = get_project_dirs(project_id)
         for dir_path in dirs.values():
             os.makedirs(dir_path, exist_ok=True)
         
+        # Checkpoints of an earlier run of this project: finished stages are skipped
+        manifest = ProjectManifest(dirs['project'])
+        resumed = manifest.begin(title, story, subreddit=subreddit, encoding_profile=profile['name'])
+        logger.info(f"Using voice: {voice}")
+        if resumed and voice in (None, "random") and manifest.job.get('voice'):
+            # Keep the voice already used for the finished parts
+            selected_voice = manifest.job['voice']
+        else:
+            selected_voice = get_voice_name(voice) if voice else get_voice_name("random")
+        manifest.job['voice'] = selected_voice
+        manifest.save()
+        logger.info(f"Selected voice: {selected_voice}")
+        
+        tts_seconds = 0.0
+        story_plan = None
+        with span("segment", words=len(story.split()), mode=TTS_MODE, segmenter=SEGMENTER) as segment_span:
+            # A part must fit in the base video (any clip of the library when none was given)
+            max_seconds = min(PART_MAX_SECONDS, background['duration'] if background else library.longest_duration())
+            plan_settings = {'mode': TTS_MODE, 'segmenter': SEGMENTER, 'voice': selected_voice,
+                             'target_seconds': PART_TARGET_SECONDS, 'max_seconds': PART_MAX_SECONDS,
+                             'min_words': MIN_WORDS_PER_SEGMENT, 'max_words': MAX_WORDS_PER_SEGMENT}
+            saved_plan = manifest.job.get('segment_plan')
+            # The speech rate model keeps learning from every synthesis, this project's included:
+            # planning again would move the part boundaries and invalidate every checkpoint
+            reuse_plan = saved_plan is not None and saved_plan['settings'] == plan_settings
+            segment_span.set(reused=reuse_plan)
+            if TTS_MODE == "whole_story":
+                if not reuse_plan:
+                    # Fails before the TTS call if the predicted narration cannot be cut into parts that fit
+                    split_text_by_duration(story, title, selected_voice, PART_TARGET_SECONDS, max_seconds)
+                # Part boundaries come from the timings of the whole narration
+                progress_bus.publish('tts', 0, message="Generating speech for the whole story")
+                stage_start = time.perf_counter()
+                overhead = intro_seconds(title, selected_voice) + INTRO_PAUSE_MS / 1000 + END_PADDING_SECONDS
+                story_plan = plan_story_speech(story, selected_voice, dirs['voice'], manifest,
+                                               PART_TARGET_SECONDS, max_seconds, overhead)
+                tts_seconds += time.perf_counter() - stage_start
+                segments = [part['segment'] for part in story_plan['parts']]
+            elif reuse_plan:
+                segments = saved_plan['segments']
+            elif SEGMENTER == "duration":
+                segments = split_text_by_duration(story, title, selected_voice, PART_TARGET_SECONDS, max_seconds)
+            else:
+                segments = split_text_into_segments(story, MIN_WORDS_PER_SEGMENT, MAX_WORDS_PER_SEGMENT)
+            total_parts = len(segments)
+            segment_span.set(parts=total_parts)
+        manifest.job['segment_plan'] = {'settings': plan_settings, 'segments': segments}
+        manifest.set_total_parts(total_parts)
+        logger.info(f"Split story into {total_parts} part(s)")
+        
         save_story_parts(title, segments, project_id)
-        full_clip = VideoFileClip(base_video)
-        full_duration = full_clip.duration
-        output_files = []
+        catalog = get_video_catalog()
+        with span("catalog.write", action="start"):
+            catalog.start_project(project_id, title, total_parts, subreddit=subreddit,
+                                  voice=selected_voice, encoding_profile=profile['name'])
         
-        for i, segment in enumerate(segments, 1):  # Start counting from 1
-            if progress_callback:
-                # Update part progress (0-100 for each part)
-                progress_callback(0, f"Processing part {i}/{total_parts}")
-            
+        part_texts = []
+        voice_filenames = []
+        script_keys = []
+        for i, segment in enumerate(segments, 1):
             part_info = f"\nPart {i}/{total_parts}" if total_parts > 1 else ""
-            full_text = f"{title}{part_info}\n\n{segment}"
-            
-            voice_filename = os.path.join(dirs['voice'], f"audio_{i}.mp3")
-            word_timings = generate_speech(full_text, voice_filename, selected_voice)
-            audio = AudioFileClip(voice_filename)
-            
-            total_duration = audio.duration + 3  # extra time for last subtitle
-            if full_duration < total_duration:
-                raise RuntimeError("Base video is shorter than required segment duration")
-            
-            max_start = full_duration - total_duration
-            start_time = random.uniform(0, max_start) if max_start > 0 else 0
-            video_segment = full_clip.subclip(start_time, start_time + total_duration)
-            
-            subs = create_group_subtitles(full_text, audio.duration, int(video_segment.w), word_timings)
-            if subs:
-                last_sub = subs[-1]
-                subs[-1] = last_sub.set_duration(total_duration - last_sub.start)
-            
-            composite = CompositeVideoClip([video_segment.set_audio(audio)] + subs)
-            safe_title = "".join(c for c in title if c.isalnum() or c in (' ', '-', '_')).strip().replace(' ', '_')
-            filename = f"{safe_title}.mp4" if len(segments) == 1 else f"{safe_title}_part{i}.mp4"
+            part_texts.append(f"{title}{part_info}\n\n{segment}")
+            voice_filenames.append(os.path.join(dirs['voice'], f"audio_{i}.mp3"))
+            script_path = os.path.join(dirs['script'], "script.txt" if total_parts == 1 else f"part_{i}.txt")
+            script_keys.append(stage_key(part_texts[-1]))
+            if not manifest.completed(i, 'script', script_keys[-1]):
+                manifest.complete(i, 'script', script_keys[-1], [script_path])
+        
+        # Synthesize the parts without valid audio up front on a single event loop
+        audio_keys = []
+        for index, key in enumerate(script_keys):
+            if story_plan is None:
+                audio_keys.append(stage_key(key, selected_voice, TTS_ENGINE_VERSION))
+            else:
+                # Cut from the story audio: depends on that audio and on where the part was cut
+                audio_keys.append(stage_key(key, selected_voice, TTS_ENGINE_VERSION, story_plan['hash'], story_plan['parts'][index]))
+        audio_entries = [manifest.completed(i, 'audio', key) for i, key in enumerate(audio_keys, 1)]
+        missing = [index for index, entry in enumerate(audio_entries) if entry is None]
+        
+        def record_audio(position: int, word_timings: List[Tuple[str, float, float]]) -> None:
+            index = missing[position]
+            audio_entries[index] = manifest.complete(index + 1, 'audio', audio_keys[index], [voice_filenames[index]],
+                                                     voice=selected_voice, timings=word_timings)
+        
+        stage_start = time.perf_counter()
+        if missing:
+            progress_bus.publish('tts', 0, message=f"Generating speech for {len(missing)} of {total_parts} part(s)")
+            with span("tts", parts=len(missing), reused=total_parts - len(missing), voice=selected_voice, mode=TTS_MODE):
+                if story_plan is None:
+                    generate_speech_batch([part_texts[index] for index in missing],
+                                          [voice_filenames[index] for index in missing], selected_voice, on_done=record_audio)
+                else:
+                    build_story_parts(title, story_plan, missing, voice_filenames, selected_voice, dirs['voice'],
+                                      on_done=record_audio)
+            if TTS_CACHE_ENABLED:
+                try:
+                    cache_stats = get_tts_cache().stats()
+                    logger.info(f"TTS cache: {cache_stats['hits']} hit(s), {cache_stats['misses']} miss(es), "
+                                f"{cache_stats['bytes']}/{cache_stats['max_bytes']} bytes")
+                except Exception as e:
+                    logger.warning(f"Could not read the TTS cache stats: {e}")
+        stage_timings['tts'] = tts_seconds + time.perf_counter() - stage_start
+        progress_bus.publish('tts', 1, message=f"Speech ready for {total_parts} part(s)")
+        all_word_timings = [[tuple(timing) for timing in entry['timings']] for entry in audio_entries]
+        if missing and story_plan is None:
+            rate_model = get_speech_rate_model()
+            for index in missing:
+                if all_word_timings[index]:
+                    logger.info(f"Part {index + 1}: narration predicted {rate_model.predict(part_texts[index], selected_voice):.1f}s, "
+                                f"got {all_word_timings[index][-1][2]:.1f}s")
+        
+        with span("background.pick", given=background is not None) as pick_span:
+            if background is None:
+                # Any clip long enough for the longest part; a resumed project keeps its clip
+                required = max((timings[-1][2] for timings in all_word_timings if timings), default=0.0)
+                background = library.choose(required + END_PADDING_SECONDS + AUDIO_TAIL_SECONDS,
+                                            preferred=manifest.job.get('background'))
+                base_video = background['path']
+            else:
+                library.mark_used(background['path'])
+            pick_span.set(clip=os.path.basename(background['path']), seconds=round(background['duration'], 1))
+        manifest.job['background'] = background['path']
+        manifest.save()
+        logger.info(f"Background: {background['path']} ({background['duration']:.0f}s, "
+                    f"{background['width']}x{background['height']}, {background['codec']})")
+        
+        # A part is done when its subtitles and video were built from the current audio and settings
+        render_settings = [background['path'], background['size'], background['mtime'],
+                           profile, RENDER_MODE, SUBTITLE_ENGINE, SUBTITLE_RENDERER]
+        safe_title = "".join(c for c in title if c.isalnum() or c in (' ', '-', '_')).strip().replace(' ', '_')
+        output_files = {}
+        render_keys = {}
+        for i in range(1, total_parts + 1):
+            filename = f"{safe_title}.mp4" if total_parts == 1 else f"{safe_title}_part{i}.mp4"
             out_filename = os.path.join(dirs['final'], filename)
-            
-            # Fix: Update lambda to handle prog argument correctly
-            def make_progress_callback(part_num, total_parts):
-                def callback(progress=0, message=f"Processing part {part_num}/{total_parts}", **kwargs):
-                    if progress_callback:
-                        progress_callback(progress, message)
+            subtitles_key = stage_key(audio_keys[i - 1], sorted(manifest.file_hash(audio_entries[i - 1]).values()),
+                                      FONT_NAME, FONT_SIZE, ALIGNMENT_VERSION)
+            video_key = stage_key(subtitles_key, render_settings)
+            video_entry = manifest.completed(i, 'video', video_key)
+            if manifest.completed(i, 'subtitles', subtitles_key) and video_entry:
+                output_files[i] = out_filename
+                catalog.record_part(project_id, i, out_filename, video_entry['duration'],
+                                    os.path.getsize(out_filename), video_entry['encode_seconds'])
+            else:
+                render_keys[i] = (subtitles_key, video_key, out_filename)
+        if output_files:
+            logger.info(f"Resuming project {project_id}: part(s) {sorted(output_files)} already rendered, "
+                        f"{len(missing)} part(s) synthesized")
+        
+        def record_rendered_part(job: dict, out_filename: str) -> None:
+            subtitles_key, video_key, _out_filename = render_keys[job['part']]
+            subtitle_base = os.path.join(job['script_dir'], f"subtitles_{job['part']}")
+            manifest.complete(job['part'], 'subtitles', subtitles_key, [f"{subtitle_base}.ass", f"{subtitle_base}.srt"])
+            rendered = catalog.get_part(project_id, job['part']) or {}
+            manifest.complete(job['part'], 'video', video_key, [out_filename],
+                              duration=rendered.get('duration'), encode_seconds=rendered.get('encode_seconds'))
+            output_files[job['part']] = out_filename
+        
+        if not render_keys:
+            stage_timings['background'] = stage_timings['render'] = 0.0
+            with span("catalog.write", action="finish"):
+                catalog.finish_project(project_id)
+            return [output_files[i] for i in range(1, total_parts + 1)]
+        
+        stage_start = time.perf_counter()
+        with span("background", proxy=USE_BACKGROUND_PROXY) as background_span:
+            base_info = background
+            if USE_BACKGROUND_PROXY:
+                progress_bus.publish('background', 0, message="Preparing background proxy")
+                try:
+                    base_video = get_proxy(base_video, fingerprint=background['fingerprint'])
+                    # The proxy is the indexed clip at the proxy geometry: it is never indexed itself
+                    base_info = dict(background, width=PROXY_PROFILE['width'], height=PROXY_PROFILE['height'])
+                except Exception as e:
+                    logger.warning(f"Background proxy unavailable, using the source video: {e}")
+                    background_span.set(proxy_error=str(e))
+            keyframes = get_keyframes(base_video)
+            background_span.set(keyframes=len(keyframes))
+        stage_timings['background'] = time.perf_counter() - stage_start
+        progress_bus.publish('background', 1, message="Background ready")
+        jobs = []
+        for i, (_subtitles_key, _video_key, out_filename) in sorted(render_keys.items()):
+            jobs.append({
+                'part': i,
+                'total_parts': total_parts,
+                'base_video': base_video,
+                'base_info': {key: base_info[key] for key in ('duration', 'width', 'height')},
+                'full_text': part_texts[i - 1],
+                'voice_filename': voice_filenames[i - 1],
+                'word_timings': all_word_timings[i - 1],
+                'script_dir': dirs['script'],
+                'work_dir': dirs['work'],
+                'keyframes': keyframes,
+                'encoding_profile': profile,
+                'project_id': project_id,
+                'out_filename': out_filename
+            })
+        
+        stage_start = time.perf_counter()
+        workers = min(RENDER_WORKERS if RENDER_WORKERS > 0 else (os.cpu_count() or 1), len(jobs))
+        if workers > 1:
+            logger.info(f"Rendering {len(jobs)} parts on {workers} worker processes")
+            with span("render", parts=len(jobs), workers=workers):
+                render_parts_parallel(jobs, workers, progress_bus, on_part_done=record_rendered_part)
+        else:
+            def make_progress_callback(position, part_num):
+                def callback(progress=0, **kwargs):
+                    progress_bus.publish('render', (position + progress / 100) / len(jobs), part=part_num,
+                                         total_parts=total_parts, part_fraction=progress / 100,
+                                         message=f"Processing part {part_num}/{total_parts}")
                 return callback
             
-            progress_logger = VideoProgressLogger(make_progress_callback(i, total_parts))
-            
-            composite.write_videofile(
-                out_filename,
-                audio_codec="aac",
-                logger=progress_logger
-            )
-            logger.info(f"Part {i}/{total_parts} written: {out_filename}")
-            output_files.append(out_filename)
+            with span("render", parts=len(jobs), workers=1):
+                full_clip = VideoFileClip(base_video) if RENDER_MODE != "ffmpeg" else None
+                for position, job in enumerate(jobs):
+                    part_callback = make_progress_callback(position, job['part'])
+                    with span("render.part", part=job['part']):
+                        out_filename = render_part(job, full_clip, part_callback)
+                    record_rendered_part(job, out_filename)
+        stage_timings['render'] = time.perf_counter() - stage_start
+        with span("catalog.write", action="finish"):
+            catalog.finish_project(project_id)
         
-        return output_files
+        return [output_files[i] for i in range(1, total_parts + 1)]
         
     except Exception as e:
         logger.error(f"Failed to process video: {str(e)}", exc_info=True)
+        try:
+            get_video_catalog().fail_project(project_id, str(e), title)
+        except Exception as catalog_error:
+            logger.warning(f"Could not record the failure in the video catalog: {catalog_error}")
         raise RuntimeError(f"Video processing failed: {str(e)}")
     finally:
-        if 'full_clip' in locals():
+        tracer.record("process_story_video", job_start_us, project_id=project_id, title=title,
+                      ok=sys.exc_info()[0] is None)
+        trace_path = tracer.export_chrome(os.path.join(get_project_dirs(project_id)['project'], "trace.json"))
+        if trace_path:
+            logger.info(f"Trace written to {trace_path}")
+        progress_bus.flush()
+        if progress_callback:
+            progress_bus.unsubscribe(forward_progress)
+        if locals().get('full_clip') is not None:
             full_clip.close()
         # Clean up temporary video files at project root
         cleanup_temp_videos()
@@ -0,0 +1,100 @@
+import os
+from typing import List, Tuple
+from config import FONT_SIZE, FONT_NAME
+
+# Caption style, matching the rasterized subtitles (white, black stroke, drop shadow)
+ASS_PRIMARY_COLOUR = "&H00FFFFFF"
+ASS_OUTLINE_COLOUR = "&H00000000"
+ASS_SHADOW_COLOUR = "&H00000000"
+ASS_OUTLINE = 2.5
+ASS_SHADOW = 2
+
+def format_srt_time(seconds: float) -> str:
+    """Formats seconds as an SRT timestamp (HH:MM:SS,mmm)."""
+    millis = int(round(max(seconds, 0) * 1000))
+    hours, millis = divmod(millis, 3600000)
+    minutes, millis = divmod(millis, 60000)
+    secs, millis = divmod(millis, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d},{millis:03d}"
+
+def format_ass_time(seconds: float) -> str:
+    """Formats seconds as an ASS timestamp (H:MM:SS.cc)."""
+    centis = int(round(max(seconds, 0) * 100))
+    hours, centis = divmod(centis, 360000)
+    minutes, centis = divmod(centis, 6000)
+    secs, centis = divmod(centis, 100)
+    return f"{hours:d}:{minutes:02d}:{secs:02d}.{centis:02d}"
+
+def _caption_lines(text: str) -> List[str]:
+    """Same text treatment as the rasterized captions: upper case, break after hyphens."""
+    return text.upper().replace("-", "-\n").split("\n")
+
+def write_srt(groups: List[Tuple[str, float, float, int]], output_path: str) -> str:
+    """
+    Writes subtitle groups (text, start, end, fontsize) as an SRT file.
+    Returns the path of the written file.
+    """
+    entries = []
+    for index, (text, start, end, _fontsize) in enumerate(groups, 1):
+        lines = "\n".join(line.strip() for line in _caption_lines(text) if line.strip())
+        entries.append(f"{index}\n{format_srt_time(start)} --> {format_srt_time(end)}\n{lines}\n")
+    with open(output_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(entries))
+    return output_path
+
+def _ass_style_name(fontsize: int) -> str:
+    return "Default" if fontsize == FONT_SIZE else f"Size{fontsize}"
+
+def _ass_escape(line: str) -> str:
+    return line.replace("\\", "\\\\").replace("{", "\\{").replace("}", "\\}")
+
+def write_ass(groups: List[Tuple[str, float, float, int]], output_path: str, frame_size: Tuple[int, int], font: str = FONT_NAME) -> str:
+    """
+    Writes subtitle groups (text, start, end, fontsize) as a styled ASS file
+    with one style per font size, centered on a frame_size canvas.
+    Returns the path of the written file.
+    """
+    width, height = frame_size
+    margin = int(width * 0.05)
+    fontsizes = sorted({FONT_SIZE} | {fontsize for _, _, _, fontsize in groups})
+
+    lines = [
+        "[Script Info]",
+        "ScriptType: v4.00+",
+        f"PlayResX: {width}",
+        f"PlayResY: {height}",
+        "WrapStyle: 0",
+        "ScaledBorderAndShadow: yes",
+        "",
+        "[V4+ Styles]",
+        "Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, BackColour, "
+        "Bold, Italic, Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, BorderStyle, Outline, Shadow, "
+        "Alignment, MarginL, MarginR, MarginV, Encoding",
+    ]
+    for fontsize in fontsizes:
+        lines.append(
+            f"Style: {_ass_style_name(fontsize)},{font},{fontsize},{ASS_PRIMARY_COLOUR},{ASS_PRIMARY_COLOUR},"
+            f"{ASS_OUTLINE_COLOUR},{ASS_SHADOW_COLOUR},0,0,0,0,100,100,0,0,1,{ASS_OUTLINE},{ASS_SHADOW},"
+            f"5,{margin},{margin},0,1"
+        )
+    lines += [
+        "",
+        "[Events]",
+        "Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text",
+    ]
+    for text, start, end, fontsize in groups:
+        caption = "\\N".join(_ass_escape(line.strip()) for line in _caption_lines(text) if line.strip())
+        lines.append(
+            f"Dialogue: 0,{format_ass_time(start)},{format_ass_time(end)},{_ass_style_name(fontsize)},,0,0,0,,{caption}"
+        )
+
+    with open(output_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    return output_path
+
+def export_subtitles(groups: List[Tuple[str, float, float, int]], output_dir: str, basename: str, frame_size: Tuple[int, int]) -> Tuple[str, str]:
+    """Writes both sidecar files for a part. Returns (ass_path, srt_path)."""
+    os.makedirs(output_dir, exist_ok=True)
+    ass_path = write_ass(groups, os.path.join(output_dir, f"{basename}.ass"), frame_size)
+    srt_path = write_srt(groups, os.path.join(output_dir, f"{basename}.srt"))
+    return ass_path, srt_path
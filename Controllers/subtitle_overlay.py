@@ -0,0 +1,73 @@
+from bisect import bisect_right
+from typing import List, Optional, Tuple
+import numpy as np
+from moviepy.editor import VideoClip
+
+class SubtitleOverlay:
+    """
+    Burns pre-rendered RGBA captions onto video frames.
+
+    Captions are kept sorted by start time so the active one is found with a
+    binary search, and only its bounding box is alpha-blended onto the frame.
+    At most one caption is visible at a time: each caption ends no later than
+    the next one starts.
+    """
+
+    def __init__(self, captions: List[Tuple[float, float, np.ndarray]], frame_size: Tuple[int, int]):
+        """
+        Args:
+            captions: (start_time, end_time, rgba_bitmap) tuples
+            frame_size: (width, height) of the frames the overlay is applied to
+        """
+        frame_w, frame_h = frame_size
+        captions = sorted(captions, key=lambda caption: caption[0])
+        self.starts: List[float] = []
+        self.ends: List[float] = []
+        self._layers = []
+
+        for index, (start, end, rgba) in enumerate(captions):
+            if index + 1 < len(captions):
+                end = min(end, captions[index + 1][0])
+            if end <= start:
+                continue
+
+            # Center the bitmap, cropping whatever falls outside the frame
+            h, w = rgba.shape[:2]
+            x, y = (frame_w - w) // 2, (frame_h - h) // 2
+            x0, y0 = max(x, 0), max(y, 0)
+            x1, y1 = min(x + w, frame_w), min(y + h, frame_h)
+            if x1 <= x0 or y1 <= y0:
+                continue
+            crop = rgba[y0 - y:y1 - y, x0 - x:x1 - x].astype(np.float32)
+
+            alpha = crop[:, :, 3:4] / 255.0
+            premultiplied = crop[:, :, :3] * alpha
+            self.starts.append(start)
+            self.ends.append(end)
+            self._layers.append((slice(y0, y1), slice(x0, x1), premultiplied, 1.0 - alpha))
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def active_index(self, t: float) -> Optional[int]:
+        """Index of the caption visible at time t, or None."""
+        index = bisect_right(self.starts, t) - 1
+        if index >= 0 and t < self.ends[index]:
+            return index
+        return None
+
+    def blend(self, frame: np.ndarray, t: float) -> np.ndarray:
+        """Alpha-blends the caption active at time t onto frame."""
+        index = self.active_index(t)
+        if index is None:
+            return frame
+        rows, cols, premultiplied, inverse_alpha = self._layers[index]
+        # Source clips may hand out cached (or read-only) frames, never blend in place
+        frame = frame.copy()
+        region = frame[rows, cols].astype(np.float32)
+        frame[rows, cols] = (region * inverse_alpha + premultiplied).astype(np.uint8)
+        return frame
+
+    def apply(self, clip: VideoClip) -> VideoClip:
+        """Returns clip with the captions burned into each frame (audio is kept)."""
+        return clip.fl(lambda get_frame, t: self.blend(get_frame(t), t))
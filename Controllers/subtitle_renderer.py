@@ -0,0 +1,76 @@
+import os
+import logging
+from functools import lru_cache
+from typing import List
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+logger = logging.getLogger(__name__)
+
+# Fallback fonts tried when the configured font name cannot be resolved
+FALLBACK_FONTS = ["DejaVuSans-Bold.ttf", "Arial Bold.ttf", "arialbd.ttf", "LiberationSans-Bold.ttf"]
+
+TEXT_COLOR = (255, 255, 255, 255)
+STROKE_COLOR = (0, 0, 0, 255)
+SHADOW_COLOR = (0, 0, 0, 255)
+SHADOW_OFFSET = (2, 2)
+
+@lru_cache(maxsize=32)
+def load_font(font: str, fontsize: int) -> ImageFont.FreeTypeFont:
+    """
+    Resolves a font name ("Impact") or path to a Pillow font, trying the usual
+    file-name spellings before falling back to a bold sans-serif.
+    """
+    candidates = [font, f"{font}.ttf", f"{font.lower()}.ttf"] + FALLBACK_FONTS
+    for candidate in candidates:
+        try:
+            return ImageFont.truetype(candidate, fontsize)
+        except OSError:
+            continue
+    raise OSError(f"Could not load font '{font}' or any fallback font")
+
+def wrap_text(text: str, font: ImageFont.FreeTypeFont, max_width: int, stroke_width: int = 0) -> List[str]:
+    """
+    Greedy word wrap to max_width pixels, like ImageMagick's caption method.
+    Explicit newlines in text are kept as line breaks.
+    """
+    lines = []
+    for paragraph in text.split("\n"):
+        current = ""
+        for word in paragraph.split():
+            candidate = f"{current} {word}".strip()
+            if current and font.getlength(candidate) + 2 * stroke_width > max_width:
+                lines.append(current)
+                current = word
+            else:
+                current = candidate
+        lines.append(current)
+    return lines
+
+def render_caption(text: str, box_width: int, fontsize: int, font: str, stroke_width: float = 2.5) -> np.ndarray:
+    """
+    Rasterizes centered, wrapped caption text with a black stroke and a drop
+    shadow in a single pass.
+    Returns: RGBA uint8 array of shape (height, box_width, 4).
+    """
+    pil_font = load_font(font, int(fontsize))
+    # ImageMagick centers its stroke on the glyph outline, Pillow draws it fully outside
+    stroke_px = max(1, int(round(stroke_width / 2)))
+    lines = wrap_text(text, pil_font, box_width, stroke_px)
+
+    ascent, descent = pil_font.getmetrics()
+    line_height = ascent + descent
+    height = line_height * len(lines) + 2 * stroke_px
+
+    image = Image.new("RGBA", (box_width, height), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(image)
+    shadow_x, shadow_y = SHADOW_OFFSET
+    for row, line in enumerate(lines):
+        if not line:
+            continue
+        x = (box_width - pil_font.getlength(line)) / 2
+        y = stroke_px + row * line_height
+        draw.text((x + shadow_x, y + shadow_y), line, font=pil_font, fill=SHADOW_COLOR)
+        draw.text((x, y), line, font=pil_font, fill=TEXT_COLOR,
+                  stroke_width=stroke_px, stroke_fill=STROKE_COLOR)
+    return np.array(image)
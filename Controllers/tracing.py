@@ -0,0 +1,105 @@
+import os
+import json
+import time
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
+from config import TRACE_ENABLED
+
+class Span:
+    """One timed operation; attributes added with set() end up in the trace event's args."""
+
+    def __init__(self, name: str, category: str, attrs: dict, lane: Optional[int] = None):
+        self.name = name
+        self.category = category
+        self.attrs = attrs
+        self.lane = lane
+        self.start_us = Tracer.now_us()
+        self.duration_us = 0
+
+    def set(self, **attrs) -> None:
+        self.attrs.update(attrs)
+
+    def to_event(self) -> dict:
+        """Chrome trace-event ("complete" event) for this span."""
+        # Concurrent spans of one thread (asyncio TTS) get their own lane so they don't overlap in viewers
+        tid = threading.get_ident() if self.lane is None else self.lane
+        return {
+            'name': self.name, 'cat': self.category, 'ph': 'X',
+            'ts': self.start_us, 'dur': self.duration_us,
+            'pid': os.getpid(), 'tid': tid,
+            'args': {key: value for key, value in self.attrs.items() if value is not None}
+        }
+
+class Tracer:
+    """Collects the spans of one job and exports them as Chrome trace-event JSON."""
+
+    def __init__(self):
+        self.events: List[dict] = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name: str, category: str = "pipeline", lane: Optional[int] = None, **attrs) -> Iterator[Span]:
+        span = Span(name, category, attrs, lane)
+        try:
+            yield span
+        except BaseException as e:
+            span.set(error=str(e) or type(e).__name__)
+            raise
+        finally:
+            span.duration_us = self.now_us() - span.start_us
+            if TRACE_ENABLED:
+                with self._lock:
+                    self.events.append(span.to_event())
+
+    @staticmethod
+    def now_us() -> int:
+        return time.time_ns() // 1000
+
+    def record(self, name: str, start_us: int, category: str = "pipeline", **attrs) -> None:
+        """Adds a span that started at start_us (see now_us) and ends now, for code too long to wrap in a with block."""
+        span = Span(name, category, attrs)
+        span.start_us = start_us
+        span.duration_us = self.now_us() - start_us
+        if TRACE_ENABLED:
+            with self._lock:
+                self.events.append(span.to_event())
+
+    def extend(self, events: List[dict]) -> None:
+        """Adds events recorded elsewhere, e.g. returned by a render worker process."""
+        with self._lock:
+            self.events.extend(events)
+
+    def export_chrome(self, path: str) -> Optional[str]:
+        """Writes the spans as a Chrome trace (chrome://tracing, Perfetto). Returns the path, None if disabled."""
+        if not TRACE_ENABLED:
+            return None
+        with self._lock:
+            events = sorted(self.events, key=lambda event: event['ts'])
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+        return path
+
+_current_tracer: contextvars.ContextVar = contextvars.ContextVar("tracer", default=None)
+
+def start_trace(tracer: Optional[Tracer] = None) -> Tracer:
+    """
+    Makes tracer (a new one by default) the trace of the job running in this
+    thread (or asyncio task) and returns it. Threads don't inherit the caller's
+    trace: a job's worker threads call start_trace with the job's tracer.
+    """
+    if tracer is None:
+        tracer = Tracer()
+    _current_tracer.set(tracer)
+    return tracer
+
+def get_tracer() -> Tracer:
+    """The current job's tracer, started on first use."""
+    tracer = _current_tracer.get()
+    return tracer if tracer is not None else start_trace()
+
+def span(name: str, category: str = "pipeline", lane: Optional[int] = None, **attrs):
+    """Context manager timing a span on the current tracer: `with span("encode", part=2) as s: ...`"""
+    return get_tracer().span(name, category, lane, **attrs)
@@ -0,0 +1,202 @@
+import os
+import json
+import time
+import shutil
+import sqlite3
+import hashlib
+import logging
+from typing import List, Optional, Tuple
+import edge_tts
+from config import TTS_CACHE_DIR, TTS_CACHE_MAX_BYTES
+
+logger = logging.getLogger(__name__)
+
+# Part of the cache key so an edge-tts upgrade never serves stale audio
+TTS_ENGINE_VERSION = f"edge-tts/{getattr(edge_tts, '__version__', 'unknown')}"
+
+INDEX_FILENAME = "index.sqlite3"
+# index.json of earlier versions, imported once
+LEGACY_INDEX_FILENAME = "index.json"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used);
+"""
+
+def normalize_text(text: str) -> str:
+    """Collapses whitespace so formatting-only differences share a cache entry."""
+    return " ".join(text.split())
+
+class TTSCache:
+    """
+    Content-addressed disk cache for synthesized speech.
+    Each entry holds the mp3 and its (word, start, end) timings; the total size
+    is kept under max_bytes by evicting the least recently used entries.
+    The index is a SQLite table, so concurrent processes (batch workers)
+    share it without overwriting each other's entries.
+    """
+
+    def __init__(self, cache_dir: str = TTS_CACHE_DIR, max_bytes: int = TTS_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.db_path = os.path.join(cache_dir, INDEX_FILENAME)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+        self.migrate_legacy_index()
+        self.prune_missing()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    @staticmethod
+    def make_key(text: str, voice_name: str) -> str:
+        """Hash of (normalized text, voice name, TTS engine version)."""
+        payload = json.dumps([normalize_text(text), voice_name, TTS_ENGINE_VERSION])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _audio_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.mp3")
+
+    def _timings_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def migrate_legacy_index(self) -> None:
+        """Imports the entries of an old index.json, once."""
+        legacy_path = os.path.join(self.cache_dir, LEGACY_INDEX_FILENAME)
+        if not os.path.exists(legacy_path):
+            return
+        try:
+            with open(legacy_path, "r", encoding="utf-8") as f:
+                legacy = json.load(f)
+        except (json.JSONDecodeError, OSError):
+            legacy = {}
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO entries (key, size, last_used) VALUES (?, ?, ?)",
+                [(key, entry["size"], entry["last_used"]) for key, entry in legacy.items()]
+            )
+        try:
+            os.replace(legacy_path, legacy_path + ".migrated")
+        except OSError:
+            pass
+
+    def prune_missing(self) -> None:
+        """Drops entries whose files were removed behind our back."""
+        with self._connect() as conn:
+            keys = [row[0] for row in conn.execute("SELECT key FROM entries")]
+            missing = [(key,) for key in keys
+                       if not (os.path.exists(self._audio_path(key)) and os.path.exists(self._timings_path(key)))]
+            conn.executemany("DELETE FROM entries WHERE key = ?", missing)
+
+    @property
+    def total_bytes(self) -> int:
+        with self._connect() as conn:
+            return conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def get(self, text: str, voice_name: str, output_path: str) -> Optional[List[Tuple[str, float, float]]]:
+        """
+        Copies the cached mp3 to output_path and returns its word timings,
+        or None on a cache miss.
+        """
+        key = self.make_key(text, voice_name)
+        with self._connect() as conn:
+            found = conn.execute("SELECT 1 FROM entries WHERE key = ?", (key,)).fetchone()
+        if found is None:
+            self.misses += 1
+            return None
+        try:
+            with open(self._timings_path(key), "r", encoding="utf-8") as f:
+                word_timings = [tuple(timing) for timing in json.load(f)]
+            shutil.copyfile(self._audio_path(key), output_path)
+        except (OSError, json.JSONDecodeError) as e:
+            # Also reached when another process evicted the entry meanwhile
+            logger.warning(f"Dropping unreadable TTS cache entry {key}: {e}")
+            self._remove(key)
+            self.misses += 1
+            return None
+        with self._connect() as conn:
+            conn.execute("UPDATE entries SET last_used = ? WHERE key = ?", (time.time(), key))
+        self.hits += 1
+        return word_timings
+
+    def put(self, text: str, voice_name: str, audio_path: str, word_timings: List[Tuple[str, float, float]]) -> None:
+        """Stores a synthesized mp3 and its timings, then evicts down to the byte budget."""
+        key = self.make_key(text, voice_name)
+        # Written under per-process names then moved in place: readers never see half a file
+        suffix = f".{os.getpid()}.tmp"
+        shutil.copyfile(audio_path, self._audio_path(key) + suffix)
+        with open(self._timings_path(key) + suffix, "w", encoding="utf-8") as f:
+            json.dump(word_timings, f)
+        size = os.path.getsize(self._audio_path(key) + suffix) + os.path.getsize(self._timings_path(key) + suffix)
+        os.replace(self._audio_path(key) + suffix, self._audio_path(key))
+        os.replace(self._timings_path(key) + suffix, self._timings_path(key))
+        with self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO entries (key, size, last_used) VALUES (?, ?, ?)",
+                         (key, size, time.time()))
+        self.evict()
+
+    def evict(self) -> None:
+        """Removes least recently used entries until the cache fits in max_bytes."""
+        conn = self._connect()
+        try:
+            # One evicting process at a time, so the budget is computed on the committed index
+            conn.execute("BEGIN IMMEDIATE")
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            evicted = []
+            for key, size in conn.execute("SELECT key, size FROM entries ORDER BY last_used").fetchall():
+                if total <= self.max_bytes:
+                    break
+                total -= size
+                evicted.append(key)
+            conn.executemany("DELETE FROM entries WHERE key = ?", [(key,) for key in evicted])
+            conn.commit()
+        finally:
+            conn.close()
+        for key in evicted:
+            self._remove_files(key)
+
+    def _remove(self, key: str) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+        self._remove_files(key)
+
+    def _remove_files(self, key: str) -> None:
+        for path in (self._audio_path(key), self._timings_path(key)):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def clear(self) -> None:
+        with self._connect() as conn:
+            keys = [row[0] for row in conn.execute("SELECT key FROM entries")]
+        for key in keys:
+            self._remove(key)
+
+    def stats(self) -> dict:
+        with self._connect() as conn:
+            entries, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": entries,
+            "bytes": total,
+            "max_bytes": self.max_bytes
+        }
+
+_default_cache: Optional[TTSCache] = None
+
+def get_tts_cache() -> TTSCache:
+    """Returns the process-wide TTS cache."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = TTSCache()
+    return _default_cache
@@ -1,10 +1,10 @@
 import os
 import logging
 import asyncio
-import edge_tts
 from typing import Optional, List, Tuple
 from moviepy.editor import VideoFileClip, AudioFileClip, CompositeVideoClip
 from config import OUTPUT_DIR, get_project_dirs
+from story_video_generator import async_stream_speech
 
 logger = logging.getLogger(__name__)
 
@@ -14,18 +14,9 @@ async def async_generate_speech_with_timing(text: str, output_path: str) -> List
     Returns: List of (word, start_time, end_time) tuples
     """
     try:
-        communicate = edge_tts.Communicate(text, "en-US-JennyNeural")
-        # Get word timings while generating audio
-        word_timings = []
-        async for event in communicate.stream():
-            if event["type"] == "WordBoundary":
-                word_timings.append((
-                    event["text"],
-                    event["offset"] / 10000000,  # Convert to seconds
-                    (event["offset"] + event["duration"]) / 10000000
-                ))
-        # Save the audio file
-        await communicate.save(output_path)
+        # Single stream: audio chunks are written while the boundaries are collected
+        with open(output_path, "wb") as audio_file:
+            word_timings = await async_stream_speech(text, "en-US-JennyNeural", audio_file)
         logger.info(f"Successfully generated speech to {output_path}")
         return word_timings
     except Exception as e:
@@ -0,0 +1,206 @@
+import os
+import json
+import time
+import sqlite3
+import logging
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+from config import VIDEO_CATALOG_DB, VIDEOS_DB_LEGACY
+
+logger = logging.getLogger(__name__)
+
+STATUS_GENERATING = "Generating"
+STATUS_GENERATED = "Generated"
+STATUS_ERROR = "Error"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS projects (
+    project_id TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    subreddit TEXT,
+    voice TEXT,
+    encoding_profile TEXT,
+    status TEXT NOT NULL,
+    error TEXT,
+    created_at REAL NOT NULL,
+    total_parts INTEGER NOT NULL DEFAULT 0,
+    -- Humanized length imported from the old videos.json, when no durations are known
+    legacy_length TEXT
+);
+CREATE INDEX IF NOT EXISTS projects_created ON projects (created_at);
+CREATE INDEX IF NOT EXISTS projects_status ON projects (status);
+CREATE TABLE IF NOT EXISTS parts (
+    project_id TEXT NOT NULL REFERENCES projects (project_id) ON DELETE CASCADE,
+    part INTEGER NOT NULL,
+    path TEXT NOT NULL,
+    duration REAL,
+    size INTEGER,
+    encode_seconds REAL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (project_id, part)
+);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+class VideoCatalog:
+    """
+    SQLite catalog of generated videos: one row per project and one per part.
+    Durations, sizes and encode times are recorded by the renderer as each
+    part is written, so listing the catalog never opens a media file.
+    """
+
+    def __init__(self, db_path: str = VIDEO_CATALOG_DB, legacy_file: str = VIDEOS_DB_LEGACY):
+        self.db_path = db_path
+        self.legacy_file = legacy_file
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+        self.migrate_legacy_file()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA foreign_keys=ON")
+        return conn
+
+    def migrate_legacy_file(self) -> None:
+        """Imports the old videos.json once (file paths and lengths only, nothing is probed)."""
+        if not os.path.exists(self.legacy_file):
+            return
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            if conn.execute("SELECT 1 FROM meta WHERE key = 'legacy_migrated'").fetchone():
+                conn.rollback()
+                return
+            try:
+                with open(self.legacy_file, 'r', encoding='utf-8') as f:
+                    entries = json.load(f)
+            except (json.JSONDecodeError, OSError):
+                entries = {}
+            for project_id, entry in entries.items():
+                try:
+                    created_at = datetime.strptime(entry.get('date', ''), '%Y-%m-%d').timestamp()
+                except ValueError:
+                    created_at = 0
+                files = entry.get('files', [])
+                status = STATUS_GENERATED if files else STATUS_ERROR
+                conn.execute(
+                    """INSERT OR IGNORE INTO projects
+                       (project_id, title, status, error, created_at, total_parts, legacy_length)
+                       VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                    (str(project_id), entry.get('title', 'Unknown'), status,
+                     entry.get('status') if status == STATUS_ERROR else None,
+                     created_at, entry.get('parts', len(files)), entry.get('length'))
+                )
+                conn.executemany(
+                    "INSERT OR IGNORE INTO parts (project_id, part, path, created_at) VALUES (?, ?, ?, ?)",
+                    [(str(project_id), index, path, created_at) for index, path in enumerate(files, start=1)]
+                )
+            conn.execute("INSERT INTO meta (key, value) VALUES ('legacy_migrated', ?)", (str(time.time()),))
+            conn.commit()
+            logger.info(f"Migrated {len(entries)} video(s) from {self.legacy_file}")
+        finally:
+            conn.close()
+
+    def start_project(self, project_id: str, title: str, total_parts: int, subreddit: Optional[str] = None,
+                      voice: Optional[str] = None, encoding_profile: Optional[str] = None) -> None:
+        """Registers a project as generating; a retry of the same project id starts it over."""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM parts WHERE project_id = ?", (project_id,))
+            conn.execute(
+                """INSERT OR REPLACE INTO projects
+                   (project_id, title, subreddit, voice, encoding_profile, status, created_at, total_parts)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+                (project_id, title, subreddit, voice, encoding_profile, STATUS_GENERATING, time.time(), total_parts)
+            )
+
+    def record_part(self, project_id: str, part: int, path: str, duration: float,
+                    size: Optional[int] = None, encode_seconds: Optional[float] = None) -> None:
+        """Records a written part. Safe to call from render worker processes."""
+        with self._connect() as conn:
+            conn.execute(
+                """INSERT OR REPLACE INTO parts (project_id, part, path, duration, size, encode_seconds, created_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                (project_id, part, path, duration, size, encode_seconds, time.time())
+            )
+
+    def finish_project(self, project_id: str) -> None:
+        with self._connect() as conn:
+            conn.execute("UPDATE projects SET status = ?, error = NULL WHERE project_id = ?",
+                         (STATUS_GENERATED, project_id))
+
+    def fail_project(self, project_id: str, error: str, title: str = "Unknown") -> None:
+        """Marks a project as failed, creating its row if generation never started."""
+        with self._connect() as conn:
+            conn.execute(
+                """INSERT INTO projects (project_id, title, status, error, created_at)
+                   VALUES (?, ?, ?, ?, ?)
+                   ON CONFLICT(project_id) DO UPDATE SET status = excluded.status, error = excluded.error""",
+                (project_id, title, STATUS_ERROR, error, time.time())
+            )
+
+    def list_projects(self, limit: int = 50, offset: int = 0, status: Optional[str] = None) -> List[dict]:
+        """
+        One page of projects, newest first, with total_duration and
+        parts_written summed from the part rows.
+        """
+        query = """SELECT projects.*, SUM(parts.duration) AS total_duration, COUNT(parts.part) AS parts_written
+                   FROM projects LEFT JOIN parts ON parts.project_id = projects.project_id"""
+        params: list = []
+        if status:
+            query += " WHERE projects.status = ?"
+            params.append(status)
+        query += " GROUP BY projects.project_id ORDER BY projects.created_at DESC LIMIT ? OFFSET ?"
+        params += [limit, offset]
+        with self._connect() as conn:
+            return [dict(row) for row in conn.execute(query, params)]
+
+    def count_projects(self) -> int:
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM projects").fetchone()[0]
+
+    def get_parts(self, project_ids: Iterable[str]) -> Dict[str, List[dict]]:
+        """Part rows of several projects in one query, keyed by project id and ordered by part."""
+        project_ids = list(project_ids)
+        parts: Dict[str, List[dict]] = {project_id: [] for project_id in project_ids}
+        if not project_ids:
+            return parts
+        placeholders = ",".join("?" * len(project_ids))
+        with self._connect() as conn:
+            for row in conn.execute(
+                f"SELECT * FROM parts WHERE project_id IN ({placeholders}) ORDER BY project_id, part", project_ids
+            ):
+                parts[row['project_id']].append(dict(row))
+        return parts
+
+    def get_part(self, project_id: str, part: int) -> Optional[dict]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM parts WHERE project_id = ? AND part = ?", (project_id, part)).fetchone()
+        return dict(row) if row else None
+
+    def delete_part(self, project_id: str, part: int) -> None:
+        """
+        Removes a part row; the project goes with it once it has no parts left.
+        total_parts keeps the number the story was split into, so the other
+        parts keep their numbers (and their "Part i/N" captions stay right).
+        """
+        with self._connect() as conn:
+            conn.execute("DELETE FROM parts WHERE project_id = ? AND part = ?", (project_id, part))
+            remaining = conn.execute("SELECT COUNT(*) FROM parts WHERE project_id = ?", (project_id,)).fetchone()[0]
+            if not remaining:
+                conn.execute("DELETE FROM projects WHERE project_id = ?", (project_id,))
+
+    def delete_project(self, project_id: str) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM projects WHERE project_id = ?", (project_id,))
+
+_catalog: Optional[VideoCatalog] = None
+
+def get_video_catalog() -> VideoCatalog:
+    """Returns the process-wide catalog."""
+    global _catalog
+    if _catalog is None:
+        _catalog = VideoCatalog()
+    return _catalog
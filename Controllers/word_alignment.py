@@ -0,0 +1,227 @@
+import re
+import math
+from typing import List, NamedTuple, Optional, Tuple
+
+WordTimings = List[Tuple[str, float, float]]
+
+# Bumped when alignments change, so checkpointed subtitles are rebuilt
+ALIGNMENT_VERSION = 3
+
+# Half-width of the band of boundary indexes searched around the best cell of the previous script word
+BAND_WIDTH = 16
+# Widest the band gets while the voice is off script, keeping the cost linear whatever the input
+MAX_BAND_WIDTH = 4 * BAND_WIDTH
+# Cells scoring this far below the best of their row are not followed into the next row
+DROP_SCORE = 16
+# Script words that must be spoken exactly as written, in a row, to re-anchor a band lost at MAX_BAND_WIDTH
+SEED_WORDS = 5
+# Most boundaries the voice may add off script before the band stops looking for the script
+MAX_SKIPPED = 8 * MAX_BAND_WIDTH
+# Most boundary words one written word is read as ("1/2" -> "1", "2"), and the reverse
+MAX_JOINED = 3
+
+# Alignment scores: a spoken word read as written, read differently, and a word or boundary left out
+EXACT_SCORE = 2
+PARTIAL_SCORE = 1
+MISMATCH_SCORE = -1
+GAP_SCORE = -1
+
+# Confidence of each kind of match, reported on the aligned words
+EXACT_CONFIDENCE = 1.0
+JOINED_CONFIDENCE = 0.9
+PARTIAL_CONFIDENCE = 0.6
+MISMATCH_CONFIDENCE = 0.3
+# Words spoken at no boundary get the time between their neighbours
+INTERPOLATED_CONFIDENCE = 0.0
+
+NON_WORD = re.compile(r"[^\w]")
+
+class AlignedWord(NamedTuple):
+    word: str                   # as written in the script, punctuation included
+    start: float
+    end: float
+    confidence: float           # 0.0 (timing interpolated) - 1.0 (spoken as written)
+    first: Optional[int] = None # boundary indexes speaking the word, None when interpolated
+    last: Optional[int] = None
+
+def normalize(word: str) -> str:
+    """Lowercase word without punctuation, as compared against the boundary words."""
+    return NON_WORD.sub("", word.lower())
+
+def _pair(word: str, token: str) -> Tuple[int, float]:
+    """Score and confidence of reading word as token."""
+    if word == token:
+        return EXACT_SCORE, EXACT_CONFIDENCE
+    shortest = min(len(word), len(token))
+    prefix = 0
+    while prefix < shortest and word[prefix] == token[prefix]:
+        prefix += 1
+    # Same stem: "cafe"/"cafes", "gonna"/"gon"
+    if shortest and prefix >= min(3, shortest):
+        return PARTIAL_SCORE, PARTIAL_CONFIDENCE
+    return MISMATCH_SCORE, MISMATCH_CONFIDENCE
+
+def align(words: List[str], word_timings: WordTimings) -> List[AlignedWord]:
+    """
+    Maps the written words of a script to the TTS word boundaries spoken for
+    them, in one pass of a banded sequence alignment: cost linear in the
+    number of words. Handles words left out or added by the voice, words
+    read as several boundaries (or the reverse) and punctuation differences.
+    Words matched to no boundary get the time between their neighbours.
+
+    Each word's band spans the cells of the previous word scoring within
+    DROP_SCORE of its best rather than the global diagonal, and widens by
+    BAND_WIDTH for every word that scores no better than the best so far, so
+    a run of boundaries added or left out by the voice only costs the words
+    around it. The band never gets wider than MAX_BAND_WIDTH: once lost at
+    that width, it moves to the next boundaries speaking SEED_WORDS script
+    words as written, after the last word that improved the alignment; the
+    words in between are interpolated.
+    """
+    if not words:
+        return []
+    if not word_timings:
+        return [AlignedWord(word, 0.0, 0.0, INTERPOLATED_CONFIDENCE) for word in words]
+    written = [normalize(word) for word in words]
+    tokens = [normalize(word) for word, _start, _end in word_timings]
+    n, m = len(written), len(tokens)
+    # Consecutive rows must overlap even when the voice speaks many boundaries per word
+    step = math.ceil(m / n)
+    width = BAND_WIDTH + step
+    first_j, last_j, best_j, best_score = 0, 0, 0, -math.inf
+    # Last cell that improved the best score: where the alignment was still on script
+    anchor_i, anchor_j = 0, 0
+    seeds = None
+    lows, rows, moves = [], [], []
+    for i in range(n + 1):
+        low, high = max(0, first_j - width), min(m, last_j + step + width)
+        if high - low > 2 * MAX_BAND_WIDTH + step:
+            # Many cells scoring alike (off-script text): keep the ones around the best
+            low, high = max(0, best_j - MAX_BAND_WIDTH), min(m, best_j + step + MAX_BAND_WIDTH)
+        jump = None
+        if width >= MAX_BAND_WIDTH and 0 < i <= n - SEED_WORDS:
+            if seeds is None:
+                seeds = _seed_index(tokens)
+            # Where the next words are spoken as written: away from the best cell, the band lost the voice
+            farthest = anchor_j + (i - anchor_i) * step + MAX_SKIPPED
+            seed = next((j for j in seeds.get(tuple(written[i:i + SEED_WORDS]), ()) if anchor_j <= j <= farthest), None)
+            if seed is not None and not best_j - BAND_WIDTH <= seed <= best_j + step + BAND_WIDTH:
+                # Move the band onto the seed; the anchor reaches it with the words and boundaries between unspoken
+                low, high = max(0, seed - BAND_WIDTH), min(m, seed + 1 + step + BAND_WIDTH)
+                jump = (i - anchor_i, max(low, anchor_j) - anchor_j)
+                width, best_score = BAND_WIDTH + step, -math.inf
+        if i == n:
+            # The alignment ends on the last boundary
+            high = m
+        row = [-math.inf] * (high - low + 1)
+        move = [None] * (high - low + 1)
+        lows.append(low)
+        rows.append(row)
+        moves.append(move)
+        word = written[i - 1] if i else None
+        for j in range(low, high + 1):
+            if i == 0 and j == 0:
+                row[0] = 0
+                continue
+            best, best_move = -math.inf, None
+            if jump is not None and j == anchor_j + jump[1]:
+                best, best_move = rows[anchor_i][anchor_j - lows[anchor_i]] + GAP_SCORE * sum(jump), jump + (None,)
+            if i:
+                previous, previous_low = rows[i - 1], lows[i - 1]
+                # Written word left unspoken (free for punctuation-only words)
+                if previous_low <= j < previous_low + len(previous):
+                    score = previous[j - previous_low] + (GAP_SCORE if word else 0)
+                    if score > best:
+                        best, best_move = score, (1, 0, INTERPOLATED_CONFIDENCE)
+                if j and word:
+                    # One written word, one boundary
+                    if previous_low <= j - 1 < previous_low + len(previous):
+                        pair_score, confidence = _pair(word, tokens[j - 1])
+                        score = previous[j - 1 - previous_low] + pair_score
+                        if score > best:
+                            best, best_move = score, (1, 1, confidence)
+                    # One written word read as several boundaries
+                    joined = tokens[j - 1]
+                    for k in range(2, min(MAX_JOINED, j) + 1):
+                        joined = tokens[j - k] + joined
+                        if len(joined) > len(word):
+                            break
+                        if joined == word and previous_low <= j - k < previous_low + len(previous):
+                            score = previous[j - k - previous_low] + EXACT_SCORE
+                            if score > best:
+                                best, best_move = score, (1, k, JOINED_CONFIDENCE)
+                    # Several written words read as one boundary
+                    token = tokens[j - 1]
+                    joined = word
+                    for k in range(2, min(MAX_JOINED, i) + 1):
+                        joined = written[i - k] + joined
+                        if len(joined) > len(token):
+                            break
+                        earlier, earlier_low = rows[i - k], lows[i - k]
+                        if joined == token and earlier_low <= j - 1 < earlier_low + len(earlier):
+                            score = earlier[j - 1 - earlier_low] + EXACT_SCORE
+                            if score > best:
+                                best, best_move = score, (k, 1, JOINED_CONFIDENCE)
+            # Boundary spoken for no written word
+            if j > low:
+                score = row[j - 1 - low] + (GAP_SCORE if tokens[j - 1] else 0)
+                if score > best:
+                    best, best_move = score, (0, 1, None)
+            row[j - low] = best
+            move[j - low] = best_move
+        row_best = max(row)
+        # Below the best score so far: the voice went off script, look further away for the next word
+        kept = [j for j, score in enumerate(row) if score >= row_best - DROP_SCORE]
+        first_j, last_j, best_j = low + kept[0], low + kept[-1], low + row.index(row_best)
+        if row_best > best_score:
+            width, best_score, anchor_i, anchor_j = BAND_WIDTH + step, row_best, i, best_j
+        else:
+            width = min(width + BAND_WIDTH, MAX_BAND_WIDTH)
+    return _trace(words, word_timings, lows, moves)
+
+def _seed_index(tokens: List[str]) -> dict:
+    """Boundary indexes at which each run of SEED_WORDS boundary words starts, in order."""
+    seeds = {}
+    for j in range(len(tokens) - SEED_WORDS + 1):
+        seeds.setdefault(tuple(tokens[j:j + SEED_WORDS]), []).append(j)
+    return seeds
+
+def _trace(words: List[str], word_timings: WordTimings, lows: List[int], moves: List[list]) -> List[AlignedWord]:
+    """Follows the best moves back from the end and builds the aligned words."""
+    n, m = len(words), len(word_timings)
+    matches: List[Optional[Tuple[int, int, float]]] = [None] * n
+    i, j = n, m
+    while i or j:
+        di, dj, confidence = moves[i][j - lows[i]]
+        if di and dj and confidence is not None:
+            for index in range(i - di, i):
+                matches[index] = (j - dj, j - 1, confidence)
+        i, j = i - di, j - dj
+    return _interpolate(words, word_timings, matches)
+
+def _interpolate(words: List[str], word_timings: WordTimings,
+                 matches: List[Optional[Tuple[int, int, float]]]) -> List[AlignedWord]:
+    """Aligned words, the unmatched ones spread evenly over the gap between their matched neighbours."""
+    aligned: List[Optional[AlignedWord]] = [None] * len(words)
+    previous_end = word_timings[0][1]
+    index = 0
+    while index < len(words):
+        if matches[index] is not None:
+            first, last, confidence = matches[index]
+            aligned[index] = AlignedWord(words[index], word_timings[first][1], word_timings[last][2], confidence, first, last)
+            previous_end = aligned[index].end
+            index += 1
+            continue
+        run_end = index
+        while run_end < len(words) and matches[run_end] is None:
+            run_end += 1
+        next_start = word_timings[matches[run_end][0]][1] if run_end < len(words) else previous_end
+        step = max(0.0, next_start - previous_end) / (run_end - index)
+        for position in range(index, run_end):
+            start = previous_end + step * (position - index)
+            aligned[position] = AlignedWord(words[position], start, start + step, INTERPOLATED_CONFIDENCE)
+        index = run_end
+    return aligned
+
+def mean_confidence(aligned: List[AlignedWord]) -> float:
+    return sum(word.confidence for word in aligned) / len(aligned) if aligned else 0.0
@@ -0,0 +1,113 @@
+"""
+Measures the word-timing aligner (word_alignment.align) on synthetic stories
+of growing length, to check that its cost stays linear in the word count.
+
+Usage:
+    python benchmarks/bench_alignment.py [--words 500,1000,2000,5000] [--repeat 3] [--burst 30]
+
+The boundary words are derived from the script the way edge-tts reports them
+(no punctuation, "1/2" read as two words), with a few words dropped, added or
+read differently. Prints a JSON report on stdout: seconds and microseconds
+per word for each length, the share of words aligned to their true boundary
+and the mean confidence. The same lengths are then run with --burst extra
+boundaries spoken after the fifth word ("inserted") and with --burst words
+left unspoken a third into the story ("dropped").
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Controllers"))
+
+from word_alignment import align, mean_confidence, normalize
+
+VOCABULARY = ("i", "my", "the", "a", "and", "then", "she", "he", "said", "was", "never", "friend", "door",
+              "dog", "again", "story", "night", "landlord", "kitchen", "weird", "honestly", "because")
+WORD_SECONDS = 0.35
+
+def synthetic_story(word_count: int, rng: random.Random) -> list:
+    """Script words with punctuation, repeated short words and the odd fraction or hyphenated word."""
+    words = []
+    for index in range(word_count):
+        roll = rng.random()
+        if roll < 0.02:
+            word = f"{rng.randint(1, 9)}/{rng.randint(2, 9)}"
+        elif roll < 0.04:
+            word = f"{rng.choice(VOCABULARY)}-{rng.choice(VOCABULARY)}"
+        else:
+            word = rng.choice(VOCABULARY)
+        if index % 11 == 10:
+            word += rng.choice(".!?")
+        elif index % 7 == 6:
+            word += ","
+        words.append(word)
+    return words
+
+def spoken_boundaries(words: list, rng: random.Random, inserted: int = 0, dropped: int = 0):
+    """
+    TTS-like word timings of words, and the index of the first boundary of
+    each word (None if dropped). inserted off-script boundaries follow the
+    fifth word and dropped words in a row go unspoken a third into the story.
+    """
+    timings, truth = [], []
+    dropped_from = len(words) // 3
+    for index, word in enumerate(words):
+        if index == 5:
+            for _ in range(inserted):
+                timings.append((rng.choice(("uh", "so", "okay", "like")), len(timings) * WORD_SECONDS, len(timings) * WORD_SECONDS + 0.2))
+        roll = rng.random()
+        if roll < 0.01 or dropped_from <= index < dropped_from + dropped:
+            truth.append(None)
+            continue
+        spoken = word.replace("/", " ").replace("-", " ").split()
+        if roll < 0.02:
+            spoken = [normalize(spoken[0])[:2] + "x"]
+        truth.append(len(timings))
+        for part in spoken:
+            if rng.random() < 0.005:
+                timings.append(("um", len(timings) * WORD_SECONDS, len(timings) * WORD_SECONDS + 0.2))
+            token = normalize(part)
+            timings.append((token, len(timings) * WORD_SECONDS, len(timings) * WORD_SECONDS + 0.3))
+    return timings, truth
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--words", default="500,1000,2000,5000", help="Comma-separated story lengths")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--burst", type=int, default=30, help="Boundaries added / words left out in the burst cases")
+    args = parser.parse_args()
+
+    cases = {"scattered": {}, "inserted": {"inserted": args.burst}, "dropped": {"dropped": args.burst}}
+    report = {}
+    for case, burst in cases.items():
+        report[case] = {}
+        for word_count in [int(value) for value in args.words.split(",")]:
+            rng = random.Random(args.seed)
+            words = synthetic_story(word_count, rng)
+            timings, truth = spoken_boundaries(words, rng, **burst)
+            runs = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                aligned = align(words, timings)
+                runs.append(time.perf_counter() - start)
+            # The inserted "um" shifts a word's first boundary by one: compare against the boundary holding its text
+            correct = sum(
+                1 for word, expected in zip(aligned, truth)
+                if expected is not None and word.first is not None and abs(word.first - expected) <= 1
+            )
+            best = min(runs)
+            report[case][word_count] = {
+                "boundaries": len(timings),
+                "seconds": round(best, 4),
+                "us_per_word": round(best / word_count * 1e6, 1),
+                "aligned_share": round(correct / sum(1 for expected in truth if expected is not None), 4),
+                "mean_confidence": round(mean_confidence(aligned), 3),
+            }
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
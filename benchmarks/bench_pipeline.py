@@ -0,0 +1,302 @@
+"""
+Offline benchmark of the story pipeline: segmentation, subtitle grouping,
+subtitle rendering and a full process_story_video run.
+
+Usage:
+    python benchmarks/bench_pipeline.py [--seed 1234] [--stories short,medium,long]
+                                        [--pipeline short] [--profile draft] [--repeat 5]
+
+Needs neither Reddit nor Edge TTS: the base video is an ffmpeg testsrc clip,
+the stories are generated from a fixed seed and speech comes from a stand-in
+TTS (silent mp3 + WordBoundary-style timings). Everything is written to a
+temporary directory. Prints a JSON report on stdout.
+"""
+import os
+import re
+import sys
+import json
+import time
+import zlib
+import random
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+
+CONTROLLERS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Controllers")
+sys.path.insert(0, CONTROLLERS_DIR)
+
+VOICE = "en-US-JennyNeural"
+TITLE = "I accidentally became the neighborhood's lost and found"
+STORY_WORDS = {"short": 140, "medium": 480, "long": 1500}
+
+# Sentence pieces the canned stories are drawn from
+OPENINGS = ["So last week", "A few years ago", "Yesterday morning", "Right after my shift",
+            "On the first day of vacation", "Before anyone was awake"]
+SUBJECTS = ["my neighbor", "the delivery guy", "my roommate", "our landlord", "my little brother",
+            "a very confident goose", "the lady from the bakery"]
+ACTIONS = ["knocked on my door holding a box of somebody else's shoes",
+           "asked whether I had seen a ladder, a cat and a bag of flour",
+           "left a note explaining, in great detail, why the fence was now purple",
+           "decided the garage was the perfect place for a karaoke night",
+           "returned my keys, which I had not noticed were missing",
+           "insisted the parcel was mine even though it was addressed to the mayor"]
+ENDINGS = [".", ".", ".", "!", "?", "..."]
+ASIDES = ["Honestly, I still don't know how it happened.", "Nobody believed me at first.",
+          "That was only the beginning.", "I laughed so hard I had to sit down.",
+          "My mom still brings it up at dinner."]
+
+# Stand-in speech model: seconds per word = base + per character, then pauses on punctuation
+WORD_BASE_SECONDS = 0.09
+WORD_CHAR_SECONDS = 0.052
+WORD_GAP_SECONDS = 0.04
+COMMA_PAUSE_SECONDS = 0.15
+SENTENCE_PAUSE_SECONDS = 0.35
+TOKEN = re.compile(r"[\w'’/-]+[.,!?]*")
+
+def canned_story(words: int, seed: int) -> str:
+    """A deterministic story of about words words."""
+    rng = random.Random(seed * 1000 + words)
+    sentences = []
+    count = 0
+    while count < words:
+        if sentences and rng.random() < 0.25:
+            sentence = rng.choice(ASIDES)
+        else:
+            sentence = f"{rng.choice(OPENINGS)}, {rng.choice(SUBJECTS)} {rng.choice(ACTIONS)}{rng.choice(ENDINGS)}"
+        sentences.append(sentence)
+        count += len(sentence.split())
+    return " ".join(sentences)
+
+def stand_in_timings(text: str, voice_name: str, seed: int):
+    """
+    Plausible word boundaries for text: duration grows with word length,
+    pauses follow commas and sentence ends, with a seeded jitter. Like
+    edge-tts, the boundary words carry no punctuation.
+    Returns (word, start, end) tuples.
+    """
+    rng = random.Random(zlib.crc32(f"{seed}:{voice_name}:{text}".encode("utf-8")))
+    rate = 0.9 + (zlib.crc32(voice_name.encode("utf-8")) % 200) / 1000  # per-voice speed, 0.9 - 1.1
+    timings = []
+    t = 0.05
+    for token in TOKEN.findall(text):
+        word = token.rstrip(".,!?")
+        duration = (WORD_BASE_SECONDS + WORD_CHAR_SECONDS * len(word)) * rate * rng.uniform(0.85, 1.15)
+        timings.append((word, round(t, 4), round(t + duration, 4)))
+        t += duration + WORD_GAP_SECONDS
+        if token[-1] in ".!?":
+            t += SENTENCE_PAUSE_SECONDS * rng.uniform(0.8, 1.2)
+        elif token[-1] == ",":
+            t += COMMA_PAUSE_SECONDS * rng.uniform(0.8, 1.2)
+    return timings
+
+def silent_mp3(seconds: float) -> bytes:
+    """seconds of silence encoded like the edge-tts output (24 kHz mono mp3)."""
+    from ffmpeg_tools import ffmpeg_binary
+    return subprocess.run(
+        [ffmpeg_binary(), "-loglevel", "error", "-f", "lavfi", "-i", "anullsrc=r=24000:cl=mono",
+         "-t", f"{seconds:.3f}", "-c:a", "libmp3lame", "-b:a", "48k", "-f", "mp3", "-"],
+        capture_output=True, check=True
+    ).stdout
+
+def make_stand_in_tts(seed: int, usage: dict):
+    """
+    Replacement for story_video_generator.async_stream_speech (same signature
+    and result). Counts calls and characters in usage.
+    """
+    async def stand_in_stream_speech(text, voice_name, audio_sink):
+        usage['calls'] += 1
+        usage['chars'] += len(text)
+        timings = stand_in_timings(text, voice_name, seed)
+        audio_sink.write(silent_mp3((timings[-1][2] if timings else 0) + 0.25))
+        return timings
+    return stand_in_stream_speech
+
+def make_base_video(path: str, seconds: float, size: str, fps: int) -> None:
+    """Synthetic background footage: ffmpeg's testsrc pattern, x264 with a keyframe every 2s."""
+    from ffmpeg_tools import ffmpeg_binary
+    subprocess.run(
+        [ffmpeg_binary(), "-y", "-loglevel", "error", "-f", "lavfi", "-i", f"testsrc=size={size}:rate={fps}",
+         "-t", str(seconds), "-c:v", "libx264", "-preset", "veryfast", "-g", str(fps * 2), "-pix_fmt", "yuv420p", path],
+        check=True
+    )
+
+def timed(fn, repeat: int) -> dict:
+    """Runs fn repeat times; returns min and median seconds and the last result."""
+    durations = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        durations.append(time.perf_counter() - start)
+    return {"min_s": round(min(durations), 6), "median_s": round(statistics.median(durations), 6), "result": result}
+
+def segment_story(svg, title: str, story: str) -> list:
+    """The story's segments, from the segmenter process_story_video uses."""
+    if svg.SEGMENTER == "duration":
+        return svg.split_text_by_duration(story, title, VOICE, svg.PART_TARGET_SECONDS, svg.PART_MAX_SECONDS)
+    return svg.split_text_into_segments(story, svg.MIN_WORDS_PER_SEGMENT, svg.MAX_WORDS_PER_SEGMENT)
+
+def part_texts(svg, title: str, story: str) -> list:
+    """The per-part TTS texts, built like process_story_video does."""
+    segments = segment_story(svg, title, story)
+    total_parts = len(segments)
+    texts = []
+    for i, segment in enumerate(segments, 1):
+        part_info = f"\nPart {i}/{total_parts}" if total_parts > 1 else ""
+        texts.append(f"{title}{part_info}\n\n{segment}")
+    return texts
+
+def bench_story(svg, name: str, story: str, args, frame_size) -> dict:
+    """Micro-benchmarks of the text and subtitle stages on one story."""
+    from moviepy.editor import ColorClip
+    from subtitle_export import export_subtitles
+
+    report = {"words": len(story.split())}
+    split = timed(lambda: segment_story(svg, TITLE, story), args.repeat)
+    report["segment"] = {"min_s": split["min_s"], "median_s": split["median_s"], "parts": len(split["result"])}
+
+    texts = part_texts(svg, TITLE, story)
+    timings = [stand_in_timings(text, VOICE, args.seed) for text in texts]
+    durations = [part_timings[-1][2] + 0.25 for part_timings in timings]
+
+    grouping = timed(lambda: [svg.build_subtitle_groups(text, part_timings)
+                              for text, part_timings in zip(texts, timings)], args.repeat)
+    report["build_subtitle_groups"] = {"min_s": grouping["min_s"], "median_s": grouping["median_s"],
+                                       "captions": sum(len(groups) for groups in grouping["result"])}
+
+    clips = timed(lambda: [svg.create_group_subtitles(text, duration, frame_size[0], part_timings)
+                           for text, duration, part_timings in zip(texts, durations, timings)], args.repeat)
+    report["create_group_subtitles"] = {"min_s": clips["min_s"], "median_s": clips["median_s"],
+                                        "clips": sum(len(part_clips) for part_clips in clips["result"])}
+
+    # Subtitle rendering: rasterize every caption into the overlay, then composite frames of part 1
+    groups = grouping["result"]
+    overlay = timed(lambda: [svg.create_subtitle_overlay(part_groups, frame_size) for part_groups in groups], args.repeat)
+    report["create_subtitle_overlay"] = {"min_s": overlay["min_s"], "median_s": overlay["median_s"]}
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        export = timed(lambda: [export_subtitles(part_groups, tmp_dir, f"subtitles_{i}", frame_size)
+                                for i, part_groups in enumerate(groups, 1)], args.repeat)
+    report["export_subtitles"] = {"min_s": export["min_s"], "median_s": export["median_s"]}
+
+    background = ColorClip(frame_size, color=(40, 90, 160), duration=durations[0])
+    composite = overlay["result"][0].apply(background)
+    frame_times = [durations[0] * i / args.frames for i in range(args.frames)]
+    start = time.perf_counter()
+    for t in frame_times:
+        composite.get_frame(t)
+    report["subtitle_frames"] = {"frames": args.frames,
+                                 "frames_per_s": round(args.frames / (time.perf_counter() - start), 1)}
+    return report
+
+def bench_pipeline(svg, name: str, story: str, base_video: str, args, usage: dict) -> dict:
+    """One full process_story_video run on the stand-in TTS."""
+    stage_timings = {}
+    usage.update(calls=0, chars=0)
+    project_id = f"bench_{name}_{args.seed}"
+    random.seed(args.seed)  # background window choice
+    start = time.perf_counter()
+    output_files = svg.process_story_video(base_video, TITLE, story, project_id, voice=VOICE,
+                                           encoding_profile=args.profile, stage_timings=stage_timings)
+    total = time.perf_counter() - start
+    return {
+        "words": len(story.split()),
+        "parts": len(output_files),
+        "total_s": round(total, 3),
+        "stages_s": {stage: round(seconds, 3) for stage, seconds in stage_timings.items()},
+        "tts_calls": usage['calls'],
+        "tts_chars": usage['chars'],
+        "output_bytes": sum(os.path.getsize(path) for path in output_files)
+    }
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=CONTROLLERS_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--stories", default="short,medium,long", help="Story lengths for the stage benchmarks")
+    parser.add_argument("--pipeline", default="short", help="Story lengths for full pipeline runs ('' to skip)")
+    parser.add_argument("--profile", default="draft", help="Encoding profile of the pipeline runs")
+    parser.add_argument("--tts-mode", choices=["per_part", "whole_story"], help="Overrides the tts_mode setting")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--frames", type=int, default=100, help="Subtitle frames composited per story")
+    parser.add_argument("--size", default="540x960", help="Synthetic base video size")
+    parser.add_argument("--fps", type=int, default=30)
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    args = parser.parse_args()
+
+    stories = {name: canned_story(STORY_WORDS[name], args.seed) for name in STORY_WORDS}
+    pipeline_names = [name for name in args.pipeline.split(",") if name]
+    output_path = os.path.abspath(args.output) if args.output else None
+
+    with tempfile.TemporaryDirectory() as workspace:
+        # config creates its directories relative to the working directory on non-Windows systems
+        os.chdir(workspace)
+        import config
+        config.OUTPUT_DIR = os.path.join(workspace, "generated")
+        import video_catalog
+        import speech_rate
+        import background_library
+        import story_video_generator as svg
+        # The stand-in runs must not write to the real catalog, train the real speech rate model or index clips
+        video_catalog._catalog = video_catalog.VideoCatalog(os.path.join(workspace, "video_catalog.sqlite3"),
+                                                            os.path.join(workspace, "videos.json"))
+        speech_rate._model = speech_rate.SpeechRateModel(os.path.join(workspace, "speech_rate.sqlite3"),
+                                                         os.path.join(workspace, "speech_rate.json"))
+        background_library._library = background_library.BackgroundLibrary(
+            os.path.join(workspace, "backgrounds"), os.path.join(workspace, "background_index.sqlite3"), fallback=None)
+        usage = {'calls': 0, 'chars': 0}
+        svg.async_stream_speech = make_stand_in_tts(args.seed, usage)
+        if args.tts_mode:
+            svg.TTS_MODE = args.tts_mode
+        svg.TTS_CACHE_ENABLED = False  # every run pays for synthesis, like a cold cache
+        svg.USE_BACKGROUND_PROXY = False  # the synthetic video is already at the output geometry
+
+        width, height = (int(value) for value in args.size.split("x"))
+        report = {
+            "benchmark": "pipeline",
+            "revision": git_revision(),
+            "seed": args.seed,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "settings": {"render_mode": svg.RENDER_MODE, "subtitle_engine": svg.SUBTITLE_ENGINE,
+                         "subtitle_renderer": svg.SUBTITLE_RENDERER, "render_workers": svg.RENDER_WORKERS,
+                         "tts_mode": svg.TTS_MODE, "segmenter": svg.SEGMENTER, "part_target_seconds": svg.PART_TARGET_SECONDS,
+                         "min_words_segment": svg.MIN_WORDS_PER_SEGMENT, "max_words_segment": svg.MAX_WORDS_PER_SEGMENT,
+                         "profile": args.profile, "size": args.size, "fps": args.fps},
+            "stages": {},
+            "pipeline": {}
+        }
+        for name in args.stories.split(","):
+            if name:
+                report["stages"][name] = bench_story(svg, name, stories[name], args, (width, height))
+
+        if pipeline_names:
+            longest_part = max(
+                timings[-1][2] for name in pipeline_names
+                for timings in (stand_in_timings(text, VOICE, args.seed) for text in part_texts(svg, TITLE, stories[name]))
+            )
+            base_video = os.path.join(workspace, "base_video.mp4")
+            start = time.perf_counter()
+            make_base_video(base_video, int(longest_part * 1.5) + 10, args.size, args.fps)
+            report["base_video_s"] = round(time.perf_counter() - start, 3)
+            for name in pipeline_names:
+                report["pipeline"][name] = bench_pipeline(svg, name, stories[name], base_video, args, usage)
+        os.chdir(os.path.dirname(CONTROLLERS_DIR))
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if output_path:
+        with open(output_path, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+
+if __name__ == "__main__":
+    main()
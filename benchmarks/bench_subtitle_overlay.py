@@ -0,0 +1,75 @@
+"""
+Compares per-frame compositing cost of the interval-indexed SubtitleOverlay
+against the one-layer-per-caption CompositeVideoClip on a long part.
+
+Usage:
+    python benchmarks/bench_subtitle_overlay.py [--seconds 180] [--frames 300]
+
+Runs offline on a solid-color 1080x1920 background. Prints a JSON report on stdout.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Controllers"))
+
+from moviepy.editor import ColorClip, CompositeVideoClip
+from story_video_generator import build_subtitle_groups, create_group_subtitles, create_subtitle_overlay
+
+WORDS_PER_SECOND = 2.6
+
+def synthetic_part(seconds: float):
+    """Builds a title + body script and evenly spaced word timings covering seconds."""
+    title = "A long benchmark story title"
+    word_count = int(seconds * WORDS_PER_SECOND)
+    body_words = [f"word{i}." if i % 12 == 11 else f"word{i}" for i in range(word_count)]
+    script = f"{title}\n\n{' '.join(body_words)}"
+    step = 1 / WORDS_PER_SECOND
+    timings = [(word, i * step, i * step + step * 0.8) for i, word in enumerate(title.split() + body_words)]
+    return script, timings
+
+def time_frames(clip, frame_count: int) -> float:
+    """Returns frames per second for frame_count frames spread over the clip."""
+    times = [clip.duration * i / frame_count for i in range(frame_count)]
+    start = time.perf_counter()
+    for t in times:
+        clip.get_frame(t)
+    return frame_count / (time.perf_counter() - start)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=180)
+    parser.add_argument("--frames", type=int, default=300)
+    args = parser.parse_args()
+
+    size = (1080, 1920)
+    script, timings = synthetic_part(args.seconds)
+    total_duration = timings[-1][2] + 3
+    background = ColorClip(size, color=(40, 90, 160), duration=total_duration)
+
+    start = time.perf_counter()
+    subs = create_group_subtitles(script, total_duration, size[0], timings)
+    composite = CompositeVideoClip([background] + subs)
+    composite_build = time.perf_counter() - start
+
+    start = time.perf_counter()
+    overlay = create_subtitle_overlay(build_subtitle_groups(script, timings), size)
+    overlaid = overlay.apply(background)
+    overlay_build = time.perf_counter() - start
+
+    composite_fps = time_frames(composite, args.frames)
+    overlay_fps = time_frames(overlaid, args.frames)
+
+    print(json.dumps({
+        "part_seconds": round(total_duration, 1),
+        "captions": len(subs),
+        "frames_sampled": args.frames,
+        "composite": {"build_seconds": round(composite_build, 3), "fps": round(composite_fps, 1)},
+        "overlay": {"build_seconds": round(overlay_build, 3), "fps": round(overlay_fps, 1)},
+        "speedup": round(overlay_fps / composite_fps, 2)
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Compares serial per-part TTS against the concurrent batch path.
+
+Usage:
+    python benchmarks/bench_tts_concurrency.py [story.txt] [--voice en-US-JennyNeural] [--concurrency 4]
+                                               [--stub] [--stub-word-ms 10]
+
+Requires network access to Edge TTS, unless --stub replaces the synthesis
+with a stand-in that waits --stub-word-ms per word (like a remote service
+would) and returns evenly spaced word timings. The TTS cache is off in both
+modes so the batch run does not reuse the serial run's audio. Prints a JSON
+report on stdout.
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Controllers"))
+
+import speech_rate
+import story_video_generator as svg
+from story_video_generator import split_text_into_segments, generate_speech, generate_speech_batch
+
+DEFAULT_STORY = " ".join(
+    f"Sentence number {i} of the benchmark story keeps going for a little while longer."
+    for i in range(120)
+)
+
+def build_part_texts(title: str, story: str) -> list:
+    segments = split_text_into_segments(story)
+    total_parts = len(segments)
+    texts = []
+    for i, segment in enumerate(segments, 1):
+        part_info = f"\nPart {i}/{total_parts}" if total_parts > 1 else ""
+        texts.append(f"{title}{part_info}\n\n{segment}")
+    return texts
+
+def make_stub_tts(word_seconds: float):
+    """Replacement for story_video_generator.async_stream_speech (same signature and result)."""
+    async def stub_stream_speech(text, voice_name, audio_sink):
+        words = text.split()
+        await asyncio.sleep(len(words) * word_seconds)
+        audio_sink.write(b"\0" * 1024)
+        return [(word, index * 0.35, index * 0.35 + 0.3) for index, word in enumerate(words)]
+    return stub_stream_speech
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("story", nargs="?", help="Path to a story text file")
+    parser.add_argument("--voice", default="en-US-JennyNeural")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--stub", action="store_true", help="Time a stand-in TTS instead of Edge TTS")
+    parser.add_argument("--stub-word-ms", type=float, default=10.0, help="Stand-in synthesis time per word")
+    args = parser.parse_args()
+
+    svg.TTS_CACHE_ENABLED = False
+
+    story = DEFAULT_STORY
+    if args.story:
+        with open(args.story, "r", encoding="utf-8") as f:
+            story = f.read()
+    texts = build_part_texts("Benchmark story", story)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        if args.stub:
+            svg.async_stream_speech = make_stub_tts(args.stub_word_ms / 1000)
+            # The stand-in timings must not train the real speech rate model
+            speech_rate._model = speech_rate.SpeechRateModel(os.path.join(tmp_dir, "speech_rate.sqlite3"),
+                                                             os.path.join(tmp_dir, "speech_rate.json"))
+        serial_paths = [os.path.join(tmp_dir, f"serial_{i}.mp3") for i in range(len(texts))]
+        batch_paths = [os.path.join(tmp_dir, f"batch_{i}.mp3") for i in range(len(texts))]
+
+        start = time.perf_counter()
+        for text, path in zip(texts, serial_paths):
+            generate_speech(text, path, args.voice)
+        serial_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        generate_speech_batch(texts, batch_paths, args.voice, args.concurrency)
+        batch_seconds = time.perf_counter() - start
+
+    print(json.dumps({
+        "parts": len(texts),
+        "words": sum(len(text.split()) for text in texts),
+        "concurrency": args.concurrency,
+        "tts": f"stub ({args.stub_word_ms:g} ms/word)" if args.stub else "edge-tts",
+        "serial_seconds": round(serial_seconds, 3),
+        "batch_seconds": round(batch_seconds, 3),
+        "speedup": round(serial_seconds / batch_seconds, 2) if batch_seconds else None
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,9 @@
+import os
+import sys
+import tempfile
+
+# config.py creates its Windows-style data/output directories relative to the working directory:
+# keep them out of the checkout by importing it from a scratch directory
+_workdir = tempfile.mkdtemp(prefix="auto_tik_tok_tests_")
+os.chdir(_workdir)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Controllers"))
@@ -0,0 +1,42 @@
+import batch
+from story_pool import StoryPool
+from story_history import StoryHistory
+
+def post(post_id, title):
+    return {'id': post_id, 'title': title, 'selftext': f"The story of {title}, told slowly.", 'score': 1}
+
+def setup(tmp_path, monkeypatch):
+    pool = StoryPool(db_path=str(tmp_path / "story_pool.sqlite3"), ttl_hours={'default': 6})
+    history = StoryHistory(db_path=str(tmp_path / "history.sqlite3"), legacy_file=str(tmp_path / "history.json"))
+    fetches = []
+
+    def fetch_candidates_many(subreddits, history, needed):
+        fetches.append(list(subreddits))
+        return {subreddit: [post(f"{subreddit}_new", f"Fresh {subreddit}")] for subreddit in subreddits}
+
+    monkeypatch.setattr(batch, "get_story_pool", lambda: pool)
+    monkeypatch.setattr(batch, "fetch_candidates_many", fetch_candidates_many)
+    return pool, history, fetches
+
+def test_jobs_come_from_the_pool_without_fetching(tmp_path, monkeypatch):
+    pool, history, fetches = setup(tmp_path, monkeypatch)
+    pool.add("stories", [post("a", "Alpha"), post("b", "Beta")])
+    pool.add("shortstories", [post("c", "Gamma"), post("d", "Alpha")])
+
+    jobs = batch.collect_jobs(["stories", "shortstories"], 3, history)
+
+    assert fetches == []
+    assert len(jobs) == 3
+    assert len({job['title'] for job in jobs}) == 3
+    assert [job['subreddit'] for job in jobs[:2]] == ["stories", "shortstories"]
+
+def test_only_dry_subreddits_are_fetched_once(tmp_path, monkeypatch):
+    pool, history, fetches = setup(tmp_path, monkeypatch)
+    pool.add("stories", [post("a", "Alpha")])
+    history.add_story("Used", "used", "Already told.")
+    pool.add("shortstories", [post("used", "Used")])
+
+    jobs = batch.collect_jobs(["stories", "shortstories"], 5, history)
+
+    assert [sorted(subreddits) for subreddits in fetches] == [["shortstories", "stories"]]
+    assert sorted(job['post_id'] for job in jobs) == ["a", "shortstories_new", "stories_new"]
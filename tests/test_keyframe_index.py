@@ -0,0 +1,17 @@
+import random
+from keyframe_index import choose_start_time, snap_to_keyframe
+
+KEYFRAMES = [0.0, 2.0, 4.0, 6.0, 8.0]
+
+def test_snap_to_keyframe_picks_the_nearest_one_not_after_max_start():
+    assert snap_to_keyframe(2.9, KEYFRAMES, 10.0) == 2.0
+    assert snap_to_keyframe(3.1, KEYFRAMES, 10.0) == 4.0
+    assert snap_to_keyframe(5.9, KEYFRAMES, 5.0) == 4.0
+    assert snap_to_keyframe(0.5, [1.0], 0.8) == 0.5
+
+def test_choose_start_time_lands_on_keyframes_in_range():
+    random.seed(3)
+    starts = {choose_start_time(5.0, KEYFRAMES) for _ in range(50)}
+
+    assert starts <= {0.0, 2.0, 4.0}
+    assert choose_start_time(0, KEYFRAMES) == 0
@@ -0,0 +1,31 @@
+import random
+from near_duplicates import MinHashIndex, lsh_params, normalize_story
+
+WORDS = ("neighbor", "garage", "karaoke", "ladder", "goose", "bakery", "landlord", "parcel", "fence",
+         "purple", "keys", "mayor", "shoes", "vacation", "roommate", "brother", "delivery", "note")
+
+def story(seed, length=300):
+    rng = random.Random(seed)
+    return " ".join(rng.choice(WORDS) for _ in range(length))
+
+def test_reformatted_and_lightly_edited_story_is_a_near_duplicate():
+    index = MinHashIndex(threshold=0.8)
+    original = story(1)
+    index.add(7, index.signature(original))
+    words = original.split()
+    words[100:103] = ["an", "edited", "line"]
+    repost = "  ".join(words).upper() + "!!"
+
+    match = index.query(index.signature(repost))
+
+    assert match is not None and match[0] == 7 and match[1] >= 0.8
+    assert index.query(index.signature(story(2))) is None
+
+def test_normalize_story_ignores_case_punctuation_and_spacing():
+    assert normalize_story("Hello,   WORLD!\nIt's me.") == "hello world it s me"
+
+def test_lsh_params_reach_the_recall_at_the_threshold():
+    bands, rows = lsh_params(128, 0.8)
+
+    assert bands * rows <= 128
+    assert 1 - (1 - 0.8 ** rows) ** bands >= 0.95
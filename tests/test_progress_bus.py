@@ -0,0 +1,43 @@
+import time
+from progress_bus import ProgressBus
+
+def test_bursts_are_rate_limited_but_the_last_event_arrives():
+    bus = ProgressBus(max_rate_hz=20)
+    events = []
+    bus.subscribe(events.append)
+
+    for index in range(1, 100):
+        bus.publish('render', index / 100, part=1)
+    time.sleep(0.2)
+
+    assert 1 <= len(events) <= 3
+    assert events[-1].fraction == 0.99
+
+def test_stage_and_part_changes_and_completion_are_always_delivered():
+    bus = ProgressBus(max_rate_hz=1)
+    events = []
+    bus.subscribe(events.append)
+
+    bus.publish('tts', 0.1)
+    bus.publish('tts', 0.2)
+    bus.publish('tts', 1.0)
+    bus.publish('render', 0.0, part=1)
+    bus.publish('render', 0.0, part=2)
+    bus.close()
+
+    assert [(event.stage, event.fraction, event.part) for event in events] == [
+        ('tts', 0.1, None), ('tts', 1.0, None), ('render', 0.0, 1), ('render', 0.0, 2)
+    ]
+
+def test_a_failing_subscriber_does_not_stop_the_others():
+    bus = ProgressBus(max_rate_hz=0)
+    events = []
+
+    def broken(event):
+        raise RuntimeError("closed window")
+
+    bus.subscribe(broken)
+    bus.subscribe(events.append)
+    bus.publish('render', 0.5)
+
+    assert len(events) == 1
@@ -0,0 +1,54 @@
+import os
+from project_manifest import ProjectManifest, stage_key
+
+def write(path, content):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+    return path
+
+def test_begin_resumes_only_the_same_story(tmp_path):
+    manifest = ProjectManifest(str(tmp_path))
+    assert manifest.begin("Title", "Story") is False
+    manifest.complete(1, 'script', stage_key("part 1"), [write(tmp_path / "part_1.txt", "part 1")])
+
+    assert ProjectManifest(str(tmp_path)).begin("Title", "Story") is True
+    changed = ProjectManifest(str(tmp_path))
+    assert changed.begin("Title", "Another story") is False
+    assert changed.completed(1, 'script', stage_key("part 1")) is None
+
+def test_completed_checks_the_key_and_the_files(tmp_path):
+    manifest = ProjectManifest(str(tmp_path))
+    manifest.begin("Title", "Story")
+    audio = write(tmp_path / "audio_1.mp3", "audio")
+    manifest.complete(1, 'audio', "key", [audio], duration=1.5)
+
+    assert manifest.completed(1, 'audio', "key")['duration'] == 1.5
+    assert manifest.completed(1, 'audio', "other key") is None
+    write(audio, "longer audio")
+    assert manifest.completed(1, 'audio', "key") is None
+    os.remove(audio)
+    assert manifest.completed(1, 'audio', "key") is None
+
+def test_redoing_a_stage_drops_the_later_ones(tmp_path):
+    manifest = ProjectManifest(str(tmp_path))
+    manifest.begin("Title", "Story")
+    for stage in ("script", "audio", "subtitles", "video"):
+        manifest.complete(1, stage, stage, [write(tmp_path / f"{stage}.out", stage)])
+
+    manifest.complete(1, 'audio', "new audio", [write(tmp_path / "audio.out", "new")])
+
+    assert manifest.completed(1, 'script', "script") is not None
+    assert manifest.completed(1, 'subtitles', "subtitles") is None
+    assert manifest.completed(1, 'video', "video") is None
+
+def test_set_total_parts_drops_parts_of_another_split(tmp_path):
+    manifest = ProjectManifest(str(tmp_path))
+    manifest.begin("Title", "Story")
+    for part in (0, 1, 2, 3):
+        manifest.complete(part, 'script', "key", [write(tmp_path / f"part_{part}.txt", str(part))])
+
+    manifest.set_total_parts(2)
+
+    reloaded = ProjectManifest(str(tmp_path))
+    assert sorted(reloaded.data['parts']) == ["0", "1", "2"]
+    assert reloaded.job['total_parts'] == 2
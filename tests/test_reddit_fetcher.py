@@ -0,0 +1,149 @@
+import json
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+import pytest
+from reddit_fetcher import RedditFetcher
+from tracing import start_trace
+
+ETAG = '"listing-v1"'
+LAST_MODIFIED = "Wed, 01 Jan 2025 00:00:00 GMT"
+
+class StubReddit(ThreadingHTTPServer):
+    """Serves endless hot.json pages (each one pointing to the next) and records every request."""
+
+    daemon_threads = True
+
+    def __init__(self, delay: float = 0.0):
+        super().__init__(("127.0.0.1", 0), StubHandler)
+        self.delay = delay
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+            server.requests.append({'path': self.path, 'headers': dict(self.headers)})
+        try:
+            time.sleep(server.delay)
+            if self.headers.get("If-None-Match") == ETAG:
+                self.send_response(304)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            parsed = urlparse(self.path)
+            subreddit = parsed.path.split("/")[2]
+            page = int(parse_qs(parsed.query).get("after", ["t3_page0"])[0][len("t3_page"):])
+            posts = [{'data': {'id': f"{subreddit}_{page}_{index}", 'title': f"Post {index}"}} for index in range(2)]
+            body = json.dumps({'data': {'after': f"t3_page{page + 1}", 'children': posts}}).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("ETag", ETAG)
+            self.send_header("Last-Modified", LAST_MODIFIED)
+            self.end_headers()
+            self.wfile.write(body)
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+    def log_message(self, format, *args):
+        pass
+
+@pytest.fixture
+def stub():
+    def start(delay: float = 0.0) -> StubReddit:
+        server = StubReddit(delay)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server
+
+    servers = []
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+def test_pagination_follows_after_and_stops_at_max_pages(stub):
+    server = stub()
+    fetcher = RedditFetcher(base_url=server.url, page_size=2, max_pages=3)
+
+    candidates = fetcher.collect_candidates("stories", needed=100, is_eligible=lambda post: True)
+
+    assert [post['id'] for post in candidates] == [f"stories_{page}_{index}" for page in range(3) for index in range(2)]
+    paths = [request['path'] for request in server.requests]
+    assert paths == [
+        "/r/stories/hot.json?limit=2",
+        "/r/stories/hot.json?limit=2&after=t3_page1",
+        "/r/stories/hot.json?limit=2&after=t3_page2",
+    ]
+
+def test_pagination_stops_once_enough_candidates(stub):
+    server = stub()
+    fetcher = RedditFetcher(base_url=server.url, page_size=2, max_pages=5)
+
+    candidates = fetcher.collect_candidates("stories", needed=3, is_eligible=lambda post: True)
+
+    assert len(candidates) == 4
+    assert len(server.requests) == 2
+
+def test_repeat_request_is_conditional_and_304_returns_cached_listing(stub):
+    server = stub()
+    fetcher = RedditFetcher(base_url=server.url, page_size=2, max_pages=1)
+
+    first = fetcher.fetch_listing("stories")
+    second = fetcher.fetch_listing("stories")
+
+    assert second == first
+    assert "If-None-Match" not in server.requests[0]['headers']
+    assert server.requests[1]['headers']["If-None-Match"] == ETAG
+    assert server.requests[1]['headers']["If-Modified-Since"] == LAST_MODIFIED
+    assert fetcher.requests_made == 2
+    assert fetcher.not_modified == 1
+
+def test_collect_many_fetches_subreddits_in_parallel_through_the_session(stub):
+    server = stub(delay=0.3)
+    fetcher = RedditFetcher(base_url=server.url, page_size=2, max_pages=1)
+    session_calls = []
+    session_get = fetcher.session.get
+
+    def counting_get(*args, **kwargs):
+        session_calls.append(args[0])
+        return session_get(*args, **kwargs)
+
+    fetcher.session.get = counting_get
+    subreddits = ["funnystories", "shortstories", "stories"]
+
+    start = time.perf_counter()
+    results = fetcher.collect_many(subreddits, needed=1, is_eligible=lambda post: True)
+    elapsed = time.perf_counter() - start
+
+    assert sorted(results) == subreddits
+    assert all(len(posts) == 2 for posts in results.values())
+    assert len(session_calls) == 3
+    assert server.max_in_flight >= 2
+    # Three 0.3s requests done one after another would take 0.9s
+    assert elapsed < 0.8
+
+def test_collect_many_records_its_fetches_in_the_callers_trace(stub):
+    server = stub()
+    fetcher = RedditFetcher(base_url=server.url, page_size=2, max_pages=1)
+    tracer = start_trace()
+
+    fetcher.collect_many(["shortstories", "stories"], needed=1, is_eligible=lambda post: True)
+
+    fetched = sorted(event['args']['subreddit'] for event in tracer.events if event['name'] == "reddit.fetch")
+    assert fetched == ["shortstories", "stories"]
+    assert start_trace() is not tracer
@@ -0,0 +1,65 @@
+import subprocess
+import pytest
+import config
+import story_video_generator as svg
+from ffmpeg_tools import ffmpeg_binary
+
+STORY = " ".join(
+    f"On day {index} my neighbor knocked again, holding a box of somebody else's shoes." for index in range(12)
+)
+
+def _silent_mp3(seconds: float) -> bytes:
+    return subprocess.run(
+        [ffmpeg_binary(), "-loglevel", "error", "-f", "lavfi", "-i", "anullsrc=r=24000:cl=mono",
+         "-t", f"{seconds:.3f}", "-c:a", "libmp3lame", "-f", "mp3", "-"],
+        capture_output=True, check=True
+    ).stdout
+
+@pytest.fixture
+def pipeline(tmp_path, monkeypatch):
+    """process_story_video with a stand-in TTS (slower than the model's defaults) and counted renders."""
+    calls = {'tts': 0, 'render': 0}
+
+    async def stand_in_stream_speech(text, voice_name, audio_sink):
+        calls['tts'] += 1
+        words = text.split()
+        audio_sink.write(_silent_mp3(len(words) * 0.5 + 0.3))
+        return [(word.strip(".,'"), index * 0.5, index * 0.5 + 0.4) for index, word in enumerate(words)]
+
+    render_part = svg.render_part
+    def counted_render_part(*args, **kwargs):
+        calls['render'] += 1
+        return render_part(*args, **kwargs)
+
+    base_video = str(tmp_path / "base.mp4")
+    subprocess.run([ffmpeg_binary(), "-y", "-loglevel", "error", "-f", "lavfi", "-i", "testsrc=size=180x320:rate=10",
+                    "-t", "60", "-c:v", "libx264", "-preset", "ultrafast", "-g", "20", base_video], check=True)
+    monkeypatch.setattr(config, "OUTPUT_DIR", str(tmp_path / "generated"))
+    monkeypatch.setattr(svg, "async_stream_speech", stand_in_stream_speech)
+    monkeypatch.setattr(svg, "render_part", counted_render_part)
+    monkeypatch.setattr(svg, "TTS_CACHE_ENABLED", False)
+    monkeypatch.setattr(svg, "TTS_MODE", "per_part")
+    monkeypatch.setattr(svg, "SEGMENTER", "duration")
+    monkeypatch.setattr(svg, "PART_TARGET_SECONDS", 20)
+    monkeypatch.setattr(svg, "PART_MAX_SECONDS", 40)
+    monkeypatch.setattr(svg, "RENDER_MODE", "ffmpeg")
+    monkeypatch.setattr(svg, "RENDER_WORKERS", 1)
+    monkeypatch.setattr(svg, "USE_BACKGROUND_PROXY", False)
+
+    def run(project_id):
+        return svg.process_story_video(base_video, "Shoes", STORY, project_id, voice="en-US-JennyNeural",
+                                       encoding_profile="draft")
+    return run, calls
+
+def test_second_run_of_a_finished_project_redoes_nothing(pipeline):
+    run, calls = pipeline
+    first = run("resume_test")
+    assert calls['tts'] == len(first) > 1
+    assert calls['render'] == len(first)
+
+    # The first run trained the speech rate model: the saved plan must still be used
+    calls.update(tts=0, render=0)
+    second = run("resume_test")
+
+    assert second == first
+    assert calls == {'tts': 0, 'render': 0}
@@ -0,0 +1,49 @@
+import json
+import multiprocessing
+from speech_rate import SpeechRateModel
+
+TEXT = "So my neighbor knocked on the door, holding a box of shoes. Then she left."
+
+def _timings(text: str, seconds: float = 0.4) -> list:
+    return [(word.strip(".,"), index * seconds, index * seconds + 0.3) for index, word in enumerate(text.split())]
+
+def _model(tmp_path) -> SpeechRateModel:
+    return SpeechRateModel(str(tmp_path / "speech_rate.sqlite3"), str(tmp_path / "speech_rate.json"))
+
+def _observe(tmp_path, count: int) -> None:
+    model = _model(tmp_path)
+    for _ in range(count):
+        model.observe(TEXT, _timings(TEXT), "voice")
+        model.save()
+
+def test_concurrent_processes_keep_every_sum(tmp_path):
+    words = _model(tmp_path).observe(TEXT, _timings(TEXT), "voice")
+    workers = [multiprocessing.Process(target=_observe, args=(tmp_path, 10)) for _ in range(4)]
+    for process in workers:
+        process.start()
+    for process in workers:
+        process.join()
+
+    assert all(process.exitcode == 0 for process in workers)
+    assert _model(tmp_path).samples("voice") == 4 * 10 * words
+
+def test_fit_follows_the_observed_rate(tmp_path):
+    model = _model(tmp_path)
+    for _ in range(50):
+        model.observe(TEXT, _timings(TEXT, 0.6), "slow")
+    model.save()
+
+    words = len(TEXT.split())
+    assert abs(_model(tmp_path).predict(TEXT, "slow") - (words - 1) * 0.6) < 0.5
+
+def test_legacy_json_file_is_imported_once(tmp_path):
+    donor = _model(tmp_path / "donor")
+    donor.observe(TEXT, _timings(TEXT), "voice")
+    donor.save()
+    (tmp_path / "speech_rate.json").write_text(json.dumps(donor.voices))
+
+    model = _model(tmp_path)
+
+    assert model.samples("voice") == donor.samples("voice")
+    assert not model.claim_calibration()
+    assert (tmp_path / "speech_rate.json.migrated").exists()
@@ -0,0 +1,52 @@
+import time
+import sqlite3
+import story_pool
+from story_pool import StoryPool
+
+def make_pool(tmp_path, ttl_hours=None):
+    return StoryPool(db_path=str(tmp_path / "story_pool.sqlite3"), ttl_hours=ttl_hours or {'default': 6})
+
+def post(post_id, title="A story"):
+    return {'id': post_id, 'title': title, 'selftext': "Once upon a time", 'score': 3}
+
+def test_take_skips_used_posts_and_claims_once(tmp_path):
+    pool = make_pool(tmp_path)
+    pool.add("stories", [post("a"), post("b")])
+
+    taken = pool.take("stories", lambda row: row['id'] == "a")
+
+    assert taken['id'] == "b"
+    assert pool.take("stories", lambda row: row['id'] == "a") is None
+    assert pool.count("stories") == 0
+
+def test_expired_posts_are_not_handed_out(tmp_path, monkeypatch):
+    pool = make_pool(tmp_path, {'default': 1})
+    pool.add("stories", [post("a")])
+    later = time.time() + 2 * 3600
+    monkeypatch.setattr(story_pool.time, "time", lambda: later)
+
+    assert pool.count("stories") == 0
+    assert pool.take("stories", lambda row: False) is None
+
+def test_every_connection_is_closed(tmp_path, monkeypatch):
+    opened = []
+    connect = sqlite3.connect
+
+    def tracking_connect(*args, **kwargs):
+        opened.append(connect(*args, **kwargs))
+        return opened[-1]
+
+    monkeypatch.setattr(story_pool.sqlite3, "connect", tracking_connect)
+    pool = make_pool(tmp_path)
+    pool.add("stories", [post("a"), post("b")])
+    pool.count("stories")
+    pool.take("stories", lambda row: False)
+    pool.clear()
+
+    assert len(opened) == 5
+    for conn in opened:
+        try:
+            conn.execute("SELECT 1")
+        except sqlite3.ProgrammingError:
+            continue
+        raise AssertionError("connection left open")
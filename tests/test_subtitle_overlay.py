@@ -0,0 +1,26 @@
+import numpy as np
+from subtitle_overlay import SubtitleOverlay
+
+def caption(start, end, value=255, size=(2, 4)):
+    rgba = np.zeros(size + (4,), dtype=np.uint8)
+    rgba[:, :, :3] = value
+    rgba[:, :, 3] = 255
+    return (start, end, rgba)
+
+def test_active_caption_is_found_and_overlaps_are_cut():
+    overlay = SubtitleOverlay([caption(2.0, 3.0), caption(0.0, 1.5), caption(1.0, 2.5)], (8, 6))
+
+    assert [overlay.active_index(t) for t in (0.5, 1.0, 1.9, 2.0, 2.9, 3.0, -1.0)] == [0, 1, 1, 2, 2, None, None]
+    assert overlay.ends == [1.0, 2.0, 3.0]
+
+def test_blend_only_touches_the_caption_box_and_copies_the_frame():
+    overlay = SubtitleOverlay([caption(0.0, 1.0)], (8, 6))
+    frame = np.zeros((6, 8, 3), dtype=np.uint8)
+    frame.flags.writeable = False
+
+    blended = overlay.blend(frame, 0.5)
+
+    assert blended[2:4, 2:6].min() == 255
+    assert blended.sum() == 255 * 2 * 4 * 3
+    assert frame.sum() == 0
+    assert overlay.blend(frame, 1.5) is frame
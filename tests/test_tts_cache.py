@@ -0,0 +1,56 @@
+import os
+import json
+import multiprocessing
+from tts_cache import TTSCache
+
+def _fill(cache_dir: str, worker: int, count: int, source: str) -> None:
+    cache = TTSCache(cache_dir, max_bytes=10 ** 9)
+    for index in range(count):
+        text = f"worker {worker} text {index}"
+        cache.put(text, "voice", source, [("word", 0.0, 0.5)])
+        assert cache.get(text, "voice", os.path.join(cache_dir, f"out_{worker}.mp3")) is not None
+
+def _audio(tmp_path, size: int = 1000) -> str:
+    source = tmp_path / "source.mp3"
+    source.write_bytes(b"\0" * size)
+    return str(source)
+
+def test_concurrent_processes_keep_every_entry(tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    source = _audio(tmp_path)
+    TTSCache(cache_dir)
+    workers = [multiprocessing.Process(target=_fill, args=(cache_dir, worker, 20, source)) for worker in range(4)]
+    for process in workers:
+        process.start()
+    for process in workers:
+        process.join()
+
+    assert all(process.exitcode == 0 for process in workers)
+    assert TTSCache(cache_dir).stats()['entries'] == 80
+
+def test_eviction_keeps_the_byte_budget_and_recent_entries(tmp_path):
+    source = _audio(tmp_path)
+    cache = TTSCache(str(tmp_path / "cache"), max_bytes=3500)
+    for index in range(5):
+        cache.put(f"text {index}", "voice", source, [("word", 0.0, 0.5)])
+        # Reading the first entry keeps it recently used
+        assert cache.get("text 0", "voice", str(tmp_path / "out.mp3")) is not None
+
+    stats = cache.stats()
+    assert stats['bytes'] <= 3500
+    assert cache.get("text 0", "voice", str(tmp_path / "out.mp3")) is not None
+    assert cache.get("text 1", "voice", str(tmp_path / "out.mp3")) is None
+    assert not os.path.exists(os.path.join(cache.cache_dir, f"{cache.make_key('text 1', 'voice')}.mp3"))
+
+def test_legacy_json_index_is_imported(tmp_path):
+    cache_dir = tmp_path / "cache"
+    cache_dir.mkdir()
+    key = TTSCache.make_key("old text", "voice")
+    (cache_dir / f"{key}.mp3").write_bytes(b"\0" * 10)
+    (cache_dir / f"{key}.json").write_text(json.dumps([["old", 0.0, 0.4]]))
+    (cache_dir / "index.json").write_text(json.dumps({key: {"size": 30, "last_used": 1.0}}))
+
+    cache = TTSCache(str(cache_dir))
+
+    assert cache.get("old text", "voice", str(tmp_path / "out.mp3")) == [("old", 0.0, 0.4)]
+    assert not (cache_dir / "index.json").exists()
@@ -0,0 +1,27 @@
+import os
+from video_catalog import VideoCatalog
+
+def make_catalog(tmp_path):
+    return VideoCatalog(db_path=str(tmp_path / "videos.sqlite3"), legacy_file=str(tmp_path / "videos.json"))
+
+def test_delete_part_keeps_numbering(tmp_path):
+    catalog = make_catalog(tmp_path)
+    catalog.start_project("p1", "Story", total_parts=3)
+    for part in (1, 2, 3):
+        catalog.record_part("p1", part, os.path.join(str(tmp_path), f"part{part}.mp4"), 60.0)
+    catalog.finish_project("p1")
+
+    catalog.delete_part("p1", 2)
+
+    assert catalog.list_projects()[0]['total_parts'] == 3
+    assert [part['part'] for part in catalog.get_parts(["p1"])["p1"]] == [1, 3]
+    assert catalog.get_part("p1", 3) is not None
+
+def test_delete_last_part_removes_project(tmp_path):
+    catalog = make_catalog(tmp_path)
+    catalog.start_project("p1", "Story", total_parts=2)
+    catalog.record_part("p1", 1, os.path.join(str(tmp_path), "part1.mp4"), 60.0)
+
+    catalog.delete_part("p1", 1)
+
+    assert catalog.list_projects() == []
@@ -0,0 +1,57 @@
+import time
+import random
+from word_alignment import align
+
+VOCABULARY = ("my", "neighbor", "knocked", "again", "holding", "a", "box", "of", "shoes", "and", "then", "she",
+              "left", "without", "saying", "anything", "about", "the", "dog", "or", "weird", "landlord")
+
+def _story(count: int, rng: random.Random) -> list:
+    return [rng.choice(VOCABULARY) + ("." if index % 9 == 8 else "") for index in range(count)]
+
+def _timings(tokens: list) -> list:
+    return [(token, index * 0.35, index * 0.35 + 0.3) for index, token in enumerate(tokens)]
+
+def test_joined_and_split_words():
+    aligned = align(["It's", "1/2", "done."], _timings(["its", "1", "2", "done"]))
+
+    assert [(word.first, word.last) for word in aligned] == [(0, 0), (1, 2), (3, 3)]
+
+def test_burst_of_added_boundaries_keeps_the_rest_aligned():
+    rng = random.Random(2)
+    words = _story(600, rng)
+    spoken = [word.rstrip(".") for word in words]
+    tokens = spoken[:5] + ["uh"] * 150 + spoken[5:]
+
+    aligned = align(words, _timings(tokens))
+
+    correct = sum(1 for index, word in enumerate(aligned) if word.first == (index if index < 5 else index + 150))
+    assert correct >= 0.98 * len(words)
+
+def test_burst_of_unspoken_words_keeps_the_rest_aligned():
+    rng = random.Random(3)
+    words = _story(600, rng)
+    spoken = [word.rstrip(".") for word in words]
+    tokens = spoken[:200] + spoken[300:]
+
+    aligned = align(words, _timings(tokens))
+
+    after = [word.first for word in aligned[300:]]
+    assert sum(1 for index, first in enumerate(after) if first == 200 + index) >= 0.98 * len(after)
+
+def _mismatched_seconds(count: int) -> float:
+    rng = random.Random(count)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    random_word = lambda: "".join(rng.choice(letters) for _ in range(rng.randint(3, 8)))
+    words = [random_word() for _ in range(count)]
+    timings = _timings([random_word() for _ in range(count)])
+    start = time.perf_counter()
+    align(words, timings)
+    return time.perf_counter() - start
+
+def test_off_script_input_keeps_the_band_bounded():
+    # Nothing matches, so the band is lost on every word: the cost must still grow linearly
+    small = min(_mismatched_seconds(500) for _ in range(2))
+    large = min(_mismatched_seconds(2000) for _ in range(2))
+
+    assert large < 8 * small
+    assert large < 5.0